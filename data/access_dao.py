@@ -1,13 +1,52 @@
 # data/access_dao.py
 
 import datetime
-from dataclasses import dataclass
+from collections.abc import Iterator
+from dataclasses import dataclass, fields
 import pyodbc
 from data.database import DatabaseManager
+from data.loader import DataLoader, scoped_loader
+from data.query_cache import cached_query, invalidates
+
+# parameters per "IN (...)" list
+IN_CHUNK = 100
+
+
+def _in_chunks(keys: list) -> Iterator[tuple[list, str]]:
+    """keys in IN_CHUNK slices, each with its "IN (?, ?, …)" clause."""
+    for i in range(0, len(keys), IN_CHUNK):
+        chunk = keys[i:i + IN_CHUNK]
+        yield chunk, f"IN ({', '.join('?' * len(chunk))})"
+
+
+class Tracked:
+    """
+    Mixin for dataclass rows that remembers the values they were loaded
+    with, so an update can write only the fields that changed since.
+    Only dataclass fields count; other attributes set on the row are ignored.
+    A row that was never loaded (built by hand) reports every field changed.
+    """
+
+    @classmethod
+    def loaded(cls, *values):
+        """Row built from DB values, with those values as its clean state."""
+        obj = cls(*values)
+        obj.mark_clean()
+        return obj
+
+    def mark_clean(self) -> None:
+        self._loaded = tuple(getattr(self, f.name) for f in fields(self))
+
+    def changed_fields(self) -> list[str]:
+        names = [f.name for f in fields(self)]
+        loaded = self.__dict__.get("_loaded")
+        if loaded is None:
+            return names
+        return [n for n, old in zip(names, loaded) if getattr(self, n) != old]
 
 
 @dataclass
-class User:
+class User(Tracked):
     user_id: int
     company_id: int
     supervisor_id: int | None    # ← new field
@@ -57,10 +96,10 @@ class UserDAO:
             FROM Users
             WHERE UserID=?
         """
-        cur = DatabaseManager.access_connection().cursor()
-        cur.execute(sql, (uid,))
-        row = cur.fetchone()
-        return User(*row) if row else None
+        with DatabaseManager.statement(sql) as cur:
+            cur.execute(sql, (uid,))
+            row = cur.fetchone()
+        return User.loaded(*row) if row else None
 
 
 class EmployeeDAO:
@@ -68,27 +107,59 @@ class EmployeeDAO:
     CRUD operations for Users table when managed as employees.
     """
 
+    _SELECT = """
+        SELECT {top}
+            UserID,
+            CompanyID,
+            SupervisorID,
+            LastName,
+            FirstName,
+            UserType,
+            CreatedAt
+        FROM Users
+        {where}
+        ORDER BY UserID
+    """
+
     @classmethod
     def fetch_all(cls) -> list[User]:
-        sql = """
-            SELECT
-                UserID,
-                CompanyID,
-                SupervisorID,
-                LastName,
-                FirstName,
-                UserType,
-                CreatedAt
-            FROM Users
-           ORDER BY UserID
-        """
-        cur = DatabaseManager.access_connection().cursor()
+        return list(cls.iter_all())
+
+    @classmethod
+    def iter_all(cls,
+                 chunk_size: int = 500,
+                 conn: pyodbc.Connection | None = None
+    ) -> Iterator[User]:
+        """Stream every user with fetchmany, ordered by UserID."""
+        cur = (conn or DatabaseManager.access_connection()).cursor()
+        cur.execute(cls._SELECT.format(top="", where=""))
+        while rows := cur.fetchmany(chunk_size):
+            for r in rows:
+                yield User.loaded(
+                    r.UserID, r.CompanyID, r.SupervisorID,
+                    r.LastName, r.FirstName, r.UserType, r.CreatedAt
+                )
+
+    @classmethod
+    def fetch_page(cls,
+                   after_user_id: int | None = None,
+                   limit: int = 200,
+                   conn: pyodbc.Connection | None = None
+    ) -> list[User]:
+        """Keyset page: the next `limit` users with UserID > after_user_id."""
+        # Access does not accept a parameter in TOP
+        sql = cls._SELECT.format(
+            top=f"TOP {int(limit)}",
+            where="" if after_user_id is None else "WHERE UserID > ?",
+        )
+        cur = (conn or DatabaseManager.access_connection()).cursor()
+        cur.execute(sql, () if after_user_id is None else (after_user_id,))
         return [
-            User(
+            User.loaded(
                 r.UserID, r.CompanyID, r.SupervisorID,
                 r.LastName, r.FirstName, r.UserType, r.CreatedAt
             )
-            for r in cur.execute(sql)
+            for r in cur.fetchall()
         ]
 
     @classmethod
@@ -105,17 +176,55 @@ class EmployeeDAO:
             FROM Users
             WHERE UserID=?
         """
-        cur = DatabaseManager.access_connection().cursor()
-        cur.execute(sql, (uid,))
-        r = cur.fetchone()
+        with DatabaseManager.statement(sql) as cur:
+            cur.execute(sql, (uid,))
+            r = cur.fetchone()
         return (
-            User(
+            User.loaded(
                 r.UserID, r.CompanyID, r.SupervisorID,
                 r.LastName, r.FirstName, r.UserType, r.CreatedAt
             )
             if r else None
         )
 
+    @classmethod
+    def fetch_by_ids(cls, user_ids: list[int]) -> dict[int, User]:
+        """UserID -> User for the given ids, IN_CHUNK ids per query."""
+        cur = DatabaseManager.access_connection().cursor()
+        users: dict[int, User] = {}
+        for chunk, in_list in _in_chunks(user_ids):
+            cur.execute(cls._SELECT.format(top="", where=f"WHERE UserID {in_list}"), chunk)
+            for r in cur.fetchall():
+                users[r.UserID] = User.loaded(
+                    r.UserID, r.CompanyID, r.SupervisorID,
+                    r.LastName, r.FirstName, r.UserType, r.CreatedAt
+                )
+        return users
+
+    @classmethod
+    def fetch_by_supervisors(cls, supervisor_ids: list[int]) -> dict[int, list[User]]:
+        """SupervisorID -> direct reports for the given ids (absent: none)."""
+        cur = DatabaseManager.access_connection().cursor()
+        reports: dict[int, list[User]] = {}
+        for chunk, in_list in _in_chunks(supervisor_ids):
+            cur.execute(cls._SELECT.format(top="", where=f"WHERE SupervisorID {in_list}"), chunk)
+            for r in cur.fetchall():
+                reports.setdefault(r.SupervisorID, []).append(User.loaded(
+                    r.UserID, r.CompanyID, r.SupervisorID,
+                    r.LastName, r.FirstName, r.UserType, r.CreatedAt
+                ))
+        return reports
+
+    @classmethod
+    def loader(cls) -> DataLoader[int, User]:
+        """Batching fetch_by_id: UserID -> User or None."""
+        return scoped_loader(cls.fetch_by_ids)
+
+    @classmethod
+    def reports_loader(cls) -> DataLoader[int, list[User]]:
+        """Batching fetch_by_supervisor: SupervisorID -> list of reports."""
+        return scoped_loader(cls.fetch_by_supervisors, list)
+
     @classmethod
     def fetch_by_supervisor(cls, supervisor_id: int) -> list[User]:
         """
@@ -136,15 +245,22 @@ class EmployeeDAO:
         """
         cur = DatabaseManager.access_connection().cursor()
         cur.execute(sql, (supervisor_id,))
-        return [User(*r) for r in cur.fetchall()]
+        return [User.loaded(*r) for r in cur.fetchall()]
 
     @classmethod
+    @invalidates("Users")
     def insert(cls,
                last: str,
                first: str,
                utype: str,
-               supervisor_id: int | None
-    ) -> None:
+               supervisor_id: int | None,
+               company_id: int,
+               cur: pyodbc.Cursor | None = None
+    ) -> int:
+        """
+        Insert a user and return the new UserID.
+        Pass cur to run inside a caller's transaction.
+        """
         sql = """
             INSERT INTO Users (
                 CompanyID,
@@ -156,43 +272,51 @@ class EmployeeDAO:
             ) VALUES (?, ?, ?, ?, ?, ?)
         """
         now = datetime.datetime.now()
-        cur = DatabaseManager.access_connection().cursor()
+        cur = cur or DatabaseManager.access_connection().cursor()
         cur.execute(sql, (
-            1,
+            company_id,
             supervisor_id,
             last,
             first,
             utype,
             now
         ))
+        cur.execute("SELECT @@IDENTITY")
+        return int(cur.fetchone()[0])
+
+    # editable fields -> Users columns
+    _UPDATE_COLUMNS = {
+        "supervisor_id": "SupervisorID",
+        "last_name":     "LastName",
+        "first_name":    "FirstName",
+        "user_type":     "UserType",
+    }
 
     @classmethod
-    def update(cls, emp: User) -> None:
-        sql = """
-            UPDATE Users SET
-                SupervisorID=?,
-                LastName=?,
-                FirstName=?,
-                UserType=?
-            WHERE UserID=?
-        """
-        cur = DatabaseManager.access_connection().cursor()
-        cur.execute(sql, (
-            emp.supervisor_id,
-            emp.last_name,
-            emp.first_name,
-            emp.user_type,
-            emp.user_id
-        ))
+    @invalidates("Users")
+    def update(cls, emp: User) -> bool:
+        """Write the fields changed since emp was loaded; False if none were."""
+        changed = [f for f in emp.changed_fields() if f in cls._UPDATE_COLUMNS]
+        if not changed:
+            return False
+        sql = (
+            f"UPDATE Users SET {', '.join(f'{cls._UPDATE_COLUMNS[f]}=?' for f in changed)} "
+            f"WHERE UserID=?"
+        )
+        with DatabaseManager.statement(sql) as cur:
+            cur.execute(sql, [getattr(emp, f) for f in changed] + [emp.user_id])
+        emp.mark_clean()
+        return True
 
     @classmethod
+    @invalidates("Users")
     def delete(cls, uid: int) -> None:
         sql = "DELETE FROM Users WHERE UserID=?"
         cur = DatabaseManager.access_connection().cursor()
         cur.execute(sql, (uid,))
 
 @dataclass
-class Item:
+class Item(Tracked):
     item_id: str
     category_code: str
     subcategory_code: str
@@ -206,30 +330,150 @@ class Item:
     image_path: str | None
     price: float | None
 
+# the full row, as opened in dialogs
+ItemDetail = Item
+
+
+@dataclass
+class ItemSummary:
+    """
+    The columns the inventory list shows, filters on and draws thumbnails
+    from. Leaves out the MEMO Description and the manual/SOP paths.
+    """
+    item_id: str
+    category_code: str
+    subcategory_code: str
+    quantity: int
+    status: str
+    holder_id: int | None
+    location: str
+    image_path: str | None
+    price: float | None
+
+def make_item_id(cat_code: str, sub_code: str, params: list[str]) -> str:
+    """
+    ItemID = Category-SubCategory-Param1-…, with the parameter values in
+    ParamPos order. Shared by ItemDialog and the bulk importer.
+    """
+    return "-".join([cat_code, sub_code, *params])
+
+
+def _param_columns(params: list[str]) -> list[str | None]:
+    """Values for Items.Param1..Param5 from an ItemID's parameter segments."""
+    vals = [p or None for p in params[:5]]
+    return vals + [None] * (5 - len(vals))
+
+
 class InventoryDAO:
     """CRUD for Items 表"""
 
+    _SELECT = """
+        SELECT {top}
+            ItemID,
+            CategoryCode,
+            SubCategoryCode,
+            Description,
+            Quantity,
+            Status,
+            HolderID,
+            Location,
+            ManualPath,
+            SOPPath,
+            ImagePath,
+            Price
+        FROM Items
+        {where}
+        ORDER BY ItemID
+    """
+
+    # ItemSummary columns only
+    _SELECT_SUMMARY = """
+        SELECT {top}
+            ItemID,
+            CategoryCode,
+            SubCategoryCode,
+            Quantity,
+            Status,
+            HolderID,
+            Location,
+            ImagePath,
+            Price
+        FROM Items
+        {where}
+        ORDER BY ItemID
+    """
+
     @classmethod
     def fetch_all(cls) -> list[Item]:
-        sql = """
-            SELECT
-                ItemID,
-                CategoryCode,
-                SubCategoryCode,
-                Description,
-                Quantity,
-                Status,
-                HolderID,
-                Location,
-                ManualPath,
-                SOPPath,
-                ImagePath,
-                Price
-            FROM Items
-            ORDER BY ItemID
+        return list(cls.iter_all())
+
+    @classmethod
+    def iter_all(cls,
+                 chunk_size: int = 500,
+                 conn: pyodbc.Connection | None = None
+    ) -> Iterator[Item]:
+        """Stream every item with fetchmany, ordered by ItemID."""
+        cur = (conn or DatabaseManager.access_connection()).cursor()
+        cur.execute(cls._SELECT.format(top="", where=""))
+        while rows := cur.fetchmany(chunk_size):
+            for row in rows:
+                yield Item.loaded(*row)
+
+    @classmethod
+    def fetch_page(cls,
+                   after_item_id: str | None = None,
+                   limit: int = 200,
+                   conn: pyodbc.Connection | None = None
+    ) -> list[Item]:
         """
-        cur = DatabaseManager.access_connection().cursor()
-        return [Item(*row) for row in cur.execute(sql)]
+        Keyset page: the next `limit` items with ItemID > after_item_id.
+        Seeks on the primary key, so page 500 costs the same as page 1.
+        """
+        # Access does not accept a parameter in TOP
+        sql = cls._SELECT.format(
+            top=f"TOP {int(limit)}",
+            where="" if after_item_id is None else "WHERE ItemID > ?",
+        )
+        cur = (conn or DatabaseManager.access_connection()).cursor()
+        cur.execute(sql, () if after_item_id is None else (after_item_id,))
+        return [Item.loaded(*row) for row in cur.fetchall()]
+
+    @classmethod
+    def fetch_summary_page(cls,
+                           after_item_id: str | None = None,
+                           limit: int = 200,
+                           conn: pyodbc.Connection | None = None
+    ) -> list[ItemSummary]:
+        """fetch_page for list views: ItemSummary rows, same keyset order."""
+        sql = cls._SELECT_SUMMARY.format(
+            top=f"TOP {int(limit)}",
+            where="" if after_item_id is None else "WHERE ItemID > ?",
+        )
+        cur = (conn or DatabaseManager.access_connection()).cursor()
+        cur.execute(sql, () if after_item_id is None else (after_item_id,))
+        return [ItemSummary(*row) for row in cur.fetchall()]
+
+    @classmethod
+    def fetch_details(cls,
+                      item_ids: list[str],
+                      conn: pyodbc.Connection | None = None
+    ) -> dict[str, ItemDetail]:
+        """Full rows for item_ids, IN_CHUNK ids per query; missing ids are left out."""
+        cur = (conn or DatabaseManager.access_connection()).cursor()
+        found: dict[str, ItemDetail] = {}
+        for chunk, in_list in _in_chunks(item_ids):
+            cur.execute(cls._SELECT.format(top="", where=f"WHERE ItemID {in_list}"), chunk)
+            for row in cur.fetchall():
+                found[row.ItemID] = Item.loaded(*row)
+        return found
+
+    @classmethod
+    def ids_with_description(cls, text: str, conn=None) -> list[str]:
+        """ItemIDs whose Description contains text (a full table scan)."""
+        pattern = "%" + text.replace("[", "[[]").replace("%", "[%]").replace("_", "[_]") + "%"
+        cur = (conn or DatabaseManager.access_connection()).cursor()
+        cur.execute("SELECT ItemID FROM Items WHERE Description LIKE ?", (pattern,))
+        return [r[0] for r in cur.fetchall()]
     
     @classmethod
     def fetch_by_supervisor(cls, supervisor_id: int) -> list[User]:
@@ -251,7 +495,7 @@ class InventoryDAO:
         """
         cur = DatabaseManager.access_connection().cursor()
         cur.execute(sql, (supervisor_id,))
-        return [User(*row) for row in cur.fetchall()]
+        return [User.loaded(*row) for row in cur.fetchall()]
 
 
     @classmethod
@@ -273,31 +517,32 @@ class InventoryDAO:
             FROM Items
             WHERE ItemID = ?
         """
-        cur = DatabaseManager.access_connection().cursor()
-        cur.execute(sql, (item_id,))
-        row = cur.fetchone()
-        return Item(*row) if row else None
+        with DatabaseManager.statement(sql) as cur:
+            cur.execute(sql, (item_id,))
+            row = cur.fetchone()
+        return Item.loaded(*row) if row else None
+
+    _INSERT_SQL = """
+        INSERT INTO Items (
+            ItemID,
+            CategoryCode,
+            SubCategoryCode,
+            Description,
+            Quantity,
+            Status,
+            HolderID,
+            Location,
+            ManualPath,
+            SOPPath,
+            ImagePath,
+            Price,
+            Param1, Param2, Param3, Param4, Param5
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
 
-    @classmethod
-    def insert(cls, itm: Item) -> None:
-        sql = """
-            INSERT INTO Items (
-                ItemID,
-                CategoryCode,
-                SubCategoryCode,
-                Description,
-                Quantity,
-                Status,
-                HolderID,
-                Location,
-                ManualPath,
-                SOPPath,
-                ImagePath,
-                Price
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        cur = DatabaseManager.access_connection().cursor()
-        cur.execute(sql, (
+    @staticmethod
+    def _insert_params(itm: Item) -> tuple:
+        return (
             itm.item_id,
             itm.category_code,
             itm.subcategory_code,
@@ -309,43 +554,71 @@ class InventoryDAO:
             itm.manual_path,
             itm.sop_path,
             itm.image_path,
-            itm.price
-        ))
+            itm.price,
+            *_param_columns(itm.item_id.split("-")[2:])
+        )
 
     @classmethod
-    def update(cls, itm: Item) -> None:
-        sql = """
-            UPDATE Items SET
-                CategoryCode    = ?,
-                SubCategoryCode = ?,
-                Description = ?,
-                Quantity    = ?,
-                Status      = ?,
-                HolderID    = ?,
-                Location    = ?,
-                ManualPath  = ?,
-                SOPPath     = ?,
-                ImagePath   = ?,
-                Price       = ?
-            WHERE ItemID = ?
-        """
+    @invalidates("Items")
+    def insert(cls, itm: Item) -> None:
         cur = DatabaseManager.access_connection().cursor()
-        cur.execute(sql, (
-            itm.category_code,
-            itm.subcategory_code,
-            itm.description,
-            itm.quantity,
-            itm.status,
-            itm.holder_id,
-            itm.location,
-            itm.manual_path,
-            itm.sop_path,
-            itm.image_path,
-            itm.price,
-            itm.item_id
-        ))
+        cur.execute(cls._INSERT_SQL, cls._insert_params(itm))
+
+    @classmethod
+    @invalidates("Items")
+    def insert_many(cls, items: list[Item], cur: pyodbc.Cursor) -> None:
+        """Batch insert on the caller's cursor (normally inside a transaction)."""
+        if items:
+            cur.executemany(cls._INSERT_SQL, [cls._insert_params(i) for i in items])
+
+    @classmethod
+    def fetch_ids(cls, conn: pyodbc.Connection | None = None) -> set[str]:
+        conn = conn or DatabaseManager.access_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT ItemID FROM Items")
+        ids: set[str] = set()
+        while rows := cur.fetchmany(1000):
+            ids.update(r[0] for r in rows)
+        return ids
+
+    # non-key fields -> Items columns
+    _UPDATE_COLUMNS = {
+        "category_code":    "CategoryCode",
+        "subcategory_code": "SubCategoryCode",
+        "description":      "Description",
+        "quantity":         "Quantity",
+        "status":           "Status",
+        "holder_id":        "HolderID",
+        "location":         "Location",
+        "manual_path":      "ManualPath",
+        "sop_path":         "SOPPath",
+        "image_path":       "ImagePath",
+        "price":            "Price",
+    }
 
     @classmethod
+    @invalidates("Items")
+    def update(cls, itm: Item) -> bool:
+        """
+        Write only the fields changed since itm was loaded (a checkout
+        touches Status and HolderID, not the MEMO description); returns
+        False without a round trip when nothing changed.
+        """
+        changed = [f for f in itm.changed_fields() if f in cls._UPDATE_COLUMNS]
+        if not changed:
+            return False
+        sql = (
+            f"UPDATE Items SET {', '.join(f'{cls._UPDATE_COLUMNS[f]} = ?' for f in changed)} "
+            f"WHERE ItemID = ?"
+        )
+        # one statement per column set, so checkouts reuse the same prepared UPDATE
+        with DatabaseManager.statement(sql) as cur:
+            cur.execute(sql, [getattr(itm, f) for f in changed] + [itm.item_id])
+        itm.mark_clean()
+        return True
+
+    @classmethod
+    @invalidates("Items", "ItemSafetyRequirements")
     def delete(cls, item_id: str):
         db = DatabaseManager.access_connection()
         cur = db.cursor()
@@ -356,6 +629,97 @@ class InventoryDAO:
         # Step 2: delete the item itself from Items table
         cur.execute("DELETE FROM Items WHERE ItemID = ?", (item_id,))
 
+    EXPORT_COLUMNS = [
+        "Item ID", "Category", "Subcategory",
+        "Param1", "Param2", "Param3", "Param4", "Param5",
+        "Description", "Location", "Quantity", "Status", "Holder",
+        "Price", "Manual Path", "SOP Path", "Image Path",
+        "Safety Requirements",
+    ]
+
+    @classmethod
+    def count(cls, conn: pyodbc.Connection | None = None) -> int:
+        conn = conn or DatabaseManager.access_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM Items")
+        return cur.fetchone()[0]
+
+    _EXPORT_SQL = """
+        SELECT
+            i.ItemID, i.CategoryCode, i.SubCategoryCode,
+            i.Param1, i.Param2, i.Param3, i.Param4, i.Param5,
+            i.Description, i.Location, i.Quantity, i.Status,
+            u.FirstName AS HolderFirst, u.LastName AS HolderLast,
+            i.Price, i.ManualPath, i.SOPPath, i.ImagePath,
+            sp.PermissionName
+        FROM (Items AS i
+              LEFT JOIN Users AS u ON i.HolderID = u.UserID)
+        LEFT JOIN (ItemSafetyRequirements AS r
+                   INNER JOIN SafetyPermissions AS sp
+                     ON r.SafetyPermissionID = sp.SafetyPermissionID)
+          ON i.ItemID = r.ItemID
+        {where}
+        ORDER BY i.ItemID
+    """
+
+    @classmethod
+    def iter_export_rows(cls,
+                         conn: pyodbc.Connection | None = None,
+                         chunk_size: int = 500,
+                         item_ids: list[str] | None = None
+    ) -> Iterator[list]:
+        """
+        Stream items as lists in EXPORT_COLUMNS order: every item by ItemID,
+        or just item_ids in the order given (IN_CHUNK ids per query).
+        Holder names and safety requirement names come from joins; an item
+        with several requirements spans consecutive rows (ordered by ItemID)
+        and is folded back into one, so only one item is held at a time.
+        """
+        conn = conn or DatabaseManager.access_connection()
+        cur = conn.cursor()
+        if item_ids is None:
+            cur.execute(cls._EXPORT_SQL.format(where=""))
+            yield from cls._fold_export_rows(cur, chunk_size)
+            return
+        for chunk, in_list in _in_chunks(item_ids):
+            cur.execute(cls._EXPORT_SQL.format(where=f"WHERE i.ItemID {in_list}"), chunk)
+            rows = {row[0]: row for row in cls._fold_export_rows(cur, chunk_size)}
+            yield from (rows[iid] for iid in chunk if iid in rows)
+
+    @staticmethod
+    def _fold_export_rows(cur: pyodbc.Cursor, chunk_size: int) -> Iterator[list]:
+        current: list | None = None
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            for r in rows:
+                if current is not None and current[0] == r.ItemID:
+                    if r.PermissionName:
+                        current[-1].append(r.PermissionName)
+                    continue
+                if current is not None:
+                    current[-1] = "; ".join(current[-1])
+                    yield current
+                params = [r.Param1, r.Param2, r.Param3, r.Param4, r.Param5]
+                if not any(params):
+                    # rows written before Param1..5 were populated
+                    params = r.ItemID.split("-")[2:7]
+                    params += [""] * (5 - len(params))
+                holder = " ".join(p for p in (r.HolderFirst, r.HolderLast) if p)
+                current = [
+                    r.ItemID, r.CategoryCode, r.SubCategoryCode,
+                    *(p or "" for p in params),
+                    r.Description or "", r.Location or "",
+                    r.Quantity, r.Status, holder,
+                    "" if r.Price is None else r.Price,
+                    r.ManualPath or "", r.SOPPath or "", r.ImagePath or "",
+                    [r.PermissionName] if r.PermissionName else [],
+                ]
+        if current is not None:
+            current[-1] = "; ".join(current[-1])
+            yield current
+
 
 
 
@@ -380,6 +744,7 @@ class Parameter:
 # ——— CategoryDAO ——————————————————————————————————————————————————————
 class CategoryDAO:
     @classmethod
+    @cached_query("Categories")
     def fetch_all(cls) -> list[Category]:
         sql = """
             SELECT
@@ -391,6 +756,32 @@ class CategoryDAO:
         cur = DatabaseManager.access_connection().cursor()
         return [Category(*row) for row in cur.execute(sql)]
 
+    @classmethod
+    def fetch_tree(cls) -> list[tuple[Category, list[SubCategory]]]:
+        """
+        Return every category with its subcategories, built from a single
+        LEFT JOIN so categories without subcategories are still listed.
+        """
+        sql = """
+            SELECT
+                c.[CategoryCode],
+                c.[CategoryDescription],
+                s.[SubCategoryCode],
+                s.[SubCategoryDescription]
+            FROM [Categories] AS c
+            LEFT JOIN [SubCategories] AS s
+              ON s.[CategoryCode] = c.[CategoryCode]
+            ORDER BY c.[CategoryCode], s.[SubCategoryCode]
+        """
+        cur = DatabaseManager.access_connection().cursor()
+        tree: list[tuple[Category, list[SubCategory]]] = []
+        for cat_code, cat_desc, sub_code, sub_desc in cur.execute(sql):
+            if not tree or tree[-1][0].code != cat_code:
+                tree.append((Category(cat_code, cat_desc), []))
+            if sub_code is not None:
+                tree[-1][1].append(SubCategory(sub_code, cat_code, sub_desc))
+        return tree
+
     @classmethod
     def fetch_by_code(cls, code: str) -> Category | None:
         sql = """
@@ -406,18 +797,32 @@ class CategoryDAO:
         return Category(row.CategoryCode, row.Description) if row else None
 
     @classmethod
+    @invalidates("Categories")
     def insert(cls, code: str, desc: str) -> None:
         sql = "INSERT INTO [Categories] ([CategoryCode],[CategoryDescription]) VALUES (?, ?)"
         cur = DatabaseManager.access_connection().cursor()
         cur.execute(sql, (code, desc))
 
     @classmethod
+    @invalidates("Categories")
     def update(cls, code: str, desc: str) -> None:
         sql = "UPDATE [Categories] SET [CategoryDescription]=? WHERE [CategoryCode]=?"
         cur = DatabaseManager.access_connection().cursor()
         cur.execute(sql, (desc, code))
 
     @classmethod
+    @invalidates("Categories", "SubCategories", "Items")
+    def rename(cls, old_code: str, new_code: str, desc: str) -> None:
+        """
+        Change a category's code (and description). The caller moves its
+        subcategories and items over; reads of those are dropped as well.
+        """
+        sql = "UPDATE [Categories] SET [CategoryCode]=?, [CategoryDescription]=? WHERE [CategoryCode]=?"
+        cur = DatabaseManager.access_connection().cursor()
+        cur.execute(sql, (new_code, desc, old_code))
+
+    @classmethod
+    @invalidates("Categories")
     def delete(cls, code: str) -> None:
         sql = "DELETE FROM [Categories] WHERE [CategoryCode]=?"
         cur = DatabaseManager.access_connection().cursor()
@@ -427,6 +832,24 @@ class CategoryDAO:
 # ——— SubCategoryDAO ————————————————————————————————————————————————————
 class SubCategoryDAO:
     @classmethod
+    @cached_query("SubCategories")
+    def fetch_all(cls) -> list[SubCategory]:
+        sql = """
+            SELECT
+                [SubCategoryCode],
+                [CategoryCode],
+                [SubCategoryDescription]   AS Description
+            FROM [SubCategories]
+            ORDER BY [SubCategoryCode]
+        """
+        cur = DatabaseManager.access_connection().cursor()
+        return [
+            SubCategory(r.SubCategoryCode, r.CategoryCode, r.Description)
+            for r in cur.execute(sql)
+        ]
+
+    @classmethod
+    @cached_query("SubCategories")
     def fetch_by_category(cls, cat_code: str) -> list[SubCategory]:
         sql = """
             SELECT
@@ -459,26 +882,66 @@ class SubCategoryDAO:
         return SubCategory(row.SubCategoryCode, row.CategoryCode, row.Description) if row else None
 
     @classmethod
+    @invalidates("SubCategories")
     def insert(cls, code: str, cat_code: str, desc: str) -> None:
         sql = "INSERT INTO [SubCategories] ([SubCategoryCode],[CategoryCode],[SubCategoryDescription]) VALUES (?,?,?)"
         cur = DatabaseManager.access_connection().cursor()
         cur.execute(sql, (code, cat_code, desc))
 
     @classmethod
+    @invalidates("SubCategories")
     def update(cls, code: str, cat_code: str, desc: str) -> None:
         sql = "UPDATE [SubCategories] SET [CategoryCode]=?,[SubCategoryDescription]=? WHERE [SubCategoryCode]=?"
         cur = DatabaseManager.access_connection().cursor()
         cur.execute(sql, (cat_code, desc, code))
 
     @classmethod
+    @invalidates("SubCategories", "Items")
+    def rename(cls, old_code: str, new_code: str, cat_code: str, desc: str) -> None:
+        """
+        Change a subcategory's code (and parent, description). The caller
+        moves its items over; reads of those are dropped as well.
+        """
+        sql = (
+            "UPDATE [SubCategories] "
+            "SET [SubCategoryCode]=?,[CategoryCode]=?,[SubCategoryDescription]=? "
+            "WHERE [SubCategoryCode]=?"
+        )
+        cur = DatabaseManager.access_connection().cursor()
+        cur.execute(sql, (new_code, cat_code, desc, old_code))
+
+    @classmethod
+    @invalidates("SubCategories")
     def delete(cls, code: str) -> None:
         sql = "DELETE FROM [SubCategories] WHERE [SubCategoryCode]=?"
         cur = DatabaseManager.access_connection().cursor()
         cur.execute(sql, (code,))
 
 
+# ParamPos is a BYTE: 1–5 plus this offset still fits while rows are parked
+_PARAM_POS_OFFSET = 100
+
+
 class ParameterDAO:
     @classmethod
+    @cached_query("Parameters")
+    def fetch_all(cls) -> list[Parameter]:
+        sql = """
+            SELECT
+                [SubCategoryCode],
+                [ParamPos]       AS Position,
+                [ParameterName]  AS Name
+            FROM [Parameters]
+            ORDER BY [SubCategoryCode], [ParamPos]
+        """
+        cur = DatabaseManager.access_connection().cursor()
+        return [
+            Parameter(r.SubCategoryCode, r.Position, r.Name)
+            for r in cur.execute(sql)
+        ]
+
+    @classmethod
+    @cached_query("Parameters")
     def fetch_by_subcategory(cls, sub_code: str) -> list[Parameter]:
         sql = """
             SELECT
@@ -496,6 +959,7 @@ class ParameterDAO:
         ]
     
     @classmethod
+    @invalidates("Parameters")
     def insert(cls, sub_code: str, pos: int, name: str) -> None:
         sql = """
             INSERT INTO [Parameters]
@@ -506,38 +970,146 @@ class ParameterDAO:
         cur.execute(sql, (sub_code, pos, name))
 
     @classmethod
+    @invalidates("Parameters", "Items", "ItemSafetyRequirements")
     def update(cls,
                sub_code: str,
                old_pos: int,
                new_pos: int,
                name: str
-    ) -> None:
-        conn = DatabaseManager.access_connection()
-        cur  = conn.cursor()
-        # shift intervening rows to avoid duplicates
-        if new_pos < old_pos:
-            cur.execute("""
-              UPDATE [Parameters]
-                 SET [ParamPos] = [ParamPos] + 1
-               WHERE [SubCategoryCode]=?
-                 AND [ParamPos] BETWEEN ? AND ?
-            """, (sub_code, new_pos, old_pos - 1))
-        elif new_pos > old_pos:
+    ) -> int:
+        """
+        Rename the parameter at old_pos and move it to new_pos.
+        new_pos must be one of the occupied positions; a move is applied
+        as a reorder, so items are rewritten too.
+        Returns the number of items whose ItemID changed.
+        """
+        with DatabaseManager.transaction() as cur:
+            positions = cls._positions(cur, sub_code)
+            if old_pos not in positions:
+                raise ValueError(f"No parameter at position {old_pos}")
+            if new_pos not in positions:
+                raise ValueError(
+                    f"Position {new_pos} is not in use; "
+                    f"move to one of {', '.join(map(str, positions))}"
+                )
+            idx = positions.index(new_pos)
+            order = [p for p in positions if p != old_pos]
+            order.insert(idx, old_pos)
+            changed = cls._apply_order(cur, sub_code, positions, order)
             cur.execute("""
               UPDATE [Parameters]
-                 SET [ParamPos] = [ParamPos] - 1
-               WHERE [SubCategoryCode]=?
-                 AND [ParamPos] BETWEEN ? AND ?
-            """, (sub_code, old_pos + 1, new_pos))
-        # now move the edited parameter
+                 SET [ParameterName]=?
+               WHERE [SubCategoryCode]=? AND [ParamPos]=?
+            """, (name, sub_code, positions[idx]))
+        return changed
+
+    @classmethod
+    @invalidates("Parameters", "Items", "ItemSafetyRequirements")
+    def reorder(cls, sub_code: str, new_order: list[int]) -> int:
+        """
+        Apply a whole permutation of a subcategory's parameters at once.
+        new_order lists the current positions in their desired order; the
+        occupied slots are kept and refilled in that order. Parameters and
+        the affected items are rewritten in one transaction.
+        Returns the number of items whose ItemID changed.
+        """
+        with DatabaseManager.transaction() as cur:
+            positions = cls._positions(cur, sub_code)
+            if sorted(new_order) != positions:
+                raise ValueError(
+                    f"{new_order} is not a permutation of positions {positions}"
+                )
+            return cls._apply_order(cur, sub_code, positions, list(new_order))
+
+    @staticmethod
+    def _positions(cur, sub_code: str) -> list[int]:
+        cur.execute(
+            "SELECT [ParamPos] FROM [Parameters] WHERE [SubCategoryCode]=?",
+            (sub_code,)
+        )
+        return sorted(r[0] for r in cur.fetchall())
+
+    @staticmethod
+    def _apply_order(cur, sub_code: str,
+                     positions: list[int], new_order: list[int]) -> int:
+        if new_order == positions:
+            return 0
+
+        # 1) Parameters: park every row at pos+offset, then drop each into
+        #    its new slot, so UNIQUE(SubCategoryCode, ParamPos) never collides
         cur.execute("""
           UPDATE [Parameters]
-             SET [ParamPos]=?, [ParameterName]=?
+             SET [ParamPos] = [ParamPos] + ?
+           WHERE [SubCategoryCode]=?
+        """, (_PARAM_POS_OFFSET, sub_code))
+        cur.executemany("""
+          UPDATE [Parameters]
+             SET [ParamPos]=?
            WHERE [SubCategoryCode]=? AND [ParamPos]=?
-        """, (new_pos, name, sub_code, old_pos))
-        conn.commit()
+        """, [
+            (slot, sub_code, old + _PARAM_POS_OFFSET)
+            for slot, old in zip(positions, new_order)
+        ])
+
+        # 2) Items: ItemID segments follow the sorted positions, so segment
+        #    i now takes the value that sat at the rank of new_order[i]
+        ranks = [positions.index(p) for p in new_order]
+        cur.execute(
+            "SELECT ItemID FROM Items WHERE SubCategoryCode=?", (sub_code,)
+        )
+        renames: list[tuple[str, str, list[str]]] = []
+        for (old_id,) in cur.fetchall():
+            parts = old_id.split("-")
+            values = parts[2:] + [""] * (len(positions) - len(parts) + 2)
+            params = [values[r] for r in ranks] + values[len(positions):]
+            new_id = "-".join(parts[:2] + params)
+            if new_id != old_id:
+                renames.append((old_id, new_id, params))
+        if not renames:
+            return 0
+
+        # ItemSafetyRequirements references ItemID without cascading, so
+        # lift the affected rows out and put them back under the new IDs
+        cur.execute("""
+            SELECT r.ItemID, r.SafetyPermissionID
+              FROM ItemSafetyRequirements AS r
+             INNER JOIN Items AS i ON r.ItemID = i.ItemID
+             WHERE i.SubCategoryCode = ?
+        """, (sub_code,))
+        reqs = cur.fetchall()
+        cur.execute("""
+            DELETE FROM ItemSafetyRequirements
+             WHERE ItemID IN (SELECT ItemID FROM Items WHERE SubCategoryCode = ?)
+        """, (sub_code,))
+
+        # a permutation can map one item onto another's old ID; route
+        # through temporary IDs when that happens
+        old_ids = {old for old, _new, _p in renames}
+        if any(new in old_ids for _old, new, _p in renames):
+            staged = [(f"~reorder~{n}", old) for n, (old, _new, _p) in enumerate(renames)]
+            cur.executemany("UPDATE Items SET ItemID=? WHERE ItemID=?", staged)
+            sources = [tmp for tmp, _old in staged]
+        else:
+            sources = [old for old, _new, _p in renames]
+        cur.executemany("""
+            UPDATE Items SET
+                ItemID=?, Param1=?, Param2=?, Param3=?, Param4=?, Param5=?
+            WHERE ItemID=?
+        """, [
+            (new, *_param_columns(params), src)
+            for (_old, new, params), src in zip(renames, sources)
+        ])
+
+        new_ids = {old: new for old, new, _p in renames}
+        if reqs:
+            cur.executemany(
+                "INSERT INTO ItemSafetyRequirements (ItemID, SafetyPermissionID) VALUES (?, ?)",
+                [(new_ids.get(r.ItemID, r.ItemID), r.SafetyPermissionID) for r in reqs]
+            )
+        return len(renames)
 
     @classmethod
+    @invalidates("Parameters")
     def delete(cls, sub_code: str, pos: int) -> None:
         sql = "DELETE FROM [Parameters] WHERE [SubCategoryCode]=? AND [ParamPos]=?"
         cur = DatabaseManager.access_connection().cursor()
@@ -556,6 +1128,18 @@ InventoryDAO.has_items_in_category = classmethod(lambda cls, cat:
     _count("SELECT COUNT(*) FROM Items WHERE ItemID LIKE ?", (f"{cat}-%",)) > 0
 )
 
+def _count_by_subcategory(cls) -> dict[tuple[str, str], int]:
+    """Item counts keyed by (CategoryCode, SubCategoryCode), in one GROUP BY."""
+    sql = """
+        SELECT CategoryCode, SubCategoryCode, COUNT(*) AS N
+        FROM Items
+        GROUP BY CategoryCode, SubCategoryCode
+    """
+    cur = DatabaseManager.access_connection().cursor()
+    return {(r.CategoryCode, r.SubCategoryCode): r.N for r in cur.execute(sql)}
+
+InventoryDAO.count_by_subcategory = classmethod(_count_by_subcategory)
+
 InventoryDAO.has_items_in_subcategory = classmethod(lambda cls, cat, sub:
     _count(
         "SELECT COUNT(*) FROM Items WHERE ItemID LIKE ?",
@@ -564,11 +1148,12 @@ InventoryDAO.has_items_in_subcategory = classmethod(lambda cls, cat, sub:
 )
 
 def _has_items_using_param(cls, sub: str, pos: int) -> bool:
-    # 取出所有该子类别的 ItemID，然后按 '-' 切分检查是否有第 pos+1 段存在
-    sql = "SELECT ItemID FROM Items WHERE ItemID LIKE ?"
+    # Only this subcategory's items with at least pos parameter segments can
+    # use it; the LIKE lets the database drop the rest before we split IDs.
+    sql = "SELECT ItemID FROM Items WHERE SubCategoryCode = ? AND ItemID LIKE ?"
     cur = DatabaseManager.access_connection().cursor()
-    cur.execute(sql, (f"%-{sub}-%",))
-    for (itemid,) in cur.fetchall():
+    cur.execute(sql, (sub, "%-" * (pos + 1) + "%"))
+    for (itemid,) in cur:
         parts = itemid.split('-')
         # parts[0]=cat, parts[1]=sub, parts[2]=param1,...
         if len(parts) > pos+1 and parts[pos+1]:
@@ -597,6 +1182,7 @@ class UserSafetyPermit:
 # ——— SafetyDAO —————————————————————————————————————————————————————
 class SafetyDAO:
     @classmethod
+    @cached_query("SafetyPermissions")
     def fetch_all_types(cls) -> list[SafetyPermissionType]:
         sql = "SELECT SafetyPermissionID, PermissionName FROM SafetyPermissions"
         cur = DatabaseManager.access_connection().cursor()
@@ -606,6 +1192,7 @@ class SafetyDAO:
         ]
 
     @classmethod
+    @cached_query("EmployeeSafetyPermissions", "SafetyPermissions", "Users")
     def fetch_by_user(cls, user_id: int) -> list[UserSafetyPermit]:
         # Access requires parentheses around JOINs and explicit INNER JOIN
         sql = """
@@ -627,9 +1214,9 @@ class SafetyDAO:
         WHERE esp.EmployeeID = ?
         ORDER BY esp.IssueDate DESC
         """
-        cur = DatabaseManager.access_connection().cursor()
-        cur.execute(sql, (user_id,))
-        rows = cur.fetchall()
+        with DatabaseManager.statement(sql) as cur:
+            cur.execute(sql, (user_id,))
+            rows = cur.fetchall()
         return [
             UserSafetyPermit(
                 r.EmployeeID,
@@ -645,6 +1232,7 @@ class SafetyDAO:
         ]
 
     @classmethod
+    @invalidates("EmployeeSafetyPermissions")
     def add_permit(
         cls,
         employee_id: int,
@@ -669,6 +1257,31 @@ class SafetyDAO:
         ))
 
     @classmethod
+    @invalidates("EmployeeSafetyPermissions")
+    def add_permits(
+        cls,
+        permits: list[tuple[int, int, int, datetime.datetime, datetime.datetime | None]],
+        cur: pyodbc.Cursor
+    ) -> None:
+        """
+        Batch version of add_permit on the caller's cursor. Each tuple is
+        (employee_id, safety_permission_id, issuer_employee_id,
+         issue_date, expire_date).
+        """
+        sql = """
+        INSERT INTO EmployeeSafetyPermissions
+            (EmployeeID, SafetyPermissionID,
+             IssueDate, IssuerEmployeeID, ExpireDate)
+        VALUES (?, ?, ?, ?, ?)
+        """
+        if permits:
+            cur.executemany(sql, [
+                (emp, pid, issued, issuer, expires)
+                for emp, pid, issuer, issued, expires in permits
+            ])
+
+    @classmethod
+    @invalidates("EmployeeSafetyPermissions")
     def update_permit(
         cls,
         employee_id: int,
@@ -692,6 +1305,7 @@ class SafetyDAO:
         ))
 
     @classmethod
+    @invalidates("EmployeeSafetyPermissions")
     def delete_permit(
         cls,
         employee_id: int,
@@ -728,18 +1342,21 @@ class SafetyDAO:
         return [User(*r) for r in cur.fetchall()]
     
     @classmethod
+    @invalidates("SafetyPermissions")
     def add_type(cls, name: str) -> None:
         sql = "INSERT INTO SafetyPermissions (PermissionName) VALUES (?)"
         cur = DatabaseManager.access_connection().cursor()
         cur.execute(sql, (name,))
 
     @classmethod
+    @invalidates("SafetyPermissions")
     def update_type(cls, permission_id: int, name: str) -> None:
         sql = "UPDATE SafetyPermissions SET PermissionName = ? WHERE SafetyPermissionID = ?"
         cur = DatabaseManager.access_connection().cursor()
         cur.execute(sql, (name, permission_id))
 
     @classmethod
+    @invalidates("SafetyPermissions", "EmployeeSafetyPermissions", "ItemSafetyRequirements")
     def delete_type(cls, permission_id: int) -> None:
         db = DatabaseManager.access_connection()
         cur = db.cursor()
@@ -775,31 +1392,66 @@ class ItemSafetyRequirement:
 
 class ItemSafetyRequirementDAO:
     @classmethod
+    def fetch_all(cls) -> dict[str, list[int]]:
+        """ItemID -> SafetyPermissionIDs for every item with requirements."""
+        sql = "SELECT ItemID, SafetyPermissionID FROM ItemSafetyRequirements ORDER BY ItemID"
+        cur = DatabaseManager.access_connection().cursor()
+        reqs: dict[str, list[int]] = {}
+        for row in cur.execute(sql):
+            reqs.setdefault(row.ItemID, []).append(row.SafetyPermissionID)
+        return reqs
+
+    @classmethod
+    @cached_query("ItemSafetyRequirements")
     def fetch_by_item(cls, item_id: str) -> list[int]:
         sql = "SELECT SafetyPermissionID FROM ItemSafetyRequirements WHERE ItemID = ?"
+        with DatabaseManager.statement(sql) as cur:
+            cur.execute(sql, (item_id,))
+            return [row.SafetyPermissionID for row in cur.fetchall()]
+
+    @classmethod
+    def fetch_by_items(cls, item_ids: list[str]) -> dict[str, list[int]]:
+        """ItemID -> SafetyPermissionIDs for the given items (absent: none)."""
         cur = DatabaseManager.access_connection().cursor()
-        cur.execute(sql, (item_id,))
-        return [row.SafetyPermissionID for row in cur.fetchall()]
+        reqs: dict[str, list[int]] = {}
+        for chunk, in_list in _in_chunks(item_ids):
+            cur.execute(
+                "SELECT ItemID, SafetyPermissionID FROM ItemSafetyRequirements "
+                f"WHERE ItemID {in_list}",
+                chunk,
+            )
+            for row in cur.fetchall():
+                reqs.setdefault(row.ItemID, []).append(row.SafetyPermissionID)
+        return reqs
+
+    @classmethod
+    def loader(cls) -> DataLoader[str, list[int]]:
+        """Batching fetch_by_item: ItemID -> list of SafetyPermissionIDs."""
+        return scoped_loader(cls.fetch_by_items, list)
 
     @classmethod
+    @invalidates("ItemSafetyRequirements")
     def add_requirement(cls, item_id: str, pid: int) -> None:
         sql = "INSERT INTO ItemSafetyRequirements (ItemID, SafetyPermissionID) VALUES (?, ?)"
         cur = DatabaseManager.access_connection().cursor()
         cur.execute(sql, (item_id, pid))
 
     @classmethod
+    @invalidates("ItemSafetyRequirements")
     def delete_requirement(cls, item_id: str, pid: int) -> None:
         sql = "DELETE FROM ItemSafetyRequirements WHERE ItemID=? AND SafetyPermissionID=?"
         cur = DatabaseManager.access_connection().cursor()
         cur.execute(sql, (item_id, pid))
 
     @classmethod
+    @invalidates("ItemSafetyRequirements")
     def delete_by_permission(cls, pid: int) -> None:
         sql = "DELETE FROM ItemSafetyRequirements WHERE SafetyPermissionID=?"
         cur = DatabaseManager.access_connection().cursor()
         cur.execute(sql, (pid,))
 
     @classmethod
+    @invalidates("ItemSafetyRequirements")
     def update_permission_id(cls, old_pid: int, new_pid: int) -> None:
         sql = "UPDATE ItemSafetyRequirements SET SafetyPermissionID=? WHERE SafetyPermissionID=?"
         cur = DatabaseManager.access_connection().cursor()
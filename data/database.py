@@ -1,8 +1,13 @@
 # data/database.py
 
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
 import pyodbc
 import pymysql
 from pymysql.constants import CLIENT
+from data.query_cache import get_query_cache
 from utils.config import (
     access_conn_str,
     MYSQL_HOST,
@@ -11,11 +16,67 @@ from utils.config import (
     MYSQL_DATABASE,
 )
 
+# statements whose cursor is kept open per connection
+STATEMENT_CACHE_SIZE = 64
+
+
+class StatementCursors:
+    """
+    Long-lived cursors of one connection, one per SQL statement.
+
+    pyodbc only skips SQLPrepare when a cursor executes the same SQL it ran
+    last, so a fresh cursor per call re-prepares every time. cursor(sql)
+    checks out the idle cursor kept for sql (or opens one) and files it
+    back afterwards; a cursor in use is never handed out twice, so other
+    threads and nested calls simply get a fresh one. The caller must fetch
+    its results inside the with-block. A cursor that raised is closed
+    rather than kept, and close() drops everything.
+    """
+
+    def __init__(self, conn: pyodbc.Connection, max_statements: int = STATEMENT_CACHE_SIZE):
+        self.conn = conn
+        self._max = max_statements
+        self._idle: OrderedDict[str, pyodbc.Cursor] = OrderedDict()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @contextmanager
+    def cursor(self, sql: str):
+        with self._lock:
+            cur = self._idle.pop(sql, None)
+        if cur is None:
+            cur = self.conn.cursor()
+        try:
+            yield cur
+        except BaseException:
+            cur.close()
+            raise
+        with self._lock:
+            if self._closed or sql in self._idle:
+                cur.close()
+                return
+            self._idle[sql] = cur
+            while len(self._idle) > self._max:
+                self._idle.popitem(last=False)[1].close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = list(self._idle.values()), OrderedDict()
+        for cur in idle:
+            try:
+                cur.close()
+            except pyodbc.Error:
+                pass                # connection already gone
+
+
 class DatabaseManager:
     """Singleton holder for local Access & remote MySQL connections."""
 
     _access_cnx = None
     _mysql_cnx  = None
+    _statements: StatementCursors | None = None
+    _statements_lock = threading.Lock()
 
     @classmethod
     def access_connection(cls) -> pyodbc.Connection:
@@ -28,6 +89,77 @@ class DatabaseManager:
             cls._access_cnx = pyodbc.connect(conn_str, autocommit=True)
         return cls._access_cnx
 
+    @classmethod
+    def new_access_connection(cls) -> pyodbc.Connection:
+        """
+        Open a separate connection to the Access DB for a worker thread.
+        pyodbc connections must not be shared across threads; the caller
+        owns the returned connection and closes it when done.
+        """
+        return pyodbc.connect(access_conn_str(), autocommit=True)
+
+    @classmethod
+    def statement(cls, sql: str):
+        """
+        Context manager yielding a kept cursor of the shared Access
+        connection for sql, so repeated calls reuse its prepared statement:
+
+            with DatabaseManager.statement(sql) as cur:
+                row = cur.execute(sql, params).fetchone()
+        """
+        conn = cls.access_connection()
+        with cls._statements_lock:
+            if cls._statements is None or cls._statements.conn is not conn:
+                # first use, or the connection was re-established
+                if cls._statements is not None:
+                    cls._statements.close()
+                cls._statements = StatementCursors(conn)
+            statements = cls._statements
+        return statements.cursor(sql)
+
+    @classmethod
+    def reset_access_connection(cls) -> None:
+        """Close the shared Access connection and its kept cursors; the
+        next access_connection() call opens a new one."""
+        with cls._statements_lock:
+            if cls._statements is not None:
+                cls._statements.close()
+                cls._statements = None
+        if cls._access_cnx is not None:
+            try:
+                cls._access_cnx.close()
+            except pyodbc.Error:
+                pass
+            cls._access_cnx = None
+
+    @classmethod
+    @contextmanager
+    def transaction(cls, conn: pyodbc.Connection | None = None):
+        """
+        Run a block of Access statements as one transaction, on conn or
+        the shared connection. Yields a cursor; commits on success, rolls
+        back on any exception. The connection is switched back to
+        autocommit afterwards. Nested calls join the outer transaction.
+        Query-cache invalidations made inside are repeated after the
+        commit or rollback, so no read of pre-commit data stays cached.
+        """
+        conn = conn or cls.access_connection()
+        if not conn.autocommit:
+            # already inside a transaction: join it
+            yield conn.cursor()
+            return
+        conn.autocommit = False
+        try:
+            with get_query_cache().repeat_invalidations():
+                try:
+                    yield conn.cursor()
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+        finally:
+            conn.autocommit = True
+
     @classmethod
     def mysql_connection(cls) -> pymysql.Connection:
         """
@@ -45,3 +177,44 @@ class DatabaseManager:
                 cursorclass=pymysql.cursors.DictCursor,
             )
         return cls._mysql_cnx
+
+
+class WorkerConnection:
+    """
+    One Access connection reused by a component's successive background
+    tasks (opening one per task costs a file open and lock negotiation):
+
+        with self._worker.connection() as conn:
+            rows = InventoryDAO.fetch_details(ids, conn)
+
+    The connection is opened on first use and handed to one caller at a
+    time, so tasks that overlap simply wait. It is closed after a driver
+    error (the next use reconnects) and by close().
+    """
+
+    def __init__(self):
+        self._conn: pyodbc.Connection | None = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            if self._conn is None:
+                self._conn = DatabaseManager.new_access_connection()
+            try:
+                yield self._conn
+            except pyodbc.Error:
+                self._close()
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except pyodbc.Error:
+                pass
+            self._conn = None
@@ -0,0 +1,108 @@
+# data/loader.py
+
+"""
+Batching loader for per-id lookups.
+
+Screens often look up one row per id in a loop (the supervisor of every
+employee, the requirements of every item). A DataLoader turns that into
+one `WHERE id IN (...)` query per entity type:
+
+    sups = EmployeeDAO.loader()
+    sups.prime(e.supervisor_id for e in emps)    # optional: queue ids
+    for e in emps:
+        sup = sups.load(e.supervisor_id)         # first load runs one query
+
+load() resolves the requested key together with everything primed so far
+in a single call of the batch function, which returns {key: value} and does
+its own chunking to the driver's parameter limit. Results are cached for
+the life of the loader.
+
+With `with load_scope():` around one UI action, DAO loaders are shared by
+everything that action calls, so a table and a tree rendered together fetch
+each supervisor once; the cache is dropped when the scope ends. Outside a
+scope every loader() call returns a fresh, unshared loader.
+"""
+
+from __future__ import annotations
+import threading
+from contextlib import contextmanager
+from typing import Callable, Generic, Hashable, Iterable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class DataLoader(Generic[K, V]):
+    def __init__(self,
+                 batch_fn: Callable[[list[K]], dict[K, V]],
+                 default: Callable[[], V | None] = lambda: None):
+        self._batch_fn = batch_fn
+        self._default = default
+        self._cache: dict[K, V] = {}
+        self._pending: dict[K, None] = {}    # insertion-ordered set
+
+    def prime(self, keys: Iterable[K]) -> None:
+        """Queue keys for the next batch; None and cached keys are skipped."""
+        for key in keys:
+            if key is not None and key not in self._cache:
+                self._pending[key] = None
+
+    def load(self, key: K) -> V | None:
+        if key is None:
+            return self._default()
+        value = self._cache.get(key, _MISSING)
+        if value is _MISSING:
+            self._pending[key] = None
+            self._dispatch()
+            value = self._cache[key]
+        return value
+
+    def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        keys = list(keys)
+        self.prime(keys)
+        return [self.load(k) for k in keys]
+
+    def clear(self, key: K | None = None) -> None:
+        """Drop the cached value of key (everything when None)."""
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def _dispatch(self) -> None:
+        keys, self._pending = list(self._pending), {}
+        found = self._batch_fn(keys)
+        for key in keys:
+            value = found.get(key, _MISSING)
+            self._cache[key] = self._default() if value is _MISSING else value
+
+
+_scope = threading.local()
+
+
+@contextmanager
+def load_scope():
+    """Share DAO loaders and their caches for the duration of one UI action."""
+    if getattr(_scope, "loaders", None) is not None:
+        yield                       # nested: the outer action owns the cache
+        return
+    _scope.loaders = {}
+    try:
+        yield
+    finally:
+        _scope.loaders = None
+
+
+def scoped_loader(batch_fn: Callable[[list], dict],
+                  default: Callable[[], object] = lambda: None) -> DataLoader:
+    """The loader for batch_fn in the current load_scope(), or a fresh one."""
+    loaders = getattr(_scope, "loaders", None)
+    if loaders is None:
+        return DataLoader(batch_fn, default)
+    # bound classmethods are new objects on each access but hash and compare equal
+    loader = loaders.get(batch_fn)
+    if loader is None:
+        loader = loaders[batch_fn] = DataLoader(batch_fn, default)
+    return loader
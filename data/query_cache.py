@@ -0,0 +1,190 @@
+# data/query_cache.py
+
+"""
+Opt-in result cache for DAO read methods.
+
+    class SubCategoryDAO:
+        @classmethod
+        @cached_query("SubCategories")
+        def fetch_by_category(cls, cat_code): ...
+
+        @classmethod
+        @invalidates("SubCategories")
+        def insert(cls, ...): ...
+
+A cached read is keyed by the method (which fixes its SQL) and its
+arguments, and tagged with the tables it reads. Every DAO write is marked
+with the tables it changes; when it returns (or fails half way) all entries
+tagged with one of those tables are dropped. A read that was running while
+a write invalidated is not stored, so it cannot put back a stale result.
+Inside DatabaseManager.transaction() a write is not visible to other
+connections until the commit, so the transaction repeats its
+invalidations once it has committed or rolled back
+(repeat_invalidations()).
+
+Entries also expire after QUERY_CACHE_TTL seconds - other workstations
+write to the same Access file without telling us - and the least recently
+used ones are evicted beyond QUERY_CACHE_SIZE. Callers get a copy of the
+cached value, so mutating a returned row does not touch the cache.
+stats() reports hits, misses and the hit rate.
+"""
+
+from __future__ import annotations
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# seconds a cached result stays valid
+QUERY_CACHE_TTL = 15.0
+# cached results kept at most
+QUERY_CACHE_SIZE = 512
+
+
+class QueryCache:
+    def __init__(self, max_entries: int = QUERY_CACHE_SIZE, ttl: float = QUERY_CACHE_TTL):
+        self._max = max_entries
+        self._ttl = ttl
+        # key -> (stored at, tables, value)
+        self._entries: OrderedDict[tuple, tuple[float, tuple[str, ...], object]] = OrderedDict()
+        self._by_table: dict[str, set[tuple]] = {}
+        self._lock = threading.Lock()
+        self._version = 0           # bumped by every invalidation
+        self._local = threading.local()     # tables to invalidate again, per thread
+        self.hits = self.misses = 0
+        self.evictions = self.expirations = self.invalidations = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, key: tuple):
+        """(True, value) on a fresh hit, (False, None) otherwise."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] >= self._ttl:
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[2]
+
+    def put(self, key: tuple, tables: tuple[str, ...], value, version: int) -> None:
+        """Store value unless an invalidation happened since `version`."""
+        with self._lock:
+            if version != self._version:
+                return
+            self._drop(key)
+            self._entries[key] = (time.monotonic(), tables, value)
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self._max:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, *tables: str) -> None:
+        pending = getattr(self._local, "pending", None)
+        if pending is not None:
+            pending.update(tables)
+        with self._lock:
+            self._version += 1
+            for table in tables:
+                for key in self._by_table.pop(table, ()):
+                    if key in self._entries:
+                        self._drop(key)
+                        self.invalidations += 1
+
+    @contextmanager
+    def repeat_invalidations(self):
+        """Invalidate every table invalidated inside the block once more
+        when it ends; nested blocks leave that to the outermost one."""
+        if getattr(self._local, "pending", None) is not None:
+            yield
+            return
+        self._local.pending = set()
+        try:
+            yield
+        finally:
+            tables, self._local.pending = self._local.pending, None
+            if tables:
+                self.invalidate(*tables)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._by_table.clear()
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _drop(self, key: tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for table in entry[1]:
+                keys = self._by_table.get(table)
+                if keys is not None:
+                    keys.discard(key)
+
+
+_cache: QueryCache | None = None
+
+
+def get_query_cache() -> QueryCache:
+    """The application-wide query cache, created on first use."""
+    global _cache
+    if _cache is None:
+        _cache = QueryCache()
+    return _cache
+
+
+def cached_query(*tables: str):
+    """Cache a DAO read method's results, tagged with the tables it reads."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            # args[0] is the DAO class; fn's qualified name stands for its SQL
+            key = (fn.__qualname__, args[1:], tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:       # unhashable arguments: not cacheable
+                return fn(*args, **kwargs)
+            cache = get_query_cache()
+            hit, value = cache.get(key)
+            if hit:
+                return copy.deepcopy(value)
+            version = cache.version
+            value = fn(*args, **kwargs)
+            cache.put(key, tables, value, version)
+            return copy.deepcopy(value)
+        return wrapper
+    return decorate
+
+
+def invalidates(*tables: str):
+    """Mark a DAO write method; cached reads of these tables are dropped."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                get_query_cache().invalidate(*tables)
+        return wrapper
+    return decorate
@@ -47,4 +47,7 @@ def check_for_update():
         pass
 
 if __name__ == "__main__":
+    # the search index extracts documents in worker processes
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
@@ -5,27 +5,62 @@ from PyQt6.QtCore    import Qt
 from data.access_dao import (
     CategoryDAO, SubCategoryDAO, ParameterDAO, InventoryDAO, Item
 )
-from data.database import DatabaseManager
+
+# Catalogs with more categories than this load their subcategories on expand
+EAGER_TREE_LIMIT = 50
+
 
 class DBConfigController:
     def __init__(self, view: 'DBConfigView'):
         self.view = view
+        self._subs_by_cat: dict = {}
+        self._counts: dict = {}
 
     def load_tree(self):
-        """加载类别及其子类别到 TreeWidget。"""
+        """
+        加载类别及其子类别到 TreeWidget。
+        One joined query for the catalog plus one GROUP BY for item counts;
+        large catalogs only create subcategory nodes when a category expands.
+        """
+        tree = CategoryDAO.fetch_tree()
+        self._counts = InventoryDAO.count_by_subcategory()
+        self._subs_by_cat = {cat.code: subs for cat, subs in tree}
+        lazy = len(tree) > EAGER_TREE_LIMIT
+
+        self.view.tree.setUpdatesEnabled(False)
         self.view.tree.clear()
-        # Category 列表
-        for cat in CategoryDAO.fetch_all():
-            top = QTreeWidgetItem([f"{cat.code}: {cat.description}"])
+        for cat, subs in tree:
+            total = sum(self._counts.get((cat.code, s.code), 0) for s in subs)
+            top = QTreeWidgetItem([f"{cat.code}: {cat.description}", str(total)])
             # 注意这里用 ItemDataRole.UserRole
             top.setData(0, Qt.ItemDataRole.UserRole, ("cat", cat.code))
             self.view.tree.addTopLevelItem(top)
-            # SubCategory 列表
-            for sub in SubCategoryDAO.fetch_by_category(cat.code):
-                node = QTreeWidgetItem([f"{sub.code}: {sub.description}"])
-                node.setData(0, Qt.ItemDataRole.UserRole, ("sub", sub.code))
-                top.addChild(node)
-        self.view.tree.expandAll()
+            if lazy and subs:
+                top.setChildIndicatorPolicy(
+                    QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator
+                )
+            else:
+                self._populate_children(top)
+        if not lazy:
+            self.view.tree.expandAll()
+        self.view.tree.setUpdatesEnabled(True)
+
+    def on_tree_expanded(self, top: QTreeWidgetItem):
+        """Create the subcategory nodes of a lazily loaded category."""
+        kind, _code = top.data(0, Qt.ItemDataRole.UserRole)
+        if kind == "cat" and top.childCount() == 0:
+            self._populate_children(top)
+
+    def _populate_children(self, top: QTreeWidgetItem):
+        cat_code = top.data(0, Qt.ItemDataRole.UserRole)[1]
+        for sub in self._subs_by_cat.get(cat_code, []):
+            n = self._counts.get((cat_code, sub.code), 0)
+            node = QTreeWidgetItem([f"{sub.code}: {sub.description}", str(n)])
+            node.setData(0, Qt.ItemDataRole.UserRole, ("sub", sub.code))
+            top.addChild(node)
+        top.setChildIndicatorPolicy(
+            QTreeWidgetItem.ChildIndicatorPolicy.DontShowIndicatorWhenChildless
+        )
 
     def on_tree_selection(self):
         """选中树节点后更新右侧参数表和按钮状态。"""
@@ -81,10 +116,8 @@ class DBConfigController:
             new_desc = dlg.desc
             try:
                 if new_code != old_code:
-                    # 1) Rename category record (safe, parameterized)
-                    sql = "UPDATE [Categories] SET [CategoryCode]=?, [CategoryDescription]=? WHERE [CategoryCode]=?"
-                    cur = DatabaseManager.access_connection().cursor()
-                    cur.execute(sql, (new_code, new_desc, old_code))
+                    # 1) Rename category record
+                    CategoryDAO.rename(old_code, new_code, new_desc)
 
                     # 2) Update all subcategories' parent code
                     subs = SubCategoryDAO.fetch_by_category(old_code)
@@ -138,7 +171,8 @@ class DBConfigController:
         reply = QMessageBox.question(
             self.view,
             "Delete Category",
-            f"Are you sure you want to delete category '{cat_code}'\nand ALL related data?",
+            f"Are you sure you want to delete category '{cat_code}'\n"
+            f"and ALL related data ({item.text(1)} items)?",
         )
         if reply != QMessageBox.StandardButton.Yes:
             return
@@ -204,14 +238,7 @@ class DBConfigController:
             try:
                 if new_sub_code != old_sub_code or new_parent != sub.category_code:
                     # 1) Rename subcategory record
-                    sql = (
-                        "UPDATE [SubCategories] "
-                        "SET [SubCategoryCode]=?,[CategoryCode]=?," 
-                        "[SubCategoryDescription]=? "
-                        "WHERE [SubCategoryCode]=?"
-                    )
-                    cur = DatabaseManager.access_connection().cursor()
-                    cur.execute(sql, (new_sub_code, new_parent, new_desc, old_sub_code))
+                    SubCategoryDAO.rename(old_sub_code, new_sub_code, new_parent, new_desc)
 
                     # 2) Rename each inventory item's ID and subcategory_code
                     for itm in InventoryDAO.fetch_all():
@@ -261,7 +288,8 @@ class DBConfigController:
         reply = QMessageBox.question(
             self.view,
             "Delete SubCategory",
-            f"Are you sure you want to delete subcategory '{sub_code}'\nand ALL related items and parameters?",
+            f"Are you sure you want to delete subcategory '{sub_code}'\n"
+            f"and ALL related items ({item.text(1)}) and parameters?",
         )
         if reply != QMessageBox.StandardButton.Yes:
             return
@@ -381,16 +409,38 @@ class DBConfigController:
         if dlg.exec():
             try:
                 # now pass both old and new positions plus new name
-                ParameterDAO.update(
+                renamed = ParameterDAO.update(
                     subcode,
                     old_pos,
                     dlg.pos,
                     dlg.name
                 )
                 self.on_tree_selection()
+                self._report_renamed(renamed)
             except Exception as e:
                 QMessageBox.critical(self.view, "Error", str(e))
 
+    def reorder_parameters(self, new_order: list[int]):
+        """Persist a drag-and-drop reordering of the parameter table."""
+        item = self.view.tree.currentItem()
+        if not item or item.data(0, Qt.ItemDataRole.UserRole)[0] != "sub":
+            return
+        subcode = item.data(0, Qt.ItemDataRole.UserRole)[1]
+        try:
+            renamed = ParameterDAO.reorder(subcode, new_order)
+        except Exception as e:
+            QMessageBox.critical(self.view, "Error", str(e))
+            renamed = 0
+        self.on_tree_selection()
+        self._report_renamed(renamed)
+
+    def _report_renamed(self, n: int):
+        if n:
+            QMessageBox.information(
+                self.view, "Parameters Reordered",
+                f"{n} item ID(s) were rewritten to the new parameter order."
+            )
+
     def delete_parameter(self):
         item = self.view.tree.currentItem()
         if not item or item.data(0, Qt.ItemDataRole.UserRole)[0] != "sub":
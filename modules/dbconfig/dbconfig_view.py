@@ -5,10 +5,11 @@ from PyQt6.QtWidgets import (
     QTreeWidget, QTreeWidgetItem, QPushButton,
     QFormLayout, QLineEdit, QDialog, QDialogButtonBox,
     QComboBox, QTableWidget, QTableWidgetItem,
-    QHeaderView, QSpinBox, QGroupBox, QSplitter
+    QHeaderView, QSpinBox, QGroupBox, QSplitter,
+    QAbstractItemView
 )
 from PyQt6.QtGui import QFont
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 
 
 # ─────────────────────────────────────────────
@@ -160,6 +161,54 @@ class ParameterDialog(QDialog):
         return self._name.text().strip()
 
 
+# ─────────────────────────────────────────────
+# Parameter Table (drag-and-drop reordering)
+# ─────────────────────────────────────────────
+class ParameterTable(QTableWidget):
+    """
+    Parameter grid whose rows can be dragged into a new order.
+    The drop itself is not applied to the widget: the new order of
+    positions is emitted, and the controller persists it and reloads.
+    """
+    orderChanged = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(0, 2, parent)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setDragEnabled(True)
+        self.setAcceptDrops(True)
+        self.viewport().setAcceptDrops(True)
+        self.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
+        self.setDropIndicatorShown(True)
+
+    def positions(self) -> list[int]:
+        return [int(self.item(r, 0).text()) for r in range(self.rowCount())]
+
+    def dropEvent(self, event):
+        src = self.currentRow()
+        if event.source() is not self or src < 0:
+            event.ignore()
+            return
+        target = self.indexAt(event.position().toPoint()).row()
+        indicator = self.dropIndicatorPosition()
+        if target < 0 or indicator == QAbstractItemView.DropIndicatorPosition.OnViewport:
+            target = self.rowCount()
+        elif indicator == QAbstractItemView.DropIndicatorPosition.BelowItem:
+            target += 1
+        # ignore the drop so Qt does not move or remove any cells itself
+        event.ignore()
+
+        order = self.positions()
+        moved = order.pop(src)
+        if target > src:
+            target -= 1
+        order.insert(target, moved)
+        if order != self.positions():
+            self.orderChanged.emit(order)
+
+
 # ─────────────────────────────────────────────
 # DBConfigView Main UI
 # ─────────────────────────────────────────────
@@ -204,8 +253,11 @@ class DBConfigView(QWidget):
 
         # Tree and left-side buttons
         self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["Categories ▶ SubCategories"])
-        self.tree.setColumnCount(1)
+        self.tree.setColumnCount(2)
+        self.tree.setHeaderLabels(["Categories ▶ SubCategories", "Items"])
+        self.tree.header().setStretchLastSection(False)
+        self.tree.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.tree.header().setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
 
         cat_box = QGroupBox("Category Controls")
         cat_layout = QVBoxLayout()
@@ -235,9 +287,9 @@ class DBConfigView(QWidget):
 
         # Right: Parameters
         right_layout = QVBoxLayout()
-        param_label = QLabel("Parameters (Position 1–5):")
+        param_label = QLabel("Parameters (Position 1–5, drag rows to reorder):")
 
-        self.param_table = QTableWidget(0, 2)
+        self.param_table = ParameterTable()
         self.param_table.setHorizontalHeaderLabels(["Position", "Name"])
         self.param_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
 
@@ -279,6 +331,7 @@ class DBConfigView(QWidget):
         self.controller = DBConfigController(self)
 
         self.tree.currentItemChanged.connect(self.controller.on_tree_selection)
+        self.tree.itemExpanded.connect(self.controller.on_tree_expanded)
         self.btn_cat_add.clicked.connect(self.controller.add_category)
         self.btn_cat_edit.clicked.connect(self.controller.edit_category)
         self.btn_cat_delete.clicked.connect(self.controller.delete_category)
@@ -288,6 +341,7 @@ class DBConfigView(QWidget):
         self.btn_par_add.clicked.connect(self.controller.add_parameter)
         self.btn_par_edit.clicked.connect(self.controller.edit_parameter)
         self.btn_par_delete.clicked.connect(self.controller.delete_parameter)
+        self.param_table.orderChanged.connect(self.controller.reorder_parameters)
 
         self.controller.load_tree()
         self.controller.on_tree_selection()
@@ -1,33 +1,39 @@
 # modules/employees/employee_controller.py
 
-from pathlib import Path
 from PyQt6.QtCore import QSettings
-from PyQt6.QtWidgets import QMessageBox, QTableWidgetItem
-from utils.label_printer import print_label
+from PyQt6.QtWidgets import QFileDialog, QMessageBox, QProgressDialog, QTableWidgetItem
+from utils.background import BackgroundTask
+from utils.print_spooler import get_spooler
 from data.access_dao import EmployeeDAO
+from data.loader import load_scope
 
 class EmployeeController:
     def __init__(self, view, current_user):
         self.view = view
         self.current_user = current_user
         self._all_emps = []
+        self._import_task = None
 
     def load_employees(self):
-        # Build the report‐tree under the current user (Admin or Supervisor).
-        report_tree: dict[int, list[User]] = {}
-        to_visit = [self.current_user.user_id]
-
-        while to_visit:
-            sup_id = to_visit.pop()
-            if sup_id in report_tree:
-                continue
-            direct = EmployeeDAO.fetch_by_supervisor(sup_id)
-            report_tree[sup_id] = direct
-            for e in direct:
-                to_visit.append(e.user_id)
-
-        # Always render everyone under the logged-in user
-        self.view.populate_tree(report_tree, self.current_user.user_id)
+        # one query per tree level, and supervisor names shared with the view
+        with load_scope():
+            # Build the report‐tree under the current user (Admin or Supervisor).
+            report_tree: dict[int, list[User]] = {}
+            to_visit = [self.current_user.user_id]
+            reports = EmployeeDAO.reports_loader()
+
+            while to_visit:
+                reports.prime(to_visit)
+                sup_id = to_visit.pop()
+                if sup_id in report_tree:
+                    continue
+                direct = reports.load(sup_id)
+                report_tree[sup_id] = direct
+                for e in direct:
+                    to_visit.append(e.user_id)
+
+            # Always render everyone under the logged-in user
+            self.view.populate_tree(report_tree, self.current_user.user_id)
 
     def on_search_text_changed(self, text: str):
         """Filter employee list as the user types."""
@@ -45,6 +51,8 @@ class EmployeeController:
         """Populate the view’s table with a list of User objects."""
         tbl = self.view._table
         tbl.setRowCount(len(emps))
+        supervisors = EmployeeDAO.loader()
+        supervisors.prime(getattr(e, "supervisor_id", None) for e in emps)
         for r, e in enumerate(emps):
             # Basic columns
             vals = [
@@ -59,54 +67,119 @@ class EmployeeController:
             # Supervisor name (col 5)
             sup_id = getattr(e, "supervisor_id", None)
             if sup_id:
-                sup = EmployeeDAO.fetch_by_id(sup_id)
-                sup_name = f"{sup.first_name} {sup.last_name}"
+                sup = supervisors.load(sup_id)
+                sup_name = f"{sup.first_name} {sup.last_name}" if sup else ""
             else:
                 sup_name = ""
             tbl.setItem(r, 5, QTableWidgetItem(sup_name))
 
     def on_print_label(self):
-        """Print the selected employee’s label from the tree view."""
+        """Queue labels for every selected employee as one print job."""
+        from modules.labels.template_index import get_template_index
         tree = self.view._tree
-        item = tree.currentItem()
-        if item is None:
+        items = tree.selectedItems()
+        if not items:
             QMessageBox.warning(self.view, "Warning", "Please select an employee first.")
             return
 
-        # 1) Build placeholder dict from headers and item columns
-        headers = [
-            tree.headerItem().text(c)
+        # 1) Locate the template through the template index
+        info = get_template_index().default_for("employee")
+        if info is None:
+            tpl_name = QSettings("AlptraumTech", "LMS").value("default_template_employee", "")
+            if not tpl_name:
+                QMessageBox.warning(
+                    self.view,
+                    "Print Failed",
+                    "Please configure an Employee label template first."
+                )
+            else:
+                QMessageBox.critical(
+                    self.view,
+                    "Print Failed",
+                    f"Template file not found:\n{tpl_name}"
+                )
+            return
+
+        # 2) One placeholder dict per selected node, only for the names the
+        #    template uses
+        columns = {
+            tree.headerItem().text(c): c
             for c in range(tree.columnCount())
-        ]
-        placeholder_dict = {
-            headers[i]: item.text(i)
-            for i in range(len(headers))
         }
+        used = [(name, columns[name]) for name in info.placeholders if name in columns]
+        rows = [{name: item.text(c) for name, c in used} for item in items]
 
-        # 2) Locate the template
-        settings = QSettings("AlptraumTech", "LMS")
-        tpl_name = settings.value("default_template_employee", "")
-        if not tpl_name:
-            QMessageBox.warning(
-                self.view,
-                "Print Failed",
-                "Please configure an Employee label template first."
-            )
-            return
+        # 3) Queue the labels; the spooler reports progress in the status bar
+        get_spooler().submit(info.path, rows)
 
-        tpl_path = Path(__file__).resolve().parents[1] / "Templates" / tpl_name
-        if not tpl_path.exists():
-            QMessageBox.critical(
-                self.view,
-                "Print Failed",
-                f"Template file not found:\n{tpl_path}"
-            )
+    # ——— roster import ————————————————————————————————————
+    def on_import(self):
+        """Import employees + permits from an HR roster (dry run first)."""
+        from modules.employees.roster_import import ROSTER_FILTERS, RosterImporter
+        if self._import_task is not None:
+            QMessageBox.information(self.view, "Import", "An import is already running.")
+            return
+        path, _ = QFileDialog.getOpenFileName(self.view, "Import Roster", "", ROSTER_FILTERS)
+        if not path:
             return
-
-        # 3) Print label
         try:
-            print_label(tpl_path, placeholder_dict)
-            QMessageBox.information(self.view, "Success", "Label printed.")
+            importer = RosterImporter(path, self.current_user)
         except Exception as e:
-            QMessageBox.critical(self.view, "Print Failed", str(e))
+            QMessageBox.critical(self.view, "Import Failed", str(e))
+            return
+        self._run_import(importer, dry_run=True)
+
+    def _run_import(self, importer, dry_run: bool):
+        label = "Checking roster…" if dry_run else "Importing employees…"
+        progress = QProgressDialog(label, "Cancel", 0, 0, self.view)
+        progress.setWindowTitle("Import")
+        progress.setMinimumDuration(300)
+
+        task = BackgroundTask(importer.run, dry_run)
+        task.progress.connect(lambda done, total: (
+            progress.setMaximum(total), progress.setValue(done)
+        ))
+        progress.canceled.connect(task.cancel)
+        task.succeeded.connect(lambda report: self._on_import_report(importer, report))
+        task.failed.connect(lambda msg: QMessageBox.critical(self.view, "Import Failed", msg))
+        if not dry_run:
+            task.cancelled.connect(lambda: (
+                QMessageBox.information(
+                    self.view, "Import",
+                    "Import cancelled. Employees committed so far are kept."
+                ),
+                self.load_employees()
+            ))
+        task.finished.connect(progress.reset)
+        task.finished.connect(lambda: self._on_import_finished(task))
+        self._import_task = task
+        task.start()
+
+    def _on_import_finished(self, task):
+        if self._import_task is task:
+            self._import_task = None
+
+    def _on_import_report(self, importer, report):
+        if not report.dry_run:
+            QMessageBox.information(self.view, "Import Finished", report.summary())
+            self.load_employees()
+            return
+
+        box = QMessageBox(self.view)
+        box.setWindowTitle("Roster Import — Dry Run")
+        box.setText(report.summary())
+        do_import = box.addButton(
+            f"Import {report.valid} employees", QMessageBox.ButtonRole.AcceptRole
+        )
+        do_import.setEnabled(report.valid > 0)
+        save_errors = box.addButton("Save Error Report…", QMessageBox.ButtonRole.ActionRole)
+        save_errors.setEnabled(bool(report.errors))
+        box.addButton(QMessageBox.StandardButton.Cancel)
+        box.exec()
 
+        if box.clickedButton() is save_errors:
+            path, _ = QFileDialog.getSaveFileName(self.view, "Save Error Report", "", "CSV Files (*.csv)")
+            if path:
+                report.write_errors(path)
+        elif box.clickedButton() is do_import:
+            self._run_import(importer, dry_run=False)
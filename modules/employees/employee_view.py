@@ -171,16 +171,17 @@ class EmployeeView(QWidget):
         self._btn_add = styled_button("Add")
         self._btn_edit = styled_button("Edit")
         self._btn_del = styled_button("Delete")
+        self._btn_import = styled_button("Import…")
         self.printBtn = styled_button("Print Label")
         self.printBtn.setEnabled(False)
 
-        for btn in [self._btn_add, self._btn_edit, self._btn_del, self.printBtn]:
+        for btn in [self._btn_add, self._btn_edit, self._btn_del, self._btn_import, self.printBtn]:
             btn_bar.addWidget(btn)
         btn_bar.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum))
 
         # Permission-based visibility: only pure EMPLOYEEs cannot modify
         if current_user.user_type == "EMPLOYEE":
-            for btn in (self._btn_add, self._btn_edit, self._btn_del):
+            for btn in (self._btn_add, self._btn_edit, self._btn_del, self._btn_import):
                 btn.setVisible(False)
         # Tree
         self._tree = QTreeWidget()
@@ -192,6 +193,8 @@ class EmployeeView(QWidget):
         for col in range(6):
             self._tree.header().setSectionResizeMode(col, QHeaderView.ResizeMode.Stretch)
         self._tree.setFont(QFont("Segoe UI", 11))
+        # multi-select so a whole team can be printed at once
+        self._tree.setSelectionMode(QTreeWidget.SelectionMode.ExtendedSelection)
 
         # Main layout
         main_layout = QVBoxLayout(self)
@@ -206,28 +209,29 @@ class EmployeeView(QWidget):
         self._btn_add.clicked.connect(self._add)
         self._btn_edit.clicked.connect(self._edit)
         self._btn_del.clicked.connect(self._delete)
+        self._btn_import.clicked.connect(self.controller.on_import)
         self.printBtn.clicked.connect(self.controller.on_print_label)
         self._tree.itemSelectionChanged.connect(self._on_selection_changed)
 
         self.controller.load_employees()
 
     def _on_selection_changed(self, current=None, previous=None):
-        item = self._tree.currentItem()
-        has = item is not None
-        # You can always print any selected node
-        self.printBtn.setEnabled(has)
-        # But if the selected node is the root (current user), disable edit/delete
-        if has and int(item.text(0)) == self._current_user.user_id:
-            self._btn_edit.setEnabled(False)
-            self._btn_del.setEnabled(False)
-        else:
-            self._btn_edit.setEnabled(True)
-            self._btn_del.setEnabled(True)
+        selected = self._tree.selectedItems()
+        # You can always print any selected node(s)
+        self.printBtn.setEnabled(bool(selected))
+        # Edit/delete work on exactly one node, and never on the root (current user)
+        single = len(selected) == 1
+        editable = single and int(selected[0].text(0)) != self._current_user.user_id
+        self._btn_edit.setEnabled(editable)
+        self._btn_del.setEnabled(editable)
 
     def _add(self):
         dlg = _EmployeeDialog(self)
         if dlg.exec():
-            EmployeeDAO.insert(dlg.last, dlg.first, dlg.user_type, dlg.supervisor)
+            EmployeeDAO.insert(
+                dlg.last, dlg.first, dlg.user_type, dlg.supervisor,
+                company_id=self._current_user.company_id
+            )
             self.controller.load_employees()
 
     def _edit(self):
@@ -301,9 +305,12 @@ class EmployeeView(QWidget):
 
         # 2) Create a root item for the current user
         me = self._current_user
+        supervisors = EmployeeDAO.loader()
+        supervisors.prime([me.supervisor_id])
+        supervisors.prime(e.supervisor_id for emps in report_tree.values() for e in emps)
         sup_name = ""
         if me.supervisor_id:
-            mgr = EmployeeDAO.fetch_by_id(me.supervisor_id)
+            mgr = supervisors.load(me.supervisor_id)
             if mgr:
                 sup_name = f"{mgr.first_name} {mgr.last_name}"
 
@@ -327,7 +334,7 @@ class EmployeeView(QWidget):
                 # lookup this employee’s supervisor name
                 name_sup = ""
                 if emp.supervisor_id:
-                    m = EmployeeDAO.fetch_by_id(emp.supervisor_id)
+                    m = supervisors.load(emp.supervisor_id)
                     if m:
                         name_sup = f"{m.first_name} {m.last_name}"
 
@@ -0,0 +1,256 @@
+# modules/employees/roster_import.py
+
+"""
+Bulk employee + permit import from an HR roster (CSV / CSV.GZ / XLSX).
+
+Columns (case-insensitive):
+    External ID   – optional, only used to reference supervisors in the file
+    Last Name, First Name
+    User Type     – EMPLOYEE (default) or SUPERVISOR
+    Supervisor    – External ID or "First Last" of a roster row, or the
+                    UserID / "First Last" of an existing user; empty means
+                    the importing user
+    Permits       – "Name" or "Name:YYYY-MM-DD", separated by ';'
+
+Supervisor references are resolved through in-memory maps and the rows are
+topologically ordered, so every supervisor is inserted before their
+reports. Users and their initial EmployeeSafetyPermissions are written in
+batched transactions; problems are collected per row instead of aborting.
+"""
+
+import csv
+import datetime
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from data.access_dao import EmployeeDAO, SafetyDAO, User
+from data.database import DatabaseManager
+from utils.spreadsheet import cell, iter_rows
+
+ROSTER_FILTERS = "Spreadsheets (*.csv *.csv.gz *.xlsx);;All Files (*)"
+USER_TYPES = ("EMPLOYEE", "SUPERVISOR")
+
+# users per transaction
+CHUNK_SIZE = 200
+
+# same ceiling SafetyController.on_assign enforces
+MAX_PERMIT_DAYS = 366
+
+
+@dataclass
+class _RosterRow:
+    line: int
+    ext_id: str
+    last: str
+    first: str
+    user_type: str
+    supervisor_ref: str
+    permits: list[tuple[int, datetime.datetime | None]]
+    parent: "_RosterRow | int | None" = None   # roster row or existing UserID
+    user_id: int | None = None
+
+
+@dataclass
+class RosterReport:
+    dry_run: bool
+    rows: int = 0
+    valid: int = 0
+    inserted: int = 0
+    permits: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+    def summary(self) -> str:
+        lines = [
+            f"Rows read:  {self.rows}",
+            f"Valid:      {self.valid}",
+            f"Errors:     {len(self.errors)}",
+        ]
+        if not self.dry_run:
+            lines.append(f"Inserted:   {self.inserted} users, {self.permits} permits")
+        if self.errors:
+            lines.append("")
+            lines += [f"Row {n}: {msg}" for n, msg in self.errors[:15]]
+            if len(self.errors) > 15:
+                lines.append(f"… and {len(self.errors) - 15} more")
+        return "\n".join(lines)
+
+    def write_errors(self, path: str) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["Row", "Error"])
+            w.writerows(self.errors)
+
+
+def _name_key(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class RosterImporter:
+    def __init__(self, path: str, current_user: User):
+        self.path = Path(path)
+        self.current_user = current_user
+        self._actor = current_user.user_type.upper()
+        users = EmployeeDAO.fetch_all()
+        self._existing_ids = {u.user_id for u in users}
+        self._existing_names = {
+            _name_key(f"{u.first_name} {u.last_name}"): u.user_id for u in users
+        }
+        self._types = {_name_key(t.name): t.permission_id for t in SafetyDAO.fetch_all_types()}
+        # non-admins may only hand out permits they hold, up to their expiry
+        self._held = {}
+        if self._actor != "ADMIN":
+            self._held = {
+                p.permit_id: p.expire_date
+                for p in SafetyDAO.fetch_by_user(current_user.user_id)
+            }
+
+    # ——— parsing ———————————————————————————————————————————
+    def _parse_permits(self, raw: str, issue: datetime.datetime):
+        permits = []
+        for entry in filter(None, (e.strip() for e in raw.split(";"))):
+            name, _, date_raw = entry.partition(":")
+            pid = self._types.get(_name_key(name))
+            if pid is None:
+                raise ValueError(f"unknown permit type '{name.strip()}'")
+            expire = None
+            if date_raw.strip():
+                try:
+                    expire = datetime.datetime.fromisoformat(date_raw.strip())
+                except ValueError:
+                    raise ValueError(f"bad permit expiry '{date_raw.strip()}'") from None
+                if (expire - issue).days > MAX_PERMIT_DAYS:
+                    raise ValueError(f"permit '{name.strip()}' exceeds {MAX_PERMIT_DAYS} days")
+            if self._actor != "ADMIN":
+                if pid not in self._held:
+                    raise ValueError(f"you do not hold permit '{name.strip()}'")
+                own = self._held[pid]
+                if own is not None and (expire is None or expire > own):
+                    raise ValueError(f"permit '{name.strip()}' outlasts your own")
+            permits.append((pid, expire))
+        return permits
+
+    def _parse(self, issue: datetime.datetime, report: RosterReport) -> list[_RosterRow]:
+        rows = []
+        for n, raw in iter_rows(self.path):
+            report.rows += 1
+            try:
+                last, first = cell(raw, "lastname"), cell(raw, "firstname")
+                if not last and not first:
+                    raise ValueError("missing name")
+                utype = (cell(raw, "usertype") or "EMPLOYEE").upper()
+                if utype not in USER_TYPES:
+                    raise ValueError(f"bad user type '{utype}'")
+                rows.append(_RosterRow(
+                    line=n,
+                    ext_id=cell(raw, "externalid"),
+                    last=last,
+                    first=first,
+                    user_type=utype,
+                    supervisor_ref=cell(raw, "supervisor"),
+                    permits=self._parse_permits(cell(raw, "permits"), issue),
+                ))
+            except ValueError as e:
+                report.errors.append((n, str(e)))
+        return rows
+
+    # ——— supervisor resolution ————————————————————————————
+    def _resolve(self, rows: list[_RosterRow], report: RosterReport) -> list[_RosterRow]:
+        """Link each row to its supervisor; return rows in insertion order."""
+        by_ext = {r.ext_id: r for r in rows if r.ext_id}
+        by_name = {_name_key(f"{r.first} {r.last}"): r for r in rows}
+
+        ok = []
+        for r in rows:
+            ref = r.supervisor_ref
+            key = _name_key(ref)
+            if not ref:
+                r.parent = self.current_user.user_id
+            elif ref in by_ext:
+                r.parent = by_ext[ref]
+            elif key in by_name:
+                r.parent = by_name[key]
+            elif ref.isdigit() and int(ref) in self._existing_ids:
+                r.parent = int(ref)
+            elif key in self._existing_names:
+                r.parent = self._existing_names[key]
+            else:
+                report.errors.append((r.line, f"unknown supervisor '{ref}'"))
+                continue
+            if isinstance(r.parent, _RosterRow) and r.parent.user_type != "SUPERVISOR":
+                report.errors.append((r.line, f"supervisor '{ref}' is not a SUPERVISOR"))
+                continue
+            ok.append(r)
+
+        # Kahn's algorithm over roster-internal edges
+        ok_ids = {id(r) for r in ok}
+        reports: dict[int, list[_RosterRow]] = {}
+        pending: dict[int, int] = {}
+        ready = deque()
+        for r in ok:
+            if isinstance(r.parent, _RosterRow):
+                reports.setdefault(id(r.parent), []).append(r)
+                pending[id(r)] = 1
+            else:
+                ready.append(r)
+        ordered = []
+        while ready:
+            r = ready.popleft()
+            ordered.append(r)
+            for child in reports.get(id(r), []):
+                pending[id(child)] -= 1
+                if not pending[id(child)]:
+                    ready.append(child)
+
+        # anything left either sits in a cycle or under a rejected supervisor
+        placed = {id(r) for r in ordered}
+        for r in ok:
+            if id(r) not in placed:
+                why = ("supervisor row was rejected"
+                       if id(r.parent) not in ok_ids else "circular supervisor chain")
+                report.errors.append((r.line, why))
+        return ordered
+
+    # ——— run ———————————————————————————————————————————————
+    def run(self, task=None, dry_run: bool = True) -> RosterReport:
+        report = RosterReport(dry_run=dry_run)
+        issue = datetime.datetime.now()
+        ordered = self._resolve(self._parse(issue, report), report)
+        report.valid = len(ordered)
+        report.errors.sort()
+        if dry_run or not ordered:
+            return report
+
+        company_id = self.current_user.company_id
+        issuer = self.current_user.user_id
+        conn = DatabaseManager.new_access_connection()
+        try:
+            for start in range(0, len(ordered), CHUNK_SIZE):
+                chunk = ordered[start:start + CHUNK_SIZE]
+                permits = []
+                try:
+                    with DatabaseManager.transaction(conn) as cur:
+                        for r in chunk:
+                            sup = r.parent.user_id if isinstance(r.parent, _RosterRow) else r.parent
+                            r.user_id = EmployeeDAO.insert(
+                                r.last, r.first, r.user_type, sup, company_id, cur=cur
+                            )
+                            permits += [
+                                (r.user_id, pid, issuer, issue, expire)
+                                for pid, expire in r.permits
+                            ]
+                        SafetyDAO.add_permits(permits, cur)
+                except Exception as e:
+                    # the chunk rolled back; later rows may depend on it
+                    for r in ordered[start:]:
+                        r.user_id = None
+                        report.errors.append((r.line, f"not imported: {e}"))
+                    break
+                report.inserted += len(chunk)
+                report.permits += len(permits)
+                if task is not None:
+                    task.report(report.inserted, len(ordered))
+                    task.check_cancelled()
+        finally:
+            conn.close()
+        return report
@@ -0,0 +1,115 @@
+# modules/inventory/facets.py
+
+"""
+Facet indexes for the inventory page.
+
+The index works on an ItemStore: slot n is store row n. For each facet
+(category, subcategory, status, location, holder) it keeps one Python int
+per value whose set bits are the rows with that value. Filtering is then a
+few big-int ORs (values inside a facet) and ANDs (across facets), and a
+count is int.bit_count() of a mask - no pass over the items.
+
+Values are keyed by their stripped text (holder: the UserID), so "A1" and
+"A1 " are one location, and since the keys do not depend on the store's
+pool codes a selection survives a refresh. Blank values all file under a
+falsy key ("" or 0), shown as "(none)".
+
+Counts follow the usual faceted-search rule: a facet's counts apply every
+selection except its own, so picking "In Use" still shows how many items
+each other status would give.
+
+remove(row) / add(row) move single bits, so a checkout or an edit does not
+rebuild anything; call remove before the store row changes, add after.
+"""
+
+from __future__ import annotations
+from typing import Callable
+
+from modules.inventory.item_store import ItemStore
+
+FACETS = ("category", "subcategory", "status", "location", "holder")
+FACET_TITLES = {
+    "category": "Category", "subcategory": "Subcategory", "status": "Status",
+    "location": "Location", "holder": "Holder",
+}
+# store column behind each pooled facet
+_COLUMNS = {
+    "category": "category_code", "subcategory": "subcategory_code",
+    "status": "status", "location": "location",
+}
+NONE_LABEL = "(none)"
+
+# stripped value for pooled facets, UserID for "holder"
+FacetKey = int | str
+
+
+class FacetIndex:
+    def __init__(self, store: ItemStore, holder_name: Callable[[int], str] | None = None):
+        self._store = store
+        self._holder_name = holder_name or str
+        self._bits: dict[str, dict[FacetKey, int]] = {f: {} for f in FACETS}
+
+    def _key(self, facet: str, row: int) -> FacetKey:
+        if facet == "holder":
+            return self._store.value("holder_id", row) or 0
+        value = self._store.value(_COLUMNS[facet], row)
+        return str(value).strip() if value is not None else ""
+
+    def label(self, facet: str, key: FacetKey) -> str:
+        if not key:
+            return NONE_LABEL
+        if facet == "holder":
+            return self._holder_name(key)
+        return key
+
+    # ——— maintenance ———————————————————————————————————————
+    def build(self) -> None:
+        self._bits = {f: {} for f in FACETS}
+        for row in self._store.rows():
+            self.add(row)
+
+    def add(self, row: int) -> None:
+        bit = 1 << row
+        for facet in FACETS:
+            values = self._bits[facet]
+            key = self._key(facet, row)
+            values[key] = values.get(key, 0) | bit
+
+    def remove(self, row: int) -> None:
+        bit = 1 << row
+        for facet in FACETS:
+            values = self._bits[facet]
+            key = self._key(facet, row)
+            if key in values:
+                values[key] &= ~bit
+                if not values[key]:
+                    del values[key]
+
+    # ——— queries ———————————————————————————————————————————
+    def _facet_mask(self, facet: str, chosen: set[FacetKey]) -> int:
+        values = self._bits[facet]
+        mask = 0
+        for key in chosen:
+            mask |= values.get(key, 0)
+        return mask
+
+    def select(self, selection: dict[str, set[FacetKey]], base: int | None = None) -> int:
+        """Mask of the rows matching every facet selection (and base)."""
+        alive = self._store.alive
+        mask = alive if base is None else base & alive
+        for facet, chosen in selection.items():
+            if chosen:
+                mask &= self._facet_mask(facet, chosen)
+        return mask
+
+    def counts(self, selection: dict[str, set[FacetKey]], base: int | None = None) -> dict[str, dict[FacetKey, int]]:
+        """Per facet, key -> number of rows if that value were picked."""
+        result = {}
+        for facet in FACETS:
+            others = {f: v for f, v in selection.items() if f != facet}
+            mask = self.select(others, base)
+            result[facet] = {
+                key: n for key, bits in self._bits[facet].items()
+                if (n := (bits & mask).bit_count())
+            }
+        return result
@@ -1,28 +1,99 @@
-import csv
-
-from utils.label_printer import print_label
+from utils.print_spooler import get_spooler
+from utils.background import BackgroundTask
+from utils.thumbnails import get_thumbnails
+from utils.attachments import get_attachment_status
+from utils.attachment_store import get_attachment_store
+from modules.inventory.search_index import get_search_index
+from modules.inventory.facets import FacetIndex
+from modules.inventory.item_details import DetailCache
+from modules.inventory.item_model import HEADERS, ItemTableModel
+from modules.inventory.item_store import ItemStore
 
 from PyQt6.QtWidgets import (
-    QMessageBox, QFileDialog, QDialog, QLabel, QPushButton, QDialogButtonBox, QFormLayout
+    QMessageBox, QFileDialog, QDialog, QLabel, QPushButton, QDialogButtonBox, QFormLayout,
+    QProgressDialog, QApplication
 )
 from PyQt6.QtGui     import QPixmap, QDesktopServices
-from PyQt6.QtCore    import Qt, QUrl, QSettings
+from PyQt6.QtCore    import Qt, QUrl, QSettings, QTimer
 from pathlib         import Path
-from data.access_dao import InventoryDAO, Item, ItemSafetyRequirementDAO, SafetyDAO, EmployeeDAO
+from data.access_dao import InventoryDAO, Item, ItemSummary, ItemSafetyRequirementDAO, SafetyDAO, EmployeeDAO
+from data.database import DatabaseManager, WorkerConnection
+
+# rows fetched on the UI thread before the table first shows
+FIRST_PAGE = 200
+# keyset page size for the background loader
+PAGE_SIZE = 2000
+# rows either side of the selection whose full details are fetched ahead
+PREFETCH_AROUND = 3
+# ms of typing pause before descriptions are searched in Access
+DESCRIPTION_SEARCH_DELAY = 300
+
+
+def _load_pages(task, after_item_id: str):
+    """BackgroundTask body: stream the remaining items page by page."""
+    conn = DatabaseManager.new_access_connection()
+    try:
+        while True:
+            task.check_cancelled()
+            page = InventoryDAO.fetch_summary_page(after_item_id, PAGE_SIZE, conn)
+            if not page:
+                return
+            task.emit_partial(page)
+            after_item_id = page[-1].item_id
+    finally:
+        conn.close()
+
+
+def _ids_with_description(task, worker: WorkerConnection, text: str) -> list[str]:
+    """BackgroundTask body: description LIKE search while the index is not ready."""
+    with worker.connection() as conn:
+        return InventoryDAO.ids_with_description(text, conn)
 
 
 def open_file(path: str):
-    if Path(path).exists():
-        QDesktopServices.openUrl(QUrl.fromLocalFile(path))
+    try:
+        local = get_attachment_store().local_path(path)
+    except OSError as e:
+        QMessageBox.critical(None, "Error", f"Could not fetch {path}:\n{e}")
+        return
+    if Path(local).exists():
+        QDesktopServices.openUrl(QUrl.fromLocalFile(local))
     else:
+        get_attachment_status().invalidate(path)
         QMessageBox.critical(None, "Error", f"File not found: {path}")
 
 class InventoryController:
     def __init__(self, view):
         # When user double‐clicks a cell, show all item details
         self.view = view
-        self.view.table.cellDoubleClicked.connect(self.on_show_details)
-        self._all = []  # 缓存所有物品列表
+        # 所有物品的列式缓存；表格、筛选、搜索和导出都从这里读取
+        self.store = ItemStore()
+        self._holders: dict[int, str] = {}
+        self.facets = FacetIndex(self.store, self._holder_name)
+        self.model = ItemTableModel(self.store, self._holder_name, view)
+        self.view.table.setModel(self.model)
+        self.view.table.doubleClicked.connect(lambda idx: self.on_show_details(idx.row(), idx.column()))
+        # 详情对话框用的完整记录，随选中行提前加载
+        self.details = DetailCache()
+        self.view.table.selectionModel().currentRowChanged.connect(self._prefetch_details)
+        self._text_mask = None      # items matching the search box (None = all)
+        self._search_text = ""
+        self._description_hits: list[str] = []
+        self._ranked = None         # full-text result order, when active
+        self._safety: dict[str, tuple[str, ...]] = {}
+        self._load_task = None      # background loader for pages after the first
+        self._export_task = None
+        self._import_task = None
+        self._index_task = None
+        self._index_dirty = False
+        self._index_ready = False   # search index holds every description
+        # Access fallback for description search, run once typing pauses
+        self._description_task = None
+        self._description_worker = WorkerConnection()
+        self._description_timer = QTimer(self.view)
+        self._description_timer.setSingleShot(True)
+        self._description_timer.setInterval(DESCRIPTION_SEARCH_DELAY)
+        self._description_timer.timeout.connect(self._search_descriptions)
         # QSettings 用于读取用户在 Templates 页面中保存的默认模板
         self.settings = QSettings("AlptraumTech", "LMS")
         # Templates 目录（请根据项目目录结构确认路径）
@@ -32,25 +103,240 @@ class InventoryController:
 
     def load_items(self):
         """从数据库获取所有物品并刷新视图"""
-        self._all = InventoryDAO.fetch_all()
-        self.view.refresh(self._all)
+        if self._load_task is not None:
+            # the task keeps itself alive until its thread has stopped
+            self._load_task.cancel()
+            self._load_task = None
+        self._holders = {
+            u.user_id: f"{u.first_name} {u.last_name}" for u in EmployeeDAO.iter_all()
+        }
+        self._safety = self._safety_names()
+        self.details.invalidate()
+        # first page now, the rest streams in behind it
+        first = InventoryDAO.fetch_summary_page(None, FIRST_PAGE)
+        self.store.load(first, self._safety)
+        self.facets.build()
+        # rows were renumbered, so the search mask is rebuilt too
+        self.on_search(self.view.searchEdit.text())
+        if len(first) < FIRST_PAGE:
+            self._sync_search_index()
+            return
+        task = BackgroundTask(_load_pages, first[-1].item_id)
+        task.partial.connect(lambda page, t=task: self._on_page_loaded(t, page))
+        task.succeeded.connect(lambda _, t=task: self._on_load_done(t))
+        task.failed.connect(lambda msg, t=task: self._on_load_failed(t, msg))
+        task.finished.connect(lambda t=task: self._on_load_finished(t))
+        self._load_task = task
+        task.start()
+
+    def _on_page_loaded(self, task, page: list[ItemSummary]):
+        """Append a background page and show the rows that pass the filters."""
+        if task is not self._load_task:
+            return                  # page from a load that was superseded
+        added = self.store.extend(page, self._safety)
+        for row in added:
+            self.facets.add(row)
+        new = self.store.mask(added)
+        if self._ranked is not None:
+            # full-text order spans all rows, so re-sort the whole view
+            self._text_mask |= self.store.mask_of(self._ranked) & new
+            self.apply_filters()
+            return
+        if self._text_mask is not None:
+            self._text_mask |= new & (
+                self.store.where_contains(self._search_text, within=new)
+                | self.store.mask_of(self._description_hits)
+            )
+        selection = self.view.selected_facets()
+        self.view.append_rows(self.store.rows(self.facets.select(selection, self._text_mask) & new))
+        self.view.set_facets(
+            self.facets.counts(selection, self._text_mask), selection, self.facets.label
+        )
+        self._show_count()
+
+    def _on_load_done(self, task):
+        if task is self._load_task:
+            self._sync_search_index()
+
+    def _on_load_failed(self, task, msg: str):
+        if task is self._load_task:
+            QMessageBox.critical(self.view, "Load Failed", msg)
+
+    def _on_load_finished(self, task):
+        # after succeeded, failed or cancelled alike
+        if task is self._load_task:
+            self._load_task = None
+            self._show_count()
+
+    def _show_count(self):
+        loading = " — loading…" if self._load_task is not None else ""
+        self.view.countLabel.setText(f"{self.model.rowCount()} of {len(self.store)} items{loading}")
+
+    def _holder_name(self, uid: int) -> str:
+        return self._holders.get(uid, str(uid))
+
+    def _prefetch_details(self, current, _previous=None):
+        """Fetch full rows for the selected row and its neighbours."""
+        if not current.isValid():
+            return
+        n = self.model.rowCount()
+        lo = max(0, current.row() - PREFETCH_AROUND)
+        hi = min(n, current.row() + PREFETCH_AROUND + 1)
+        # the selected row first, so it is in the first batch
+        rows = [current.row()] + [r for r in range(lo, hi) if r != current.row()]
+        self.details.prefetch([self.model.item_id(r) for r in rows])
+
+    @staticmethod
+    def _safety_names() -> dict[str, tuple[str, ...]]:
+        """ItemID -> required permit names, in two queries."""
+        type_map = {t.permission_id: t.name for t in SafetyDAO.fetch_all_types()}
+        return {
+            iid: tuple(type_map.get(pid, str(pid)) for pid in pids)
+            for iid, pids in ItemSafetyRequirementDAO.fetch_all().items()
+        }
+
+    def _item_changed(self, itm: Item, text_changed: bool = False):
+        """Re-file one updated item instead of reloading everything."""
+        row = self.store.row_of(itm.item_id)
+        if row is None:
+            # not streamed in yet: its page will carry the new values
+            if self._load_task is None:
+                self.load_items()
+            return
+        self.details.invalidate(itm.item_id)
+        self.details.put(itm)
+        self.facets.remove(row)
+        self.store.update(itm)
+        self.facets.add(row)
+        self.model.row_changed(row)
+        if text_changed:
+            # searchable right away; a sync only for a new manual or SOP
+            index = get_search_index()
+            if not index.put(itm):
+                task = BackgroundTask(index.sync, [itm])
+                task.succeeded.connect(self._on_item_indexed)
+                task.start()
+            self.on_search(self.view.searchEdit.text())
+        else:
+            self.apply_filters()
+
+    def _sync_search_index(self):
+        """Incrementally update the full-text index in the background."""
+        index = get_search_index()
+        if not index.available:
+            self.view.docSearchCheck.setEnabled(False)
+            return
+        if self._index_task is not None:
+            self._index_dirty = True    # run again once the current pass ends
+            return
+        # sync reads the full rows itself; the store only has summaries
+        task = BackgroundTask(index.sync)
+        task.succeeded.connect(self._on_index_synced)
+        task.finished.connect(self._on_index_finished)
+        self._index_task = task
+        task.start()
+
+    def _on_index_synced(self, changed: int):
+        # the plain search reads descriptions from the index too
+        if changed or not self._index_ready:
+            self._index_ready = True
+            if self._search_text:
+                self.on_search(self.view.searchEdit.text())
+
+    def _on_item_indexed(self, changed: int):
+        if changed and self.view.docSearchCheck.isChecked() and self._search_text:
+            self.on_search(self.view.searchEdit.text())
+
+    def _on_index_finished(self):
+        self._index_task = None
+        if self._index_dirty:
+            self._index_dirty = False
+            self._sync_search_index()
 
     def on_search(self, text: str):
         """根据搜索框文本过滤物品"""
         t = text.strip().lower()
+        self._search_text = t
+        self._description_hits = []
+        self._ranked = None
         if not t:
-            filtered = self._all
+            self._text_mask = None
+        elif self.view.docSearchCheck.isChecked():
+            # ranked full-text search, best match first
+            self._ranked = get_search_index().search(t)
+            self._text_mask = self.store.mask_of(self._ranked)
         else:
-            filtered = [
-                itm for itm in self._all
-                if t in itm.item_id.lower() or t in itm.description.lower()
-            ]
-        self.view.refresh(filtered)
+            # descriptions are not in the store: match them in the search index
+            index = get_search_index()
+            if not self._index_ready and index.has_synced():
+                self._index_ready = True
+            if self._index_ready:
+                self._description_hits = index.contains(t)
+            else:
+                # not indexed yet: scan Access in the background once typing pauses
+                self._description_timer.start()
+            self._text_mask = (
+                self.store.where_contains(t) | self.store.mask_of(self._description_hits)
+            )
+        self.apply_filters()
+
+    def _search_descriptions(self):
+        t = self._search_text
+        if not t or self._ranked is not None or self._index_ready:
+            return
+        if self._description_task is not None:
+            self._description_timer.start()     # try again after this scan
+            return
+        task = BackgroundTask(_ids_with_description, self._description_worker, t)
+        task.succeeded.connect(lambda ids, text=t: self._on_descriptions(text, ids))
+        task.finished.connect(self._on_descriptions_finished)
+        self._description_task = task
+        task.start()
+
+    def _on_descriptions(self, text: str, ids: list[str]):
+        if text != self._search_text or self._ranked is not None:
+            return                  # the search box moved on
+        self._description_hits = ids
+        self._text_mask = self.store.where_contains(text) | self.store.mask_of(ids)
+        self.apply_filters()
+
+    def _on_descriptions_finished(self):
+        self._description_task = None
+
+    def apply_filters(self):
+        """Intersect the search box with the facet selection; refresh counts."""
+        selection = self.view.selected_facets()
+        mask = self.facets.select(selection, self._text_mask)
+        rows = self.store.rows(mask)
+        if self._ranked is not None:
+            rank = {item_id: i for i, item_id in enumerate(self._ranked)}
+            rows.sort(key=lambda r: rank[self.store.value("item_id", r)])
+        self.view.show_rows(rows)
+        self.view.set_facets(
+            self.facets.counts(selection, self._text_mask), selection, self.facets.label
+        )
+        self._show_count()
+
+    def _store_attachments(self, dlg) -> tuple | None:
+        """Copy newly picked files into the attachment store; None on failure."""
+        store = get_attachment_store()
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            return tuple(store.ingest_value(v) for v in (dlg.manual, dlg.sop, dlg.image))
+        except OSError as e:
+            QMessageBox.critical(self.view, "Attachments", f"Could not store attachment:\n{e}")
+            return None
+        finally:
+            QApplication.restoreOverrideCursor()
 
     def on_add(self):
         from modules.inventory.inventory_view import ItemDialog
         dlg = ItemDialog(self.view)
         if dlg.exec():
+            refs = self._store_attachments(dlg)
+            if refs is None:
+                return
+            manual, sop, image = refs
             new = Item(
                 item_id=dlg.item_id,
                 category_code=dlg.category_code,
@@ -60,9 +346,9 @@ class InventoryController:
                 status=dlg.status,
                 holder_id=None,
                 location=dlg.location,
-                manual_path=dlg.manual,
-                sop_path=dlg.sop,
-                image_path=dlg.image,
+                manual_path=manual,
+                sop_path=sop,
+                image_path=image,
                 price=dlg.price
             )
             InventoryDAO.insert(new)
@@ -76,6 +362,10 @@ class InventoryController:
         existing = InventoryDAO.fetch_by_id(iid)
         dlg = ItemDialog(self.view, existing)
         if dlg.exec():
+            refs = self._store_attachments(dlg)
+            if refs is None:
+                return
+            manual, sop, image = refs
             new_id = dlg.item_id
             if new_id != existing.item_id:
                 if InventoryDAO.fetch_by_id(new_id):
@@ -91,9 +381,9 @@ class InventoryController:
                     status=dlg.status,
                     holder_id=existing.holder_id,
                     location=dlg.location,
-                    manual_path=dlg.manual,
-                    sop_path=dlg.sop,
-                    image_path=dlg.image,
+                    manual_path=manual,
+                    sop_path=sop,
+                    image_path=image,
                     price=dlg.price
                 )
                 InventoryDAO.insert(new_item)
@@ -106,11 +396,13 @@ class InventoryController:
                 existing.quantity         = dlg.qty
                 existing.status           = dlg.status
                 existing.location         = dlg.location
-                existing.manual_path      = dlg.manual
-                existing.sop_path         = dlg.sop
-                existing.image_path       = dlg.image
+                existing.manual_path      = manual
+                existing.sop_path         = sop
+                existing.image_path       = image
                 existing.price            = dlg.price
                 InventoryDAO.update(existing)
+                self._item_changed(existing, text_changed=True)
+                return
             self.load_items()
 
     def on_delete(self):
@@ -140,7 +432,7 @@ class InventoryController:
         itm.status    = "In Use"
         itm.holder_id = self.view._current_user.user_id
         InventoryDAO.update(itm)
-        self.load_items()
+        self._item_changed(itm)
 
     def on_return(self):
         iid = self.view._current_item_id()
@@ -153,27 +445,108 @@ class InventoryController:
         itm.status    = "In Stock"
         itm.holder_id = None
         InventoryDAO.update(itm)
-        self.load_items()
+        self._item_changed(itm)
 
     def on_export(self):
-        """导出当前列表为 CSV"""
-        path, _ = QFileDialog.getSaveFileName(self.view, "Export CSV", "", "CSV Files (*.csv)")
+        """导出库存清单（CSV / CSV.GZ / XLSX），在后台线程中流式写出"""
+        from modules.inventory.inventory_export import EXPORT_FILTERS, export_inventory
+        if self._export_task is not None:
+            QMessageBox.information(self.view, "Export", "An export is already running.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self.view, "Export Inventory", "", EXPORT_FILTERS)
         if not path:
             return
-        header = [
-            "Item ID", "Category", "Subcategory", "Location", "Quantity", "Status",
-            "Param1", "Param2", "Param3", "Param4", "Param5", "Price"
-        ]
-        with open(path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(header)
-            for itm in self._all:
-                parts  = itm.item_id.split('-')
-                params = parts[2:2+5] + [""] * (5 - max(0, len(parts)-2))
-                row = [itm.item_id, itm.category_code, itm.subcategory_code,
-                       itm.location, itm.quantity, itm.status, *params, itm.price or ""]
-                writer.writerow(row)
-        QMessageBox.information(self.view, "Exported", f"Saved to {path}.")
+
+        progress = QProgressDialog("Exporting inventory…", "Cancel", 0, 0, self.view)
+        progress.setWindowTitle("Export")
+        progress.setMinimumDuration(300)
+
+        # export exactly what the table shows, in display order
+        item_ids = [self.store.value("item_id", r) for r in self.model.shown_rows()]
+        task = BackgroundTask(export_inventory, path, item_ids)
+        task.progress.connect(lambda done, total: (
+            progress.setMaximum(total), progress.setValue(done)
+        ))
+        progress.canceled.connect(task.cancel)
+        task.succeeded.connect(lambda n: QMessageBox.information(
+            self.view, "Exported", f"Saved {n} items to {path}."
+        ))
+        task.failed.connect(lambda msg: QMessageBox.critical(self.view, "Export Failed", msg))
+        task.finished.connect(progress.reset)
+        task.finished.connect(self._on_export_finished)
+        self._export_task = task
+        task.start()
+
+    def _on_export_finished(self):
+        self._export_task = None
+
+    def on_import(self):
+        """批量导入：先 dry run 校验，确认后分批写入数据库"""
+        from modules.inventory.inventory_import import IMPORT_FILTERS, ItemImporter
+        if self._import_task is not None:
+            QMessageBox.information(self.view, "Import", "An import is already running.")
+            return
+        path, _ = QFileDialog.getOpenFileName(self.view, "Import Items", "", IMPORT_FILTERS)
+        if not path:
+            return
+        try:
+            importer = ItemImporter(path)
+        except Exception as e:
+            QMessageBox.critical(self.view, "Import Failed", str(e))
+            return
+        self._run_import(importer, dry_run=True)
+
+    def _run_import(self, importer, dry_run: bool):
+        label = "Checking rows…" if dry_run else "Importing items…"
+        progress = QProgressDialog(label, "Cancel", 0, 0, self.view)
+        progress.setWindowTitle("Import")
+        progress.setMinimumDuration(300)
+
+        task = BackgroundTask(importer.run, dry_run)
+        task.progress.connect(lambda done, _total: progress.setLabelText(f"{label} {done} rows"))
+        progress.canceled.connect(task.cancel)
+        task.succeeded.connect(lambda report: self._on_import_report(importer, report))
+        task.failed.connect(lambda msg: QMessageBox.critical(self.view, "Import Failed", msg))
+        if not dry_run:
+            task.cancelled.connect(lambda: QMessageBox.information(
+                self.view, "Import",
+                "Import cancelled. Committed rows are kept; importing the same "
+                "file again resumes after them."
+            ))
+        task.finished.connect(progress.reset)
+        task.finished.connect(lambda: self._on_import_finished(task))
+        self._import_task = task
+        task.start()
+
+    def _on_import_finished(self, task):
+        # the dry run's report handler may already have started the real run
+        if self._import_task is task:
+            self._import_task = None
+
+    def _on_import_report(self, importer, report):
+        if not report.dry_run:
+            QMessageBox.information(self.view, "Import Finished", report.summary())
+            self.load_items()
+            return
+
+        box = QMessageBox(self.view)
+        box.setWindowTitle("Import — Dry Run")
+        box.setText(report.summary())
+        do_import = box.addButton(
+            f"Import {report.valid} items", QMessageBox.ButtonRole.AcceptRole
+        )
+        do_import.setEnabled(report.valid > 0)
+        save_errors = box.addButton("Save Error Report…", QMessageBox.ButtonRole.ActionRole)
+        save_errors.setEnabled(bool(report.errors))
+        box.addButton(QMessageBox.StandardButton.Cancel)
+        box.exec()
+
+        if box.clickedButton() is save_errors:
+            path, _ = QFileDialog.getSaveFileName(self.view, "Save Error Report", "", "CSV Files (*.csv)")
+            if path:
+                report.write_errors(path)
+        elif box.clickedButton() is do_import:
+            self._run_import(importer, dry_run=False)
 
     def open_check_dialog(self):
         """Open the Check-In/Out dialog for continuous scanning."""
@@ -181,7 +554,15 @@ class InventoryController:
         dlg = CheckDialog(self.view)
         # When Enter (or scanner newline) is detected, process and stay open
         dlg.id_input.returnPressed.connect(lambda: self.process_check(dlg))
+        # connected once; each scan only swaps the paths they open
+        dlg.manual_btn.clicked.connect(lambda: open_file(dlg.manual_path))
+        dlg.sop_btn.clicked.connect(lambda: open_file(dlg.sop_path))
+        thumbs, status = get_thumbnails(), get_attachment_status()
+        thumbs.ready.connect(dlg.set_thumbnail)
+        status.resolved.connect(dlg.set_attachment)
         dlg.exec()
+        thumbs.ready.disconnect(dlg.set_thumbnail)
+        status.resolved.disconnect(dlg.set_attachment)
 
     def process_check(self, dlg):
         """Process check-in/check-out input continuously and update database immediately."""
@@ -211,29 +592,24 @@ class InventoryController:
         dlg.info_fields['description'].setText(itm.description)
         dlg.info_fields['price'].setText(str(itm.price) if itm.price else "")
 
-        # Manual button
-        if itm.manual_path and Path(itm.manual_path).exists():
-            dlg.manual_btn.show()
-            dlg.manual_btn.clicked.connect(lambda _, p=itm.manual_path: open_file(p))
-        else:
-            dlg.manual_btn.hide()
-
-        # SOP button
-        if itm.sop_path and Path(itm.sop_path).exists():
-            dlg.sop_btn.show()
-            dlg.sop_btn.clicked.connect(lambda _, p=itm.sop_path: open_file(p))
-        else:
-            dlg.sop_btn.hide()
-
-        # Image
-        if itm.image_path and Path(itm.image_path).exists():
-            # Use the correct AspectRatioMode enum
-            pix = QPixmap(itm.image_path).scaled(
-                256, 256, Qt.AspectRatioMode.KeepAspectRatio
-            )
-            dlg.image_label.setPixmap(pix)
-        else:
-            dlg.image_label.clear()
+        # Manual / SOP buttons: shown once the file is known to exist,
+        # dlg.set_attachment handles answers that arrive after the scan
+        dlg.manual_path = itm.manual_path or ""
+        dlg.sop_path = itm.sop_path or ""
+        status = get_attachment_status()
+        for path in (dlg.manual_path, dlg.sop_path):
+            if path:
+                exists = status.check(path)
+                if exists is not None:
+                    dlg.set_attachment(path, exists)
+
+        # Image: decoded off the UI thread, dlg.set_thumbnail fills it in
+        dlg.image_label.clear()
+        dlg.image_path = itm.image_path or ""
+        if itm.image_path:
+            img = get_thumbnails().request(itm.image_path, 256)
+            if img is not None:
+                dlg.image_label.setPixmap(QPixmap.fromImage(img))
 
         # Safety Requirements (AND logic: user must have _all_ reqs)
         req_ids    = ItemSafetyRequirementDAO.fetch_by_item(item_id)
@@ -270,7 +646,7 @@ class InventoryController:
         # update database record
         InventoryDAO.update(itm)
         # refresh main inventory view immediately
-        self.load_items()
+        self._item_changed(itm)
 
         # update dialog to show new status
         dlg.info_fields['status'].setText(itm.status)
@@ -282,42 +658,37 @@ class InventoryController:
         dlg.id_input.setFocus()
 
     def on_print_item_label(self):
-        """打印选中行的标签"""
-        indexes = self.view.table.selectedIndexes()
-        if not indexes:
+        """打印所有选中行的标签（一次打印机会话）"""
+        from modules.labels.template_index import get_template_index
+        rows = sorted(idx.row() for idx in self.view.table.selectionModel().selectedRows())
+        if not rows:
             QMessageBox.warning(self.view, "提示", "请先选择一行")
             return
-        row = indexes[0].row()
-        # 构建占位符字典
-        headers = [
-            self.view.table.horizontalHeaderItem(i).text()
-            for i in range(self.view.table.columnCount())
-        ]
-        placeholder_dict = {
-            headers[i]: self.view.table.item(row, i).text().replace("\n", " ") if self.view.table.item(row, i) else ""
-            for i in range(len(headers))
-        }
-        # 读取模板名称
-        cat     = self.view.labelTypeCombo.currentText().lower()
-        key     = f"default_template_{cat}"
-        tpl_name= self.settings.value(key, "")
-        if not tpl_name:
-            QMessageBox.warning(self.view, "打印失败", f"请先在 Templates 页面为 '{cat}' 配置模板。")
-            return
-        template_path = self.templates_dir / tpl_name
-        if not template_path.exists():
-            QMessageBox.critical(self.view, "打印失败", f"找不到模板文件: {template_path}")
+        # 从模板索引读取默认模板
+        cat  = self.view.labelTypeCombo.currentText().lower()
+        info = get_template_index().default_for(cat)
+        if info is None:
+            tpl_name = self.settings.value(f"default_template_{cat}", "")
+            if not tpl_name:
+                QMessageBox.warning(self.view, "打印失败", f"请先在 Templates 页面为 '{cat}' 配置模板。")
+            else:
+                QMessageBox.critical(self.view, "打印失败", f"找不到模板文件: {self.templates_dir / tpl_name}")
             return
-        # 调用通用打印
-        try:
-            print_label(template_path, placeholder_dict)
-        except Exception as e:
-            QMessageBox.critical(self.view, "打印失败", str(e))
+        # 只构建模板实际用到的占位符
+        columns = {name: i for i, name in enumerate(HEADERS)}
+        used = [(name, columns[name]) for name in info.placeholders if name in columns]
+        placeholder_rows = [
+            {name: self.model.text(row, col).replace("\n", " ") for name, col in used}
+            for row in rows
+        ]
+        # 交给后台打印队列，立即返回
+        get_spooler().submit(info.path, placeholder_rows)
 
     def on_show_details(self, row: int, col: int):
         """Pop up a dialog showing every field for the selected item."""
-        iid = self.view.table.item(row, 0).text()
-        itm = InventoryDAO.fetch_by_id(iid)
+        iid = self.model.item_id(row)
+        # usually prefetched while the row was selected
+        itm = self.details.get(iid) or InventoryDAO.fetch_by_id(iid)
         if not itm:
             QMessageBox.warning(self.view, "Error", f"Item {iid} not found.")
             return
@@ -335,39 +706,61 @@ class InventoryController:
         form.addRow("Status:",        QLabel(itm.status))
 
         # Holder name
-        holder = ""
-        if itm.holder_id:
-            usr = EmployeeDAO.fetch_by_id(itm.holder_id)
-            holder = f"{usr.first_name} {usr.last_name}" if usr else ""
+        holder = self._holder_name(itm.holder_id) if itm.holder_id else ""
         form.addRow("Holder:",        QLabel(holder))
 
         form.addRow("Location:",      QLabel(itm.location))
         form.addRow("Price:",         QLabel(str(itm.price) if itm.price else ""))
 
-        # Manual & SOP buttons
+        # Manual & SOP buttons (disabled once the file is known to be missing)
+        attachments: dict[str, QPushButton] = {}
         if itm.manual_path:
             btn = QPushButton("Open Manual")
             btn.clicked.connect(lambda _, p=itm.manual_path: open_file(p))
             form.addRow("Manual:", btn)
+            attachments[itm.manual_path] = btn
         if itm.sop_path:
             btn = QPushButton("Open SOP")
             btn.clicked.connect(lambda _, p=itm.sop_path: open_file(p))
             form.addRow("SOP:", btn)
-
-        # Image preview (256×256)
-        if itm.image_path and Path(itm.image_path).exists():
-            # Use the correct AspectRatioMode enum
-            pix = QPixmap(itm.image_path).scaled(
-                256, 256, Qt.AspectRatioMode.KeepAspectRatio
-            )
-            img_lbl = QLabel()
-            img_lbl.setPixmap(pix)
+            attachments[itm.sop_path] = btn
+
+        def show_attachment(path, exists):
+            btn = attachments.get(path)
+            if btn is not None and not exists:
+                btn.setEnabled(False)
+                btn.setToolTip(f"File not found: {path}")
+
+        status = get_attachment_status()
+        status.resolved.connect(show_attachment)
+        for path in attachments:
+            exists = status.check(path)
+            if exists is not None:
+                show_attachment(path, exists)
+
+        # Image preview (256×256), decoded off the UI thread
+        thumbs = None
+        if itm.image_path:
+            img_lbl = QLabel("Loading…")
             form.addRow("Image:", img_lbl)
+
+            def show_thumbnail(path, size, img, want=itm.image_path):
+                if path != want or size != 256:
+                    return
+                if img.isNull():
+                    img_lbl.setText("Image not found.")
+                else:
+                    img_lbl.setPixmap(QPixmap.fromImage(img))
+
+            thumbs = get_thumbnails()
+            img = thumbs.request(itm.image_path, 256)
+            if img is not None:
+                img_lbl.setPixmap(QPixmap.fromImage(img))
+            else:
+                thumbs.ready.connect(show_thumbnail)
         
-        # Safety Requirements
-        req_ids = ItemSafetyRequirementDAO.fetch_by_item(iid)
-        type_map = {t.permission_id: t.name for t in SafetyDAO.fetch_all_types()}
-        req_names = [type_map.get(pid, str(pid)) for pid in req_ids]
+        # Safety Requirements (as loaded with the list)
+        req_names = self.store.value("safety", self.model.store_row(row)) or ()
         form.addRow("Safety Requirements:", QLabel("\n".join(req_names)))
 
         # Close button
@@ -376,5 +769,11 @@ class InventoryController:
         form.addRow(buttons)
 
         dlg.exec()
+        status.resolved.disconnect(show_attachment)
+        if thumbs is not None:
+            try:
+                thumbs.ready.disconnect(show_thumbnail)
+            except TypeError:       # never connected (served from memory)
+                pass
 
 
@@ -0,0 +1,92 @@
+# modules/inventory/inventory_export.py
+
+"""
+Streaming inventory export.
+
+Rows are read from a dedicated DB connection with fetchmany and written
+straight to the output file, so memory stays flat whatever the table size.
+The inventory page passes the ItemIDs it shows, in display order, so the
+file matches the table; their full rows are read in IN (...) batches.
+Supported outputs: .csv, .csv.gz and .xlsx (openpyxl write-only mode).
+"""
+
+import csv
+import gzip
+from pathlib import Path
+
+from data.access_dao import InventoryDAO
+from data.database import DatabaseManager
+
+EXPORT_FILTERS = (
+    "CSV Files (*.csv);;"
+    "Gzipped CSV (*.csv.gz);;"
+    "Excel Workbook (*.xlsx)"
+)
+
+# rows between progress reports / cancellation checks
+PROGRESS_EVERY = 500
+
+
+class _CsvSink:
+    def __init__(self, path: Path):
+        if path.name.lower().endswith(".gz"):
+            self._f = gzip.open(path, "wt", newline="", encoding="utf-8")
+        else:
+            self._f = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._f)
+
+    def write(self, row: list) -> None:
+        self._writer.writerow(row)
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class _XlsxSink:
+    def __init__(self, path: Path):
+        try:
+            from openpyxl import Workbook
+        except ImportError as e:
+            raise RuntimeError("XLSX export requires the 'openpyxl' package") from e
+        self._path = path
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet("Inventory")
+
+    def write(self, row: list) -> None:
+        self._ws.append(row)
+
+    def close(self) -> None:
+        self._wb.save(self._path)
+
+
+def export_inventory(task, path: str, item_ids: list[str] | None = None) -> int:
+    """
+    BackgroundTask body: write item_ids (default: every item in the DB) to
+    path and return the row count. A cancelled export removes the partial file.
+    """
+    out = Path(path)
+    conn = DatabaseManager.new_access_connection()
+    sink = _XlsxSink(out) if out.suffix.lower() == ".xlsx" else _CsvSink(out)
+    done = 0
+    try:
+        total = InventoryDAO.count(conn) if item_ids is None else len(item_ids)
+        rows = InventoryDAO.iter_export_rows(conn, item_ids=item_ids)
+        task.report(0, total)
+        sink.write(InventoryDAO.EXPORT_COLUMNS)
+        for row in rows:
+            sink.write(row)
+            done += 1
+            if done % PROGRESS_EVERY == 0:
+                task.check_cancelled()
+                task.report(done, total)
+        sink.close()
+        task.report(done, total)
+    except BaseException:
+        try:
+            sink.close()
+        finally:
+            out.unlink(missing_ok=True)
+        raise
+    finally:
+        conn.close()
+    return done
@@ -0,0 +1,209 @@
+# modules/inventory/inventory_import.py
+
+"""
+Bulk item import from CSV (.csv / .csv.gz) or XLSX spreadsheets.
+
+The file is streamed row by row and validated against an in-memory copy of
+the catalog (categories, subcategories, parameters). ItemIDs are built with
+make_item_id, exactly like ItemDialog, and duplicates are caught with a set
+of existing + already-seen IDs. Valid rows are inserted with executemany in
+chunked transactions; after every committed chunk a checkpoint file records
+how far the import got, so an interrupted run resumes where it stopped.
+
+Accepted columns (case-insensitive, the export header works as-is):
+    Category, Subcategory, Param1..Param5 or the parameter names,
+    Description, Quantity, Status, Location, Price,
+    Manual Path, SOP Path, Image Path
+"""
+
+import csv
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from data.access_dao import (
+    CategoryDAO, SubCategoryDAO, ParameterDAO, InventoryDAO, Item, make_item_id
+)
+from data.database import DatabaseManager
+from utils.spreadsheet import cell, iter_rows, norm_header
+
+IMPORT_FILTERS = "Spreadsheets (*.csv *.csv.gz *.xlsx);;All Files (*)"
+STATUSES = ("In Stock", "In Use", "Damaged")
+
+# rows per transaction / checkpoint
+CHUNK_SIZE = 500
+
+
+@dataclass
+class ImportReport:
+    dry_run: bool
+    rows: int = 0
+    valid: int = 0
+    inserted: int = 0
+    skipped: int = 0            # rows already done by a previous run
+    duplicates: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+    def summary(self) -> str:
+        lines = [
+            f"Rows read:   {self.rows}",
+            f"Valid:       {self.valid}",
+            f"Duplicates:  {self.duplicates}",
+            f"Invalid:     {len(self.errors) - self.duplicates}",
+        ]
+        if self.skipped:
+            lines.append(f"Resumed, skipped: {self.skipped}")
+        if not self.dry_run:
+            lines.append(f"Inserted:    {self.inserted}")
+        if self.errors:
+            lines.append("")
+            lines += [f"Row {n}: {msg}" for n, msg in self.errors[:15]]
+            if len(self.errors) > 15:
+                lines.append(f"… and {len(self.errors) - 15} more")
+        return "\n".join(lines)
+
+    def write_errors(self, path: str) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["Row", "Error"])
+            w.writerows(self.errors)
+
+
+class ItemImporter:
+    """Validate and (optionally) insert the items of one spreadsheet."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.checkpoint_path = self.path.with_name(self.path.name + ".import.json")
+        # catalog, one query per table
+        self._cats = {c.code for c in CategoryDAO.fetch_all()}
+        self._subs = {s.code: s.category_code for s in SubCategoryDAO.fetch_all()}
+        self._params: dict[str, list[str]] = {}
+        for p in ParameterDAO.fetch_all():
+            self._params.setdefault(p.subcategory_code, []).append(p.name)
+
+    # ——— checkpoint ————————————————————————————————————————
+    def _fingerprint(self) -> dict:
+        st = self.path.stat()
+        return {"size": st.st_size, "mtime": st.st_mtime}
+
+    def _load_checkpoint(self) -> int:
+        """Return the last committed row number, or 0 for a fresh import."""
+        try:
+            data = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return 0
+        if data.get("file") != self._fingerprint():
+            return 0
+        return int(data.get("last_row", 0))
+
+    def _save_checkpoint(self, last_row: int) -> None:
+        self.checkpoint_path.write_text(
+            json.dumps({"file": self._fingerprint(), "last_row": last_row}),
+            encoding="utf-8"
+        )
+
+    # ——— validation ————————————————————————————————————————
+    def build_item(self, row: dict) -> Item:
+        """Turn one row into an Item, or raise ValueError with the reason."""
+        cat = cell(row, "category")
+        sub = cell(row, "subcategory")
+        if cat not in self._cats:
+            raise ValueError(f"unknown category '{cat}'")
+        if self._subs.get(sub) != cat:
+            raise ValueError(f"unknown subcategory '{sub}' for category '{cat}'")
+
+        params = []
+        for rank, pname in enumerate(self._params.get(sub, []), start=1):
+            val = cell(row, f"param{rank}") or cell(row, norm_header(pname))
+            if "-" in val:
+                raise ValueError(f"parameter '{pname}' may not contain '-'")
+            params.append(val)
+
+        qty_raw = cell(row, "quantity") or "1"
+        try:
+            qty = int(float(qty_raw))
+        except ValueError:
+            raise ValueError(f"bad quantity '{qty_raw}'") from None
+        if qty < 0:
+            raise ValueError("quantity must not be negative")
+
+        status = cell(row, "status") or "In Stock"
+        if status not in STATUSES:
+            raise ValueError(f"bad status '{status}'")
+
+        price_raw = cell(row, "price")
+        try:
+            price = float(price_raw) if price_raw else None
+        except ValueError:
+            raise ValueError(f"bad price '{price_raw}'") from None
+
+        return Item(
+            item_id=make_item_id(cat, sub, params),
+            category_code=cat,
+            subcategory_code=sub,
+            description=cell(row, "description"),
+            quantity=qty,
+            status=status,
+            holder_id=None,
+            location=cell(row, "location"),
+            manual_path=cell(row, "manualpath") or None,
+            sop_path=cell(row, "soppath") or None,
+            image_path=cell(row, "imagepath") or None,
+            price=price,
+        )
+
+    # ——— run ———————————————————————————————————————————————
+    def run(self, task=None, dry_run: bool = True) -> ImportReport:
+        """
+        Validate every row; unless dry_run, insert the valid ones.
+        task is an optional BackgroundTask used for progress/cancellation.
+        """
+        report = ImportReport(dry_run=dry_run)
+        conn = DatabaseManager.new_access_connection()
+        try:
+            seen = InventoryDAO.fetch_ids(conn)
+            resume_after = 0 if dry_run else self._load_checkpoint()
+            batch: list[Item] = []
+            last_row = resume_after
+
+            def flush():
+                with DatabaseManager.transaction(conn) as cur:
+                    InventoryDAO.insert_many(batch, cur)
+                report.inserted += len(batch)
+                batch.clear()
+                self._save_checkpoint(last_row)
+
+            for n, row in iter_rows(self.path):
+                report.rows += 1
+                if n <= resume_after:
+                    report.skipped += 1
+                    continue
+                try:
+                    itm = self.build_item(row)
+                except ValueError as e:
+                    report.errors.append((n, str(e)))
+                else:
+                    if itm.item_id in seen:
+                        report.duplicates += 1
+                        report.errors.append((n, f"duplicate ItemID '{itm.item_id}'"))
+                    else:
+                        seen.add(itm.item_id)
+                        report.valid += 1
+                        if not dry_run:
+                            batch.append(itm)
+                last_row = n
+
+                if len(batch) >= CHUNK_SIZE:
+                    flush()
+                if task is not None and report.rows % CHUNK_SIZE == 0:
+                    task.check_cancelled()
+                    task.report(report.rows, 0)
+
+            if not dry_run:
+                if batch:
+                    flush()
+                self.checkpoint_path.unlink(missing_ok=True)
+        finally:
+            conn.close()
+        return report
@@ -429,21 +429,25 @@
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView,
+    QHeaderView,
     QLineEdit, QLabel, QMessageBox, QFileDialog,
     QDialog, QFormLayout, QComboBox, QSpinBox,
-    QDialogButtonBox, QSizePolicy, QSpacerItem
+    QDialogButtonBox, QSizePolicy, QSpacerItem, QCheckBox,
+    QSplitter, QTreeWidget, QTreeWidgetItem, QTableView
 )
 from PyQt6.QtGui import QFont
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPixmap
+from PyQt6.QtCore import Qt, QSize, QTimer
+from PyQt6.QtGui import QIcon, QImage, QPixmap
 
 
 from data.access_dao import (
-    InventoryDAO, Item, EmployeeDAO,
-    CategoryDAO, SubCategoryDAO, ParameterDAO
+    InventoryDAO, Item,
+    CategoryDAO, SubCategoryDAO, ParameterDAO, make_item_id
 )
 from modules.inventory.inventory_controller import InventoryController
+from modules.inventory.facets import FACETS, FACET_TITLES
+from modules.inventory.item_model import IMAGE_COL
+from utils.thumbnails import get_thumbnails
 
 
 # ─────────────────────────────────────────────
@@ -609,10 +613,11 @@ class ItemDialog(QDialog):
 
     @property
     def item_id(self) -> str:
-        parts = [self._cat_combo.currentData(), self._subcat_combo.currentData()]
-        for pos in sorted(self._param_widgets):
-            parts.append(self._param_widgets[pos].text().strip())
-        return "-".join(parts)
+        return make_item_id(
+            self._cat_combo.currentData(),
+            self._subcat_combo.currentData(),
+            [self._param_widgets[pos].text().strip() for pos in sorted(self._param_widgets)]
+        )
 
     @property
     def category_code(self) -> str:
@@ -664,6 +669,11 @@ class ItemDialog(QDialog):
 # ─────────────────────────────────────────────
 class InventoryView(QWidget):
     """仓库管理：搜索 + 增删改 + 出入库 + 导出清单"""
+    IMAGE_COL  = IMAGE_COL
+    THUMB_SIZE = 48
+    # resizing rows to multi-line contents is per row; skip it for big views
+    RESIZE_ROWS_LIMIT = 2000
+
     def __init__(self, current_user):
         super().__init__()
         self._current_user = current_user
@@ -683,6 +693,13 @@ class InventoryView(QWidget):
         self.searchEdit = styled_lineedit()
         self.searchEdit.setPlaceholderText("ItemID or Description…")
         search_layout.addWidget(self.searchEdit)
+        self.docSearchCheck = QCheckBox("Search documents")
+        self.docSearchCheck.setToolTip(
+            "Ranked search over descriptions, locations and manual/SOP text"
+        )
+        search_layout.addWidget(self.docSearchCheck)
+        self.countLabel = QLabel()
+        search_layout.addWidget(self.countLabel)
         main_layout.addLayout(search_layout)
 
         # Button bar
@@ -692,45 +709,71 @@ class InventoryView(QWidget):
         self.btn_delete = styled_button("Delete")
         self.btn_check  = styled_button("Check-In/Out")
         self.btn_export = styled_button("Export List")
+        self.btn_import = styled_button("Import")
         self.labelTypeCombo = styled_combobox()
         self.labelTypeCombo.addItems(["Item", "Product", "Documentation"])
         self.printBtn   = styled_button("Print Label")
         self.printBtn.setEnabled(False)
+        self.thumbCheck = QCheckBox("Thumbnails")
         for w in (
             self.btn_add, self.btn_edit, self.btn_delete,
-            self.btn_check, self.btn_export,
-            self.labelTypeCombo, self.printBtn
+            self.btn_check, self.btn_export, self.btn_import,
+            self.labelTypeCombo, self.printBtn, self.thumbCheck
         ):
             btn_bar.addWidget(w)
         btn_bar.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum))
         main_layout.addLayout(btn_bar)
 
-        # Table (must exist before controller)
-        self.table = QTableWidget(0, 9)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Category", "Subcategory",
-            "Location", "Quantity", "Status",
-            "Holder", "Parameters", "Safety Requirements"
-        ])
-        self.table.hideColumn(0)
+        # Table (must exist before controller, which attaches the model)
+        self.table = QTableView()
+        self.table.setIconSize(QSize(self.THUMB_SIZE, self.THUMB_SIZE))
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        # whole rows, Ctrl/Shift multi-select so a shelf prints in one pass
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
         self.table.setFont(QFont("Segoe UI", 11))
         self.table.verticalHeader().setFont(QFont("Segoe UI", 9))
-        main_layout.addWidget(self.table)
+
+        # Facet panel: tick values to narrow the table, counts update live
+        self.facetTree = QTreeWidget()
+        self.facetTree.setHeaderHidden(True)
+        self.facetTree.setMinimumWidth(180)
+        self._facet_nodes: dict[str, QTreeWidgetItem] = {}
+        for facet in FACETS:
+            node = QTreeWidgetItem([FACET_TITLES[facet]])
+            node.setFlags(node.flags() & ~Qt.ItemFlag.ItemIsSelectable)
+            self.facetTree.addTopLevelItem(node)
+            self._facet_nodes[facet] = node
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.facetTree)
+        splitter.addWidget(self.table)
+        splitter.setStretchFactor(1, 1)
+        splitter.setSizes([200, 800])
+        main_layout.addWidget(splitter)
 
         # Now safe to create controller
         self.controller = InventoryController(self)
+        self.table.hideColumn(0)
+        # optional image column, filled lazily for the visible rows only
+        self.table.hideColumn(self.IMAGE_COL)
 
         # Signals
         self.searchEdit.textChanged.connect(self.controller.on_search)
+        self.docSearchCheck.toggled.connect(lambda _: self.controller.on_search(self.searchEdit.text()))
         self.btn_add.clicked.connect(self.controller.on_add)
         self.btn_edit.clicked.connect(self.controller.on_edit)
         self.btn_delete.clicked.connect(self.controller.on_delete)
         self.btn_check.clicked.connect(self.controller.open_check_dialog)
         self.btn_export.clicked.connect(self.controller.on_export)
+        self.btn_import.clicked.connect(self.controller.on_import)
         self.printBtn.clicked.connect(self.controller.on_print_item_label)
-        self.table.itemSelectionChanged.connect(self._on_selection_changed)
+        self.table.selectionModel().selectionChanged.connect(self._on_selection_changed)
+        self.thumbCheck.toggled.connect(self._on_thumbnails_toggled)
+        self.facetTree.itemChanged.connect(self._on_facet_changed)
+        self.table.verticalScrollBar().valueChanged.connect(self._request_visible_thumbnails)
+        get_thumbnails().ready.connect(self._on_thumbnail_ready)
 
         # Initial load
         self.controller.load_items()
@@ -742,10 +785,10 @@ class InventoryView(QWidget):
         self.controller.load_items()
     
     def _current_item_id(self) -> str | None:
-        r = self.table.currentRow()
-        if r < 0:
+        idx = self.table.currentIndex()
+        if not idx.isValid():
             return None
-        return self.table.item(r, 0).text()
+        return self.table.model().item_id(idx.row())
 
     # def refresh(self, items: list[Item]):
     #     self.table.setRowCount(len(items))
@@ -770,37 +813,26 @@ class InventoryView(QWidget):
     #     if items:
     #         self.table.selectRow(0)
 
-    def refresh(self, items: list[Item]):
-        self.table.setRowCount(len(items))
-        for r, itm in enumerate(items):
-            parts = itm.item_id.split('-')[2:]
-            param_text = "\n".join(parts).strip()
-
-            holder = ""
-            if itm.holder_id:
-                u = EmployeeDAO.fetch_by_id(itm.holder_id)
-                holder = f"{u.first_name} {u.last_name}" if u else ""
-
-            from data.access_dao import ItemSafetyRequirementDAO, SafetyDAO
-            reqs = ItemSafetyRequirementDAO.fetch_by_item(itm.item_id)
-            type_map = {t.permission_id: t.name for t in SafetyDAO.fetch_all_types()}
-            req_text = "\n".join(type_map.get(pid, str(pid)) for pid in reqs)
-
-            vals = [
-                itm.item_id, itm.category_code, itm.subcategory_code,
-                itm.location, itm.quantity, itm.status,
-                holder, param_text, req_text
-            ]
-
-            for c, v in enumerate(vals):
-                item = QTableWidgetItem(str(v))
-                item.setTextAlignment(Qt.AlignmentFlag.AlignTop)
-                item.setToolTip(str(v))  # Optional: tooltip on hover
-                self.table.setItem(r, c, item)
-
-        self.table.resizeRowsToContents()  # 👈 Make rows adjust height for multiline
-        if items:
+    def show_rows(self, rows: list[int]):
+        """Show these ItemStore rows; cells are drawn straight from the store."""
+        self.table.model().set_rows(rows)
+        if len(rows) <= self.RESIZE_ROWS_LIMIT:
+            self.table.resizeRowsToContents()  # 👈 Make rows adjust height for multiline
+        if rows:
+            self.table.selectRow(0)
+        self._request_visible_thumbnails()
+
+    def append_rows(self, rows: list[int]):
+        """Add rows streamed in by the background loader below the current ones."""
+        model = self.table.model()
+        first = model.rowCount()
+        model.append_rows(rows)
+        if model.rowCount() <= self.RESIZE_ROWS_LIMIT:
+            for r in range(first, model.rowCount()):
+                self.table.resizeRowToContents(r)
+        if first == 0 and rows:
             self.table.selectRow(0)
+        self._request_visible_thumbnails()
 
     def open_check_dialog(self):
         from modules.inventory.inventory_controller import CheckDialog
@@ -808,8 +840,86 @@ class InventoryView(QWidget):
         dlg.id_input.returnPressed.connect(lambda: self.controller.process_check(dlg))
         dlg.exec()
 
-    def _on_selection_changed(self):
-        self.printBtn.setEnabled(self.table.currentRow() >= 0)
+    def _on_selection_changed(self, *_):
+        self.printBtn.setEnabled(self.table.currentIndex().isValid())
+
+    # ——— facets ————————————————————————————————————————————
+    def selected_facets(self) -> dict[str, set]:
+        selection = {}
+        for facet, node in self._facet_nodes.items():
+            chosen = {
+                node.child(i).data(0, Qt.ItemDataRole.UserRole)
+                for i in range(node.childCount())
+                if node.child(i).checkState(0) == Qt.CheckState.Checked
+            }
+            if chosen:
+                selection[facet] = chosen
+        return selection
+
+    def set_facets(self, counts: dict[str, dict], selection: dict[str, set], label):
+        """Rebuild the value lists; ticked values stay listed even at 0."""
+        self.facetTree.blockSignals(True)
+        for facet, node in self._facet_nodes.items():
+            chosen = selection.get(facet, set())
+            values = dict(counts.get(facet, {}))
+            for key in chosen:
+                values.setdefault(key, 0)
+            labels = {key: label(facet, key) for key in values}
+            node.takeChildren()
+            for key in sorted(values, key=lambda k: labels[k].lower()):
+                child = QTreeWidgetItem([f"{labels[key]} ({values[key]})"])
+                child.setData(0, Qt.ItemDataRole.UserRole, key)
+                child.setFlags(child.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+                child.setCheckState(
+                    0, Qt.CheckState.Checked if key in chosen else Qt.CheckState.Unchecked
+                )
+                node.addChild(child)
+            node.setText(0, f"{FACET_TITLES[facet]} ({len(chosen)})" if chosen else FACET_TITLES[facet])
+        self.facetTree.blockSignals(False)
+
+    def _on_facet_changed(self, item: QTreeWidgetItem, _column: int):
+        # set_facets replaces the tree items, so not while this one is emitting
+        if item.parent() is not None:
+            QTimer.singleShot(0, self.controller.apply_filters)
+
+    # ——— thumbnails ————————————————————————————————————————
+    def _on_thumbnails_toggled(self, on: bool):
+        self.table.setColumnHidden(self.IMAGE_COL, not on)
+        self._request_visible_thumbnails()
+
+    def _visible_rows(self) -> range:
+        vp = self.table.viewport()
+        first = self.table.rowAt(0)
+        if first < 0:
+            return range(0)
+        last = self.table.rowAt(vp.height() - 1)
+        if last < 0:
+            last = self.table.model().rowCount() - 1
+        return range(first, last + 1)
+
+    def _request_visible_thumbnails(self, *_):
+        """Ask only for the rows on screen; the rest load as they scroll in."""
+        if self.table.isColumnHidden(self.IMAGE_COL):
+            return
+        thumbs, model = get_thumbnails(), self.table.model()
+        for r in self._visible_rows():
+            path = model.image_path(r)
+            if path:
+                img = thumbs.request(path, self.THUMB_SIZE)
+                if img is not None:
+                    self._set_row_thumbnail(r, img)
+
+    def _set_row_thumbnail(self, row: int, img: QImage):
+        if not img.isNull():
+            self.table.model().set_icon(row, QIcon(QPixmap.fromImage(img)))
+
+    def _on_thumbnail_ready(self, path: str, size: int, img: QImage):
+        if size != self.THUMB_SIZE or self.table.isColumnHidden(self.IMAGE_COL):
+            return
+        model = self.table.model()
+        for r in self._visible_rows():
+            if model.image_path(r) == path:
+                self._set_row_thumbnail(r, img)
 
 
 # ─────────────────────────────────────────────
@@ -856,6 +966,10 @@ class CheckDialog(QDialog):
         self.image_label.setFixedSize(100, 100)
         self.image_label.setScaledContents(True)
         form.addRow("Image:", self.image_label)
+        # paths of the scanned item; buttons and image fill in asynchronously
+        self.manual_path = ""
+        self.sop_path = ""
+        self.image_path = ""
 
         self.req_label = QLabel()
         self.req_label.setWordWrap(True)
@@ -875,5 +989,18 @@ class CheckDialog(QDialog):
         self.manual_btn.hide()
         self.sop_btn.hide()
         self.image_label.clear()
+        self.manual_path = self.sop_path = self.image_path = ""
         self.req_label.clear()
-        self.status_label.clear()
\ No newline at end of file
+        self.status_label.clear()
+
+    def set_attachment(self, path: str, exists: bool):
+        """AttachmentStatus.resolved slot for the Manual/SOP buttons."""
+        if path and path == self.manual_path:
+            self.manual_btn.setVisible(exists)
+        if path and path == self.sop_path:
+            self.sop_btn.setVisible(exists)
+
+    def set_thumbnail(self, path: str, size: int, img: QImage):
+        """ThumbnailCache.ready slot; ignores images for earlier scans."""
+        if path == self.image_path and not img.isNull():
+            self.image_label.setPixmap(QPixmap.fromImage(img))
\ No newline at end of file
@@ -0,0 +1,86 @@
+# modules/inventory/item_details.py
+
+"""
+Full item rows (ItemDetail) for the inventory dialogs, fetched ahead.
+
+The inventory list only holds ItemSummary columns. As the selection moves,
+the controller calls prefetch() with the selected ItemID and its
+neighbours; the missing ones are read with one IN (...) query in a
+BackgroundTask, so a double-click usually finds its row already here.
+
+Entries are kept least-recently-used up to DETAIL_CACHE_SIZE. put() stores
+a row the caller just wrote; invalidate() drops rows, and results of a
+fetch that started before an invalidate() are thrown away. All fetches go
+through one worker connection that the cache keeps open.
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+
+from data.access_dao import InventoryDAO, ItemDetail
+from data.database import WorkerConnection
+from utils.background import BackgroundTask
+
+DETAIL_CACHE_SIZE = 256
+
+
+def _fetch_details(task, worker: WorkerConnection, item_ids: list[str]) -> dict[str, ItemDetail]:
+    with worker.connection() as conn:
+        return InventoryDAO.fetch_details(item_ids, conn)
+
+
+class DetailCache:
+    def __init__(self, capacity: int = DETAIL_CACHE_SIZE):
+        self._capacity = capacity
+        self._rows: OrderedDict[str, ItemDetail] = OrderedDict()
+        self._task: BackgroundTask | None = None
+        self._wanted: list[str] = []    # asked for while a fetch was running
+        self._generation = 0
+        self._worker = WorkerConnection()
+
+    def get(self, item_id: str) -> ItemDetail | None:
+        itm = self._rows.get(item_id)
+        if itm is not None:
+            self._rows.move_to_end(item_id)
+        return itm
+
+    def put(self, itm: ItemDetail) -> None:
+        self._rows[itm.item_id] = itm
+        self._rows.move_to_end(itm.item_id)
+        while len(self._rows) > self._capacity:
+            self._rows.popitem(last=False)
+
+    def invalidate(self, item_id: str | None = None) -> None:
+        """Forget item_id (everything when None)."""
+        self._generation += 1
+        if item_id is None:
+            self._rows.clear()
+        else:
+            self._rows.pop(item_id, None)
+
+    def prefetch(self, item_ids: list[str]) -> None:
+        """Fetch the rows of item_ids not cached yet, in the background."""
+        missing = [i for i in item_ids if i and i not in self._rows]
+        if self._task is not None:
+            self._wanted = missing      # only the latest selection matters
+            return
+        if not missing:
+            return
+        task = BackgroundTask(_fetch_details, self._worker, missing)
+        generation = self._generation
+        task.succeeded.connect(lambda rows: self._on_fetched(rows, generation))
+        task.finished.connect(self._on_finished)
+        self._task = task
+        task.start()
+
+    def _on_fetched(self, rows: dict[str, ItemDetail], generation: int):
+        if generation != self._generation:
+            return                  # an edit happened meanwhile; may be stale
+        for itm in rows.values():
+            self.put(itm)
+
+    def _on_finished(self):
+        self._task = None
+        wanted, self._wanted = self._wanted, []
+        if wanted:
+            self.prefetch(wanted)
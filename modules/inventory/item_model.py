@@ -0,0 +1,123 @@
+# modules/inventory/item_model.py
+
+"""
+Qt table model over an ItemStore.
+
+The model only holds the list of store rows currently shown (an
+array('I')); every cell is produced in data() when the view paints it, so a
+100k-item table costs no per-cell objects. Thumbnails for the optional
+Image column are kept per image path while the rows are shown.
+"""
+
+from __future__ import annotations
+from array import array
+from typing import Callable, Iterable
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt6.QtGui import QIcon
+
+from modules.inventory.item_store import ItemStore
+
+HEADERS = [
+    "ID", "Category", "Subcategory",
+    "Location", "Quantity", "Status",
+    "Holder", "Parameters", "Safety Requirements", "Image",
+]
+IMAGE_COL = 9
+
+
+class ItemTableModel(QAbstractTableModel):
+    def __init__(self, store: ItemStore, holder_name: Callable[[int], str], parent=None):
+        super().__init__(parent)
+        self._store = store
+        self._holder_name = holder_name
+        self._rows = array("I")
+        self._icons: dict[str, QIcon] = {}
+
+    # ——— contents ——————————————————————————————————————————
+    def set_rows(self, rows: Iterable[int]) -> None:
+        self.beginResetModel()
+        self._rows = array("I", rows)
+        self._icons.clear()
+        self.endResetModel()
+
+    def append_rows(self, rows: Iterable[int]) -> None:
+        rows = array("I", rows)
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def row_changed(self, store_row: int) -> None:
+        """Repaint the view row showing store_row, if any."""
+        try:
+            r = self._rows.index(store_row)
+        except ValueError:
+            return
+        self.dataChanged.emit(self.index(r, 0), self.index(r, len(HEADERS) - 1))
+
+    def shown_rows(self) -> array:
+        """Copy of the store rows currently shown, in display order."""
+        return array("I", self._rows)
+
+    def store_row(self, view_row: int) -> int:
+        return self._rows[view_row]
+
+    def item_id(self, view_row: int) -> str:
+        return self._store.value("item_id", self._rows[view_row])
+
+    def image_path(self, view_row: int) -> str:
+        return self._store.value("image_path", self._rows[view_row]) or ""
+
+    def set_icon(self, view_row: int, icon: QIcon) -> None:
+        self._icons[self.image_path(view_row)] = icon
+        idx = self.index(view_row, IMAGE_COL)
+        self.dataChanged.emit(idx, idx, [Qt.ItemDataRole.DecorationRole])
+
+    def text(self, view_row: int, column: int) -> str:
+        s, r = self._store, self._rows[view_row]
+        if column == 0:
+            return s.value("item_id", r)
+        if column == 1:
+            return s.value("category_code", r) or ""
+        if column == 2:
+            return s.value("subcategory_code", r) or ""
+        if column == 3:
+            return s.value("location", r) or ""
+        if column == 4:
+            return str(s.value("quantity", r))
+        if column == 5:
+            return s.value("status", r) or ""
+        if column == 6:
+            holder = s.value("holder_id", r)
+            return self._holder_name(holder) if holder else ""
+        if column == 7:
+            return "\n".join(s.value("item_id", r).split("-")[2:]).strip()
+        if column == 8:
+            return "\n".join(s.value("safety", r) or ())
+        return ""
+
+    # ——— QAbstractTableModel ———————————————————————————————
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return self.text(index.row(), index.column())
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignTop
+        if role == Qt.ItemDataRole.DecorationRole and index.column() == IMAGE_COL:
+            return self._icons.get(self.image_path(index.row()))
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
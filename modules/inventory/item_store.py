@@ -0,0 +1,304 @@
+# modules/inventory/item_store.py
+
+"""
+Columnar in-memory copy of the Items table for the inventory page.
+
+The store holds the ItemSummary columns - what the table shows and the
+facets filter on; descriptions and manual/SOP paths stay in the DB
+until a dialog asks for the full row. Instead of one dataclass (and a row
+of QTableWidgetItems) per item, it keeps one column per field:
+
+* text fields are dictionary-encoded: each distinct string (category,
+  status, location, image path, safety names) is held once in a
+  StringPool and rows store its int code in an array('I');
+* quantity, price and holder_id live in typed arrays (price NaN = NULL,
+  holder 0 = nobody; UserIDs start at 1).
+
+Rows are addressed by position. remove() leaves a tombstone so positions
+stay stable for FacetIndex bitmaps; load() compacts. Pool codes never
+change for the life of the store, so they double as stable facet keys.
+
+Filters (where_equal / where_in / where_range / where_contains) return
+row bitmasks - Python ints, bit n = row n - that combine with & and |
+and with the facet masks. where_in / where_equal OR together per-value
+bitmaps, built for a column on its first use and kept up to date by
+append/update (like FacetIndex), so a query costs one big-int OR per
+wanted value. where_range and where_contains are linear scans of the
+column. ItemRow is a __slots__ view created on demand; summary(row)
+materialises an ItemSummary.
+
+The package has no NumPy dependency, so the numeric columns use the
+standard library's array module.
+"""
+
+from __future__ import annotations
+import math
+from array import array
+from typing import Iterable
+
+from data.access_dao import Item, ItemSummary
+
+NO_HOLDER = 0
+
+# ItemSummary fields stored as pool codes
+CODED = (
+    "category_code", "subcategory_code", "status", "location", "image_path", "safety",
+)
+NUMERIC = ("quantity", "price", "holder_id")
+
+
+def mask_to_rows(mask: int) -> list[int]:
+    """Set bit positions, lowest first, in one pass over the binary string."""
+    bits = bin(mask)[:1:-1]
+    return [i for i, b in enumerate(bits) if b == "1"]
+
+
+def rows_to_mask(rows: Iterable[int], size: int) -> int:
+    # build the bit string in one go; OR-ing bits one by one is quadratic
+    bits = bytearray(b"0" * size)
+    for row in rows:
+        bits[row] = 0x31        # "1"
+    return int(bits[::-1], 2) if bits else 0
+
+
+class StringPool:
+    """Each distinct value stored once; code 0 is None."""
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        self.values: list = [None]
+        self._codes: dict = {None: 0}
+
+    def code(self, value) -> int:
+        c = self._codes.get(value)
+        if c is None:
+            c = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return c
+
+    def lookup(self, value) -> int | None:
+        return self._codes.get(value)
+
+
+class ItemRow:
+    """Read-only view of one store row; cheap to create and throw away."""
+    __slots__ = ("_store", "row")
+
+    def __init__(self, store: ItemStore, row: int):
+        self._store, self.row = store, row
+
+    def __getattr__(self, name):
+        return self._store.value(name, self.row)
+
+    def to_summary(self) -> ItemSummary:
+        return self._store.summary(self.row)
+
+
+class ItemStore:
+    def __init__(self):
+        self._pools = {name: StringPool() for name in CODED}
+        self._clear()
+
+    def _clear(self):
+        self._ids: list[str | None] = []
+        self._rows: dict[str, int] = {}
+        self._codes = {name: array("I") for name in CODED}
+        self._quantity = array("q")
+        self._price = array("d")
+        self._holder = array("q")
+        self.alive = 0          # bitmask of live rows
+        # column -> {stored value: rows mask}, built by _bitmaps on first use
+        self._maps: dict[str, dict[int, int]] = {}
+
+    # ——— loading / maintenance —————————————————————————————
+    def load(self, items: Iterable[ItemSummary], safety: dict[str, tuple[str, ...]] | None = None) -> None:
+        """Replace the contents; safety maps ItemID -> requirement names."""
+        self._clear()
+        # start the pools afresh too, or values of deleted items pile up
+        self._pools = {name: StringPool() for name in CODED}
+        safety = safety or {}
+        for itm in items:
+            self._append(itm, safety.get(itm.item_id, ()))
+        self.alive = (1 << len(self._ids)) - 1
+
+    def extend(self, items: Iterable[ItemSummary], safety: dict[str, tuple[str, ...]] | None = None) -> range:
+        """Append items after the existing rows; returns the new row range."""
+        start = len(self._ids)
+        safety = safety or {}
+        for itm in items:
+            self._append(itm, safety.get(itm.item_id, ()))
+        added = range(start, len(self._ids))
+        self.alive |= ((1 << len(added)) - 1) << start
+        self._maps.clear()          # rebuilt on the next where_in
+        return added
+
+    # Item (the full row) works anywhere an ItemSummary does
+    def _append(self, itm: ItemSummary | Item, safety: tuple[str, ...]) -> int:
+        row = len(self._ids)
+        self._ids.append(itm.item_id)
+        self._rows[itm.item_id] = row
+        for name in CODED:
+            value = safety if name == "safety" else getattr(itm, name)
+            self._codes[name].append(self._pools[name].code(value))
+        self._quantity.append(int(itm.quantity or 0))
+        self._price.append(math.nan if itm.price is None else float(itm.price))
+        self._holder.append(itm.holder_id or NO_HOLDER)
+        return row
+
+    def append(self, itm: ItemSummary | Item, safety: tuple[str, ...] = ()) -> int:
+        row = self._append(itm, safety)
+        bit = 1 << row
+        self.alive |= bit
+        for name, maps in self._maps.items():
+            v = self._column(name)[row]
+            maps[v] = maps.get(v, 0) | bit
+        return row
+
+    def update(self, itm: ItemSummary | Item, safety: tuple[str, ...] | None = None) -> int:
+        """Overwrite the row of itm.item_id in place (safety kept if None)."""
+        row = self._rows[itm.item_id]
+        before = {name: self._column(name)[row] for name in self._maps}
+        for name in CODED:
+            if name == "safety" and safety is None:
+                continue
+            value = safety if name == "safety" else getattr(itm, name)
+            self._codes[name][row] = self._pools[name].code(value)
+        self._quantity[row] = int(itm.quantity or 0)
+        self._price[row] = math.nan if itm.price is None else float(itm.price)
+        self._holder[row] = itm.holder_id or NO_HOLDER
+        bit = 1 << row
+        for name, old in before.items():
+            new = self._column(name)[row]
+            if new != old:
+                maps = self._maps[name]
+                maps[old] &= ~bit
+                if not maps[old]:
+                    del maps[old]
+                maps[new] = maps.get(new, 0) | bit
+        return row
+
+    def remove(self, item_id: str) -> int | None:
+        row = self._rows.pop(item_id, None)
+        if row is not None:
+            self._ids[row] = None
+            self.alive &= ~(1 << row)
+        return row
+
+    # ——— access ————————————————————————————————————————————
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def size(self) -> int:
+        """Row positions in use, tombstones included."""
+        return len(self._ids)
+
+    def row_of(self, item_id: str) -> int | None:
+        return self._rows.get(item_id)
+
+    def code(self, name: str, row: int) -> int:
+        return self._codes[name][row]
+
+    def pool(self, name: str) -> StringPool:
+        return self._pools[name]
+
+    def value(self, name: str, row: int):
+        if name == "item_id":
+            return self._ids[row]
+        if name in self._codes:
+            return self._pools[name].values[self._codes[name][row]]
+        if name == "quantity":
+            return self._quantity[row]
+        if name == "price":
+            p = self._price[row]
+            return None if math.isnan(p) else p
+        if name == "holder_id":
+            return self._holder[row] or None
+        raise AttributeError(name)
+
+    def row(self, row: int) -> ItemRow:
+        return ItemRow(self, row)
+
+    def summary(self, row: int) -> ItemSummary:
+        return ItemSummary(**{f: self.value(f, row) for f in ItemSummary.__dataclass_fields__})
+
+    def rows(self, mask: int | None = None) -> list[int]:
+        """Live rows in mask (all live rows by default), in load order."""
+        return mask_to_rows(self.alive if mask is None else mask & self.alive)
+
+    def mask(self, rows: Iterable[int]) -> int:
+        return rows_to_mask(rows, len(self._ids)) & self.alive
+
+    def mask_of(self, item_ids: Iterable[str]) -> int:
+        get = self._rows.get
+        return self.mask(r for r in map(get, item_ids) if r is not None)
+
+    # ——— filters (all return row masks) ————————————————————
+    def where_equal(self, name: str, value) -> int:
+        return self.where_in(name, (value,))
+
+    def _column(self, name: str) -> array:
+        """The stored column behind where_in (pool codes for text fields)."""
+        if name in self._codes:
+            return self._codes[name]
+        if name == "holder_id":
+            return self._holder
+        if name == "quantity":
+            return self._quantity
+        raise ValueError(f"Cannot filter on '{name}'")
+
+    def _bitmaps(self, name: str) -> dict[int, int]:
+        """Stored value -> mask of the rows holding it."""
+        maps = self._maps.get(name)
+        if maps is None:
+            groups: dict[int, list[int]] = {}
+            for i, v in enumerate(self._column(name)):
+                groups.setdefault(v, []).append(i)
+            size = len(self._ids)
+            maps = self._maps[name] = {v: rows_to_mask(r, size) for v, r in groups.items()}
+        return maps
+
+    def where_in(self, name: str, values: Iterable) -> int:
+        maps = self._bitmaps(name)
+        if name in self._codes:
+            pool = self._pools[name]
+            wanted = {c for c in map(pool.lookup, values) if c is not None}
+        elif name == "holder_id":
+            wanted = {v or NO_HOLDER for v in values}
+        else:
+            wanted = set(values)
+        mask = 0
+        for v in wanted:
+            mask |= maps.get(v, 0)
+        return mask & self.alive
+
+    def where_range(self, name: str, low: float | None = None, high: float | None = None) -> int:
+        """low <= value <= high; NULL prices never match. A linear scan."""
+        col = {"price": self._price, "quantity": self._quantity}[name]
+        low = -math.inf if low is None else low
+        high = math.inf if high is None else high
+        # NaN compares False, so missing prices drop out by themselves
+        return self.mask(i for i, v in enumerate(col) if low <= v <= high)
+
+    def where_contains(
+        self, text: str,
+        names: tuple[str, ...] = ("item_id",),
+        within: int | None = None,
+    ) -> int:
+        """Case-insensitive substring match on any of the given fields,
+        optionally only among the rows in `within`."""
+        t = text.lower()
+        rows = range(len(self._ids)) if within is None else self.rows(within)
+        mask = 0
+        for name in names:
+            if name == "item_id":
+                ids = self._ids
+                mask |= self.mask(i for i in rows if ids[i] and t in ids[i].lower())
+                continue
+            # test each distinct string once, then pick rows by code
+            pool = self._pools[name]
+            hits = {c for c, v in enumerate(pool.values) if isinstance(v, str) and t in v.lower()}
+            if hits:
+                col = self._codes[name]
+                mask |= self.mask(i for i in rows if col[i] in hits)
+        return mask & self.alive
@@ -0,0 +1,317 @@
+# modules/inventory/search_index.py
+
+"""
+Full-text search over items and the text of their manuals and SOPs.
+
+The index is a sidecar SQLite database (SEARCH_INDEX_PATH) with an FTS5
+table holding one row per item: ItemID, description, location and the
+extracted text of its manual and SOP. Extracted text is kept per file in
+`documents`, keyed by path (or attachment-store reference) and mtime, so a
+manual shared by 300 items is read once and only re-read when it changes.
+
+SearchIndex.sync(task) runs in a BackgroundTask: it reads the full item
+rows on its own connection (the inventory page only keeps summaries),
+stats the attachments, extracts new or modified files in a process pool and
+rewrites only the item rows whose inputs changed. After an edit, put(item)
+rewrites that one row on the spot, so the new description is searchable
+without a sync; only a manual or SOP not extracted yet needs
+sync(task, [item]). search(text) is cheap
+enough for the UI thread and returns ItemIDs best match first (bm25). Every
+term matches as a prefix, and terms with no hits are widened to close
+spellings taken from the index vocabulary. contains(text) is the plain
+substring match on descriptions behind the search box.
+
+Text extraction: plain text formats always, .docx with the standard library,
+.pdf when the optional 'pypdf' package is installed.
+"""
+
+from __future__ import annotations
+import difflib
+import hashlib
+import os
+import re
+import sqlite3
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from data.access_dao import InventoryDAO, Item
+from data.database import DatabaseManager
+from utils.attachment_store import get_attachment_store, is_ref
+from utils.config import SEARCH_INDEX_PATH
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+# characters of extracted text kept per document
+MAX_TEXT = 2_000_000
+# column weights for bm25: item_id, description, location, manual, sop
+WEIGHTS = (10.0, 5.0, 2.0, 1.0, 1.0)
+TEXT_SUFFIXES = {".txt", ".md", ".csv", ".log", ".ini", ".json", ".xml"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    path     TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    body     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS item_state (
+    item_id TEXT PRIMARY KEY,
+    digest  TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS items USING fts5(
+    item_id, description, location, manual, sop,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS vocab USING fts5vocab(items, 'row');
+"""
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_TAG = re.compile(rb"<[^>]+>")
+
+
+# ——— extraction (runs in worker processes) ———————————————
+def extract_text(path: str) -> str:
+    """Best-effort plain text of a document; '' when the format is unknown."""
+    suffix = Path(path).suffix.lower()
+    try:
+        if suffix in TEXT_SUFFIXES:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                return f.read(MAX_TEXT)
+        if suffix == ".docx":
+            with zipfile.ZipFile(path) as z:
+                xml = z.read("word/document.xml")
+            xml = xml.replace(b"</w:p>", b"\n")
+            return _TAG.sub(b" ", xml).decode("utf-8", "replace")[:MAX_TEXT]
+        if suffix == ".pdf" and PdfReader is not None:
+            parts, size = [], 0
+            for page in PdfReader(path).pages:
+                text = page.extract_text() or ""
+                parts.append(text)
+                size += len(text)
+                if size >= MAX_TEXT:
+                    break
+            return "\n".join(parts)[:MAX_TEXT]
+    except Exception:
+        pass                        # unreadable documents are indexed empty
+    return ""
+
+
+def _extract(path: str, local: str) -> tuple[str, str]:
+    return path, extract_text(local)
+
+
+class SearchIndex:
+    def __init__(self, db_path: Path = SEARCH_INDEX_PATH):
+        self.db_path = Path(db_path)
+        self.available = True
+        try:
+            with self._connect() as conn:
+                conn.executescript(_SCHEMA)
+        except sqlite3.OperationalError:    # sqlite built without FTS5
+            self.available = False
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        return sqlite3.connect(self.db_path)
+
+    # ——— indexing ——————————————————————————————————————————
+    @staticmethod
+    def _mtime(path: str) -> int | None:
+        if is_ref(path):
+            return 0                # content-addressed: never changes
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def sync(self, task, items: list[Item] | None = None) -> int:
+        """Bring the index up to date with items (default: every item in
+        the DB, dropping rows of items that are gone); returns rows
+        rewritten."""
+        if not self.available:
+            return 0
+        full = items is None
+        if full:
+            db = DatabaseManager.new_access_connection()
+            try:
+                items = list(InventoryDAO.iter_all(conn=db))
+            finally:
+                db.close()
+        conn = self._connect()
+        try:
+            return self._sync(conn, task, items, full)
+        finally:
+            conn.close()
+
+    def has_synced(self) -> bool:
+        """True once a full sync() has filled the index (in any session)."""
+        if not self.available:
+            return False
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT 1 FROM item_state LIMIT 1").fetchone() is not None
+        finally:
+            conn.close()
+
+    def put(self, itm: Item) -> bool:
+        """
+        Rewrite one item's row now, with the text of its manual and SOP as
+        far as it is extracted already. Returns False when a document still
+        needs extracting (sync(task, [itm]) does that in the background).
+        """
+        if not self.available:
+            return True
+        conn = self._connect()
+        try:
+            bodies = []
+            for path in (itm.manual_path, itm.sop_path):
+                row = conn.execute(
+                    "SELECT body FROM documents WHERE path = ?", (path,)
+                ).fetchone() if path else ("",)
+                bodies.append(row)
+            with conn:
+                conn.execute("DELETE FROM items WHERE item_id = ?", (itm.item_id,))
+                conn.execute(
+                    "INSERT INTO items (item_id, description, location, manual, sop) VALUES (?, ?, ?, ?, ?)",
+                    (itm.item_id, itm.description or "", itm.location or "",
+                     *(row[0] if row else "" for row in bodies)),
+                )
+                # the next sync() checks the row against its inputs again
+                conn.execute("DELETE FROM item_state WHERE item_id = ?", (itm.item_id,))
+            return all(row is not None for row in bodies)
+        finally:
+            conn.close()
+
+    def _sync(self, conn: sqlite3.Connection, task, items: list[Item], full: bool = True) -> int:
+        known = dict(conn.execute("SELECT path, mtime_ns FROM documents"))
+        paths = {p for itm in items for p in (itm.manual_path, itm.sop_path) if p}
+        mtimes = {p: self._mtime(p) for p in paths}
+
+        # extract new or modified documents in parallel
+        stale = [p for p, m in mtimes.items() if m is not None and known.get(p) != m]
+        if stale:
+            store = get_attachment_store()
+            with ProcessPoolExecutor() as pool:
+                futures = []
+                for p in stale:
+                    try:
+                        futures.append(pool.submit(_extract, p, store.local_path(p)))
+                    except OSError:
+                        mtimes[p] = None
+                for done, fut in enumerate(as_completed(futures), 1):
+                    task.check_cancelled()
+                    path, body = fut.result()
+                    conn.execute(
+                        "INSERT OR REPLACE INTO documents (path, mtime_ns, body) VALUES (?, ?, ?)",
+                        (path, mtimes[path], body),
+                    )
+                    task.report(done, len(futures))
+            conn.commit()
+
+        def body(path):
+            if not path or mtimes.get(path) is None:
+                return ""
+            row = conn.execute("SELECT body FROM documents WHERE path = ?", (path,)).fetchone()
+            return row[0] if row else ""
+
+        # rewrite only item rows whose inputs changed
+        state = dict(conn.execute("SELECT item_id, digest FROM item_state"))
+        changed = 0
+        with conn:
+            for itm in items:
+                digest = hashlib.sha1("\0".join(map(str, (
+                    itm.description, itm.location,
+                    itm.manual_path, mtimes.get(itm.manual_path),
+                    itm.sop_path, mtimes.get(itm.sop_path),
+                ))).encode("utf-8")).hexdigest()
+                if state.pop(itm.item_id, None) == digest:
+                    continue
+                conn.execute("DELETE FROM items WHERE item_id = ?", (itm.item_id,))
+                conn.execute(
+                    "INSERT INTO items (item_id, description, location, manual, sop) VALUES (?, ?, ?, ?, ?)",
+                    (itm.item_id, itm.description or "", itm.location or "",
+                     body(itm.manual_path), body(itm.sop_path)),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO item_state (item_id, digest) VALUES (?, ?)",
+                    (itm.item_id, digest),
+                )
+                changed += 1
+            if not full:
+                return changed
+            # items that no longer exist
+            for item_id in state:
+                conn.execute("DELETE FROM items WHERE item_id = ?", (item_id,))
+                conn.execute("DELETE FROM item_state WHERE item_id = ?", (item_id,))
+            # documents no item refers to any more
+            for path in set(known) - paths:
+                conn.execute("DELETE FROM documents WHERE path = ?", (path,))
+        return changed
+
+    # ——— querying ——————————————————————————————————————————
+    def _variants(self, conn: sqlite3.Connection, term: str) -> list[str]:
+        """term itself plus close spellings when the term alone finds nothing."""
+        hit = conn.execute(
+            "SELECT 1 FROM vocab WHERE term >= ? AND term < ? LIMIT 1",
+            (term, term + "￿"),
+        ).fetchone()
+        if hit or len(term) < 4:
+            return [term]
+        # typos rarely hit the first letter; that keeps the candidate list short
+        candidates = [t for (t,) in conn.execute(
+            "SELECT term FROM vocab WHERE term >= ? AND term < ? "
+            "AND length(term) BETWEEN ? AND ?",
+            (term[0], term[0] + "￿", len(term) - 2, len(term) + 2),
+        )]
+        return [term] + difflib.get_close_matches(term, candidates, n=3, cutoff=0.75)
+
+    def search(self, text: str, limit: int = 500) -> list[str]:
+        """ItemIDs matching every word of text, best match first."""
+        terms = [t.lower() for t in _WORD.findall(text)]
+        if not terms or not self.available:
+            return []
+        conn = self._connect()
+        try:
+            groups = []
+            for term in terms:
+                alts = " OR ".join(f'"{v}"*' for v in self._variants(conn, term))
+                groups.append(f"({alts})")
+            rows = conn.execute(
+                f"SELECT item_id FROM items WHERE items MATCH ? "
+                f"ORDER BY bm25(items, {', '.join(map(str, WEIGHTS))}) LIMIT ?",
+                (" AND ".join(groups), limit),
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return []
+        finally:
+            conn.close()
+        return [r[0] for r in rows]
+
+    def contains(self, text: str) -> list[str]:
+        """ItemIDs whose description contains text, ignoring case."""
+        if not text or not self.available:
+            return []
+        pattern = "%" + re.sub(r"([\\%_])", r"\\\1", text) + "%"
+        conn = self._connect()
+        try:
+            return [r[0] for r in conn.execute(
+                "SELECT item_id FROM items WHERE description LIKE ? ESCAPE '\\'",
+                (pattern,),
+            )]
+        finally:
+            conn.close()
+
+
+_index: SearchIndex | None = None
+
+
+def get_search_index() -> SearchIndex:
+    """The application-wide search index, created on first use."""
+    global _index
+    if _index is None:
+        _index = SearchIndex()
+    return _index
@@ -0,0 +1,118 @@
+# modules/labels/template_index.py
+
+"""
+In-memory index of the label templates in modules/Templates.
+
+Each .wdfx is compiled once (utils.label_printer.load_template) to learn its
+label size, the placeholders it uses and its element counts. A
+QFileSystemWatcher keeps the index fresh: only files whose mtime changed
+are re-read, and `changed` fires so views can refresh their lists.
+
+The print paths use TemplateIndex.default_for(category) to resolve the
+configured template and build placeholder dicts for just the names that
+template actually contains.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+
+from PyQt6.QtCore import QFileSystemWatcher, QObject, QSettings, pyqtSignal
+
+from utils.label_printer import load_template
+
+TEMPLATES_DIR = Path(__file__).resolve().parents[1] / "Templates"
+
+
+@dataclass(frozen=True)
+class TemplateInfo:
+    name: str
+    path: Path
+    mtime_ns: int
+    label_size: tuple[float, float]
+    placeholders: frozenset[str]
+    elements: tuple[tuple[str, int], ...]
+    error: str | None = None        # set when the file could not be compiled
+
+    def describe(self) -> str:
+        if self.error:
+            return f"{self.name}: {self.error}"
+        w, h = self.label_size
+        parts = ", ".join(f"{n} {tag}" for tag, n in self.elements)
+        names = ", ".join(sorted(self.placeholders)) or "—"
+        return f"{w:g}×{h:g} mm\n{parts}\nPlaceholders: {names}"
+
+
+class TemplateIndex(QObject):
+    changed = pyqtSignal()
+
+    def __init__(self, directory: Path = TEMPLATES_DIR):
+        super().__init__()
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._entries: dict[str, TemplateInfo] = {}
+        self._settings = QSettings("AlptraumTech", "LMS")
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.addPath(str(self.directory))
+        self._watcher.directoryChanged.connect(self.rescan)
+        self._watcher.fileChanged.connect(self.rescan)
+        self.rescan()
+
+    # ——— lookup ————————————————————————————————————————————
+    def names(self) -> list[str]:
+        return sorted(self._entries)
+
+    def get(self, name: str) -> TemplateInfo | None:
+        return self._entries.get(name)
+
+    def default_for(self, category: str) -> TemplateInfo | None:
+        """The template configured as default_template_<category>, if it exists."""
+        name = self._settings.value(f"default_template_{category.lower()}", "")
+        return self._entries.get(name) if name else None
+
+    # ——— maintenance ———————————————————————————————————————
+    def _index(self, path: Path, mtime_ns: int) -> TemplateInfo:
+        try:
+            tpl = load_template(path)
+        except Exception as e:
+            return TemplateInfo(path.name, path, mtime_ns, (0.0, 0.0), frozenset(), (), str(e))
+        return TemplateInfo(
+            path.name, path, mtime_ns,
+            (tpl.label_width, tpl.label_height), tpl.placeholders, tpl.elements,
+        )
+
+    def rescan(self, *_):
+        """Re-list the directory; only new or modified files are re-read."""
+        seen: dict[str, TemplateInfo] = {}
+        for path in self.directory.iterdir():
+            try:
+                if not path.is_file():
+                    continue
+                mtime = path.stat().st_mtime_ns
+            except OSError:         # removed while listing
+                continue
+            old = self._entries.get(path.name)
+            seen[path.name] = old if old and old.mtime_ns == mtime else self._index(path, mtime)
+
+        changed = seen != self._entries
+        self._entries = seen
+        # editors often replace files, which drops them from the watcher
+        watched = set(self._watcher.files())
+        wanted = {str(i.path) for i in seen.values()}
+        if watched - wanted:
+            self._watcher.removePaths(list(watched - wanted))
+        if wanted - watched:
+            self._watcher.addPaths(list(wanted - watched))
+        if changed:
+            self.changed.emit()
+
+
+_index: TemplateIndex | None = None
+
+
+def get_template_index() -> TemplateIndex:
+    """The application-wide index, created on first use."""
+    global _index
+    if _index is None:
+        _index = TemplateIndex()
+    return _index
@@ -1,10 +1,35 @@
 # modules/labels/template_manager_controller.py
 
+import io
 import shutil
+from functools import lru_cache
 from pathlib import Path
 from PyQt6.QtCore import QSettings
+from PyQt6.QtGui import QPixmap
 from PyQt6.QtWidgets import QMessageBox, QFileDialog
 
+from modules.labels.template_index import get_template_index
+from utils.background import BackgroundTask
+
+# rendered previews kept in memory
+PREVIEW_CACHE_SIZE = 32
+
+
+@lru_cache(maxsize=PREVIEW_CACHE_SIZE)
+def _preview_png(path: str, mtime_ns: int) -> bytes:
+    """Render a template offline with each placeholder showing its own name."""
+    from utils.label_printer import load_template
+    from utils.label_render import render_label
+    sample = {name: name for name in load_template(path).placeholders}
+    buf = io.BytesIO()
+    render_label(path, sample).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _render_preview(task, path: str, mtime_ns: int) -> bytes:
+    return _preview_png(path, mtime_ns)
+
+
 class TemplateManagerController:
     def __init__(self, view):
         self.view = view
@@ -12,26 +37,63 @@ class TemplateManagerController:
         # 组织名和应用名可自定义
         self.settings = QSettings("AlptraumTech", "LMS")
 
-        # 定位到 modules/labels/Templates
-        self.templates_dir = (
-            Path(__file__).resolve().parents[1]  # modules/labels
-            / "Templates"
-        )
-        # 确保目录存在（包括 parents）
-        self.templates_dir.mkdir(parents=True, exist_ok=True)
+        # 模板索引（modules/Templates），文件变化时自动刷新列表
+        self.index = get_template_index()
+        self.templates_dir = self.index.directory
+        self.index.changed.connect(self.load_templates)
+        # preview being rendered in the background; older results are ignored
+        self._preview_key: tuple[str, int] | None = None
 
     def load_templates(self):
         """刷新左侧列表 & 右侧所有下拉框的选项"""
-        names = [f.name for f in sorted(self.templates_dir.iterdir()) if f.is_file()]
+        names = self.index.names()
+        current = self.view.listWidget.currentItem()
+        current = current.text() if current else ""
 
-        # 左侧列表
+        # 左侧列表（悬停显示尺寸、元素与占位符）
         self.view.listWidget.clear()
         self.view.listWidget.addItems(names)
+        for row, name in enumerate(names):
+            self.view.listWidget.item(row).setToolTip(self.index.get(name).describe())
+        if current in names:
+            self.view.listWidget.setCurrentRow(names.index(current))
 
-        # 右侧每个类别下拉
+        # 右侧每个类别下拉，保留当前选择
         for combo in self.view.category_combos.values():
+            selected = combo.currentText()
             combo.clear()
             combo.addItems(names)
+            if selected in names:
+                combo.setCurrentIndex(names.index(selected))
+
+    def show_preview(self, name: str):
+        """Render the selected template into the preview pane."""
+        label = self.view.previewLabel
+        path = self.templates_dir / name if name else None
+        label.setPixmap(QPixmap())
+        if path is None or not path.is_file():
+            self._preview_key = None
+            label.setText("No template selected.")
+            return
+        key = (str(path), path.stat().st_mtime_ns)
+        self._preview_key = key
+        label.setText("Rendering preview…")
+        task = BackgroundTask(_render_preview, *key)
+        task.succeeded.connect(lambda png, k=key: self._on_preview(k, png))
+        task.failed.connect(lambda msg, k=key: self._on_preview_failed(k, msg))
+        task.start()
+
+    def _on_preview(self, key: tuple[str, int], png: bytes):
+        if key != self._preview_key:
+            return                  # selection moved on meanwhile
+        pix = QPixmap()
+        pix.loadFromData(png, "PNG")
+        self.view.previewLabel.setPixmap(pix)
+
+    def _on_preview_failed(self, key: tuple[str, int], msg: str):
+        if key != self._preview_key:
+            return
+        self.view.previewLabel.setText(f"Preview unavailable:\n{msg}")
 
     def add_template(self):
         """添加新模板文件到目录，然后刷新"""
@@ -46,6 +108,7 @@ class TemplateManagerController:
             QMessageBox.information(self.view, "Success", f"Added '{dest.name}'.")
         except Exception as e:
             QMessageBox.critical(self.view, "Error", f"Failed to add:\n{e}")
+        self.index.rescan()
         self.load_templates()
 
     def delete_template(self):
@@ -69,6 +132,7 @@ class TemplateManagerController:
             key = f"default_template_{cat.lower()}"
             if self.settings.value(key, "") == name:
                 self.settings.remove(key)
+        self.index.rescan()
         self.load_templates()
 
     def load_settings(self):
@@ -171,6 +171,19 @@ class TemplateManagerView(QWidget):
         right_group.setLayout(right_layout)
         splitter.addWidget(right_group)
 
+        # ── Preview Pane ────────────────────
+        preview_group = QGroupBox("Preview")
+        preview_group.setFont(QFont("Segoe UI", 14, QFont.Weight.Bold))
+        preview_layout = QVBoxLayout()
+        preview_layout.setContentsMargins(15, 15, 15, 15)
+        self.previewLabel = QLabel("No template selected.")
+        self.previewLabel.setFont(QFont("Segoe UI", 11))
+        self.previewLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.previewLabel.setMinimumWidth(260)
+        preview_layout.addWidget(self.previewLabel)
+        preview_group.setLayout(preview_layout)
+        splitter.addWidget(preview_group)
+
         # Main layout with consistent margins
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(30, 20, 30, 20)
@@ -180,4 +193,5 @@ class TemplateManagerView(QWidget):
         self.addButton.clicked.connect(self.controller.add_template)
         self.deleteButton.clicked.connect(self.controller.delete_template)
         self.saveButton.clicked.connect(self.controller.save_settings)
+        self.listWidget.currentTextChanged.connect(self.controller.show_preview)
 
@@ -1,6 +1,6 @@
 # modules/main_window.py
 
-import re, io, sys
+import re, sys
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
@@ -11,7 +11,7 @@ from PyQt6.QtWidgets import (
     QMenuBar, QStatusBar, QMessageBox, QComboBox,
     QTableWidget, QTableWidgetItem, QMenu, QSplitter
 )
-from PyQt6.QtGui import QAction, QPixmap, QImage, QColor, QPalette
+from PyQt6.QtGui import QAction, QPixmap, QColor, QPalette
 
 from modules.auth.login_controller import LoginController, get_device_id
 from modules.inventory.inventory_view     import InventoryView
@@ -20,8 +20,9 @@ from modules.dbconfig.dbconfig_view       import DBConfigView
 from modules.labels.template_manager_view import TemplateManagerView
 from modules.safety.safety_controller     import SafetyController
 from data.access_dao import EmployeeDAO, SafetyDAO
+from utils.print_spooler import get_spooler
+from utils.barcodes import get_barcode_service
 
-import pdf417gen as pdf417
 from PIL import Image
 from data.database import DatabaseManager
 import pymysql
@@ -69,6 +70,11 @@ class MainWindow(QMainWindow):
         darkAct .triggered.connect(self._apply_dark)
         themeMenu.setToolTip("Choose Light or Dark theme")
 
+        # Printing Menu
+        printMenu = QMenu("Printing", self)
+        menubar.insertMenu(self.actions['logout'], printMenu)
+        printMenu.addAction("Print Statistics…").triggered.connect(self._show_print_stats)
+
         # Load saved theme
         self.settings = QSettings("YourOrg", "LMSApp")
         if self.settings.value("theme","light") == "dark":
@@ -106,6 +112,20 @@ class MainWindow(QMainWindow):
         self.status = QStatusBar(self)
         self.setStatusBar(self.status)
         self._update_status_bar()
+        # restore the login line whenever a timed message expires
+        self.status.messageChanged.connect(lambda m: m or self._update_status_bar())
+
+        # Background label printing
+        self._spooler_slots = [
+            ('job_progress', self._on_print_progress),
+            ('job_retrying', self._on_print_retrying),
+            ('job_done',     self._on_print_done),
+            ('job_failed',   self._on_print_failed),
+        ]
+        spooler = get_spooler()
+        for sig, slot in self._spooler_slots:
+            getattr(spooler, sig).connect(slot)
+        self._logging_out = False
 
         # Apply permissions & show home
         self._apply_permissions()
@@ -348,17 +368,9 @@ class MainWindow(QMainWindow):
             "Scanner Power Off":            "%%POWEROFF"
         }
         data = mapping.get(self.codeCombo.currentText(), "")
-        codes = pdf417.encode(data, columns=6, security_level=5)
-        img   = pdf417.render_image(codes, scale=3, ratio=3)
-        buf   = io.BytesIO()
-        img.save(buf, format="PNG")
-        qimg  = QImage.fromData(buf.getvalue(), "PNG")
-        pix   = QPixmap.fromImage(qimg).scaled(
-            self.barcodeLabel.size(),
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        )
-        self.barcodeLabel.setPixmap(pix)
+        size = self.barcodeLabel.size()
+        img = get_barcode_service().get("pdf417", data, (size.width(), size.height()), ecc=5)
+        self.barcodeLabel.setPixmap(QPixmap.fromImage(img))
 
     def keyPressEvent(self, event):
         """Handle scanner buffer and special home-switch code."""
@@ -397,11 +409,47 @@ class MainWindow(QMainWindow):
         u = self.current_user
         self.status.showMessage(f"Logged in as: {u.first_name} {u.last_name} ({u.user_type})")
 
+    def _on_print_progress(self, job_id: str, done: int, total: int):
+        self.status.showMessage(f"Printing labels… {done}/{total}")
+
+    def _on_print_retrying(self, job_id: str, err: str, delay: int):
+        self.status.showMessage(f"Printer not ready ({err}), retrying in {delay}s…")
+
+    def _on_print_done(self, job_id: str, n: int):
+        self.status.showMessage(f"{n} label(s) printed.", 5000)
+
+    def _on_print_failed(self, job_id: str, err: str):
+        QMessageBox.critical(self, "Print Failed", err)
+
+    def _show_print_stats(self):
+        spooler = get_spooler()
+        try:
+            from utils.label_printer import STATS
+            requests = STATS.summary()
+        except ImportError as e:
+            requests = f"Label printing unavailable: {e}"
+        box = QMessageBox(QMessageBox.Icon.Information, "Print Statistics",
+                          f"{spooler.pending()} job(s) waiting\n\n{spooler.pool.summary()}",
+                          parent=self)
+        box.setDetailedText(f"DTPWeb requests this session\n\n{requests}")
+        box.exec()
+
     def _on_logout(self):
+        # the spooler outlives this window; stop routing its signals here
+        spooler = get_spooler()
+        for sig, slot in self._spooler_slots:
+            getattr(spooler, sig).disconnect(slot)
+        self._logging_out = True
         self.close()
         from main import main
         main()
 
+    def closeEvent(self, event):
+        # quitting: printers finish their current label, the rest stays spooled
+        if not self._logging_out:
+            get_spooler().stop()
+        super().closeEvent(event)
+
     def _apply_dark(self):
         QApplication.setStyle("Fusion")  # 🔧 This line is missing in your current code!
         pal = QPalette()
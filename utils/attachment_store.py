@@ -0,0 +1,143 @@
+# utils/attachment_store.py
+
+"""
+Content-addressed storage for item manuals, SOPs and images.
+
+ingest(path) copies a file into ATTACHMENT_STORE_DIR under its SHA-256 and
+returns a reference such as "sha256:9f2c…e1.pdf", which is what goes into
+Items.ManualPath / SOPPath / ImagePath. Identical files are stored once, no
+matter how many items use them, and references survive the share moving
+(only LMS_ATTACHMENT_DIR has to change).
+
+local_path(value) turns a reference into a file on local disk, copying it
+from the store into ATTACHMENT_CACHE_DIR on first use. The cache is trimmed
+least-recently-used first once it grows past ATTACHMENT_CACHE_LIMIT. Values
+that are not references (older rows holding plain paths) pass through
+unchanged, so both kinds can be opened the same way.
+"""
+
+from __future__ import annotations
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from utils.config import ATTACHMENT_CACHE_DIR, ATTACHMENT_CACHE_LIMIT, ATTACHMENT_STORE_DIR
+
+REF_PREFIX = "sha256:"
+_CHUNK = 1024 * 1024
+
+
+def is_ref(value: str | None) -> bool:
+    return bool(value) and value.startswith(REF_PREFIX)
+
+
+def _digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _copy_atomic(src: Path, dst: Path) -> None:
+    """Copy via a temp file in dst's folder so readers never see half a file."""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dst.parent, prefix=".part-")
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class AttachmentStore:
+    def __init__(
+        self,
+        store_dir: Path = ATTACHMENT_STORE_DIR,
+        cache_dir: Path = ATTACHMENT_CACHE_DIR,
+        cache_limit: int = ATTACHMENT_CACHE_LIMIT,
+    ):
+        self.store_dir = Path(store_dir)
+        self.cache_dir = Path(cache_dir)
+        self.cache_limit = cache_limit
+
+    # ——— references ————————————————————————————————————————
+    def stored_path(self, ref: str) -> Path:
+        """Where a reference lives in the shared store."""
+        name = ref[len(REF_PREFIX):]
+        return self.store_dir / name[:2] / name
+
+    def cached_path(self, ref: str) -> Path:
+        return self.cache_dir / ref[len(REF_PREFIX):]
+
+    def ingest(self, path: str | Path) -> str:
+        """Store a file (once per distinct content) and return its reference."""
+        src = Path(path)
+        ref = f"{REF_PREFIX}{_digest(src)}{src.suffix.lower()}"
+        target = self.stored_path(ref)
+        if not target.exists():
+            _copy_atomic(src, target)
+        # the file is hot right now; spare the next open a trip to the share
+        cached = self.cached_path(ref)
+        if not cached.exists():
+            try:
+                _copy_atomic(src, cached)
+                self._trim()
+            except OSError:
+                pass                # cache is best-effort
+        return ref
+
+    def ingest_value(self, value: str | None) -> str | None:
+        """ItemDialog value -> column value: ingest plain file paths, keep the rest."""
+        if not value or is_ref(value) or not Path(value).is_file():
+            return value or None
+        return self.ingest(value)
+
+    # ——— reading ———————————————————————————————————————————
+    def local_path(self, value: str) -> str:
+        """A local file for value; plain paths are returned unchanged."""
+        if not is_ref(value):
+            return value
+        cached = self.cached_path(value)
+        try:
+            os.utime(cached)        # mtime doubles as the LRU clock
+            return str(cached)
+        except FileNotFoundError:
+            pass
+        source = self.stored_path(value)
+        if not source.exists():
+            return str(source)      # let the caller report the missing file
+        _copy_atomic(source, cached)
+        self._trim()
+        return str(cached)
+
+    def _trim(self) -> None:
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.is_file() and not e.name.startswith(".")]
+        except OSError:
+            return
+        stats = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in entries), reverse=True)
+        total = 0
+        for i, (_mtime, size, path) in enumerate(stats):
+            total += size
+            # never evict the newest file, even if it alone is over the limit
+            if i and total > self.cache_limit:
+                try:
+                    os.remove(path)
+                except OSError:     # open in a viewer on Windows
+                    pass
+
+
+_store: AttachmentStore | None = None
+
+
+def get_attachment_store() -> AttachmentStore:
+    """The application-wide attachment store, created on first use."""
+    global _store
+    if _store is None:
+        _store = AttachmentStore()
+    return _store
@@ -0,0 +1,123 @@
+# utils/attachments.py
+
+"""
+Non-blocking "does this attachment exist?" checks.
+
+Manuals, SOPs and images usually live on SMB shares where a single stat can
+take hundreds of milliseconds. AttachmentStatus answers check(path) from a
+cache of directory listings when it can; otherwise it returns None and
+lists the directory in a worker thread. Requests for the same directory are
+batched into one os.scandir, so the six attachments of a shelf cost one
+round trip instead of six.
+
+Listings expire after ATTACHMENT_TTL seconds. `resolved(path, exists)` fires
+on the UI thread for every path that was waiting on a listing.
+
+Attachment-store references ("sha256:…") are answered from the local cache
+when present, otherwise by listing their folder in the shared store.
+"""
+
+from __future__ import annotations
+import os
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from utils.attachment_store import get_attachment_store, is_ref
+
+# seconds a directory listing stays valid
+ATTACHMENT_TTL = 30.0
+
+
+def _split(path: str) -> tuple[str, str]:
+    if is_ref(path):
+        path = str(get_attachment_store().stored_path(path))
+    directory, name = os.path.split(os.path.abspath(path))
+    # Windows shares are case-insensitive
+    return os.path.normcase(directory), os.path.normcase(name)
+
+
+class _Scan(QRunnable):
+    def __init__(self, status: AttachmentStatus, directory: str):
+        super().__init__()
+        self._status, self._dir = status, directory
+
+    def run(self):
+        self._status._scan(self._dir)
+
+
+class AttachmentStatus(QObject):
+    resolved = pyqtSignal(str, bool)     # path, exists
+
+    def __init__(self, ttl: float = ATTACHMENT_TTL):
+        super().__init__()
+        self._ttl = ttl
+        # directory -> (listed at, file names)
+        self._listings: dict[str, tuple[float, frozenset[str]]] = {}
+        # directory -> paths waiting for its listing
+        self._waiting: dict[str, set[str]] = {}
+        self._queued: set[str] = set()
+        self._lock = threading.Lock()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(4)
+        # collect one event loop pass worth of requests before scanning
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self._flush)
+
+    def check(self, path: str) -> bool | None:
+        """Cached answer, or None after scheduling a directory scan."""
+        if not path:
+            return False
+        if is_ref(path) and get_attachment_store().cached_path(path).is_file():
+            return True
+        directory, name = _split(path)
+        with self._lock:
+            listing = self._listings.get(directory)
+            if listing and time.monotonic() - listing[0] < self._ttl:
+                return name in listing[1]
+            self._waiting.setdefault(directory, set()).add(path)
+        self._flush_timer.start(0)
+        return None
+
+    def invalidate(self, path: str | None = None) -> None:
+        """Forget the listing holding path (or everything when path is None)."""
+        with self._lock:
+            if path is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(_split(path)[0], None)
+
+    # ——— worker side ———————————————————————————————————————
+    def _flush(self):
+        with self._lock:
+            todo = [d for d in self._waiting if d not in self._queued]
+            self._queued.update(todo)
+        for directory in todo:
+            self._pool.start(_Scan(self, directory))
+
+    def _scan(self, directory: str) -> None:
+        try:
+            with os.scandir(directory) as it:
+                names = frozenset(os.path.normcase(e.name) for e in it)
+        except OSError:             # share offline, folder gone, no access
+            names = frozenset()
+
+        with self._lock:
+            self._listings[directory] = (time.monotonic(), names)
+            self._queued.discard(directory)
+            paths = self._waiting.pop(directory, set())
+        for path in paths:
+            self.resolved.emit(path, _split(path)[1] in names)
+
+
+_status: AttachmentStatus | None = None
+
+
+def get_attachment_status() -> AttachmentStatus:
+    """The application-wide attachment status cache, created on first use."""
+    global _status
+    if _status is None:
+        _status = AttachmentStatus()
+    return _status
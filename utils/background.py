@@ -0,0 +1,95 @@
+# utils/background.py
+
+"""
+Small helper for running blocking work off the Qt thread.
+
+A BackgroundTask wraps a callable fn(task, *args). The callable runs on its
+own QThread, reports progress with task.report(done, total) and should call
+task.check_cancelled() between units of work.  Results come back through
+Qt signals, which are delivered on the UI thread; task.emit_partial(obj)
+hands over intermediate results (e.g. a page of rows) while fn still runs.
+
+Callers may drop their reference as soon as `finished` fires (or right
+after cancel()): a started task keeps itself and its QThread alive until
+the thread has actually stopped, then deletes both.
+"""
+
+from PyQt6.QtCore import QCoreApplication, QObject, QThread, pyqtSignal, pyqtSlot
+
+# started tasks whose thread has not stopped yet
+_running: set["BackgroundTask"] = set()
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task once cancel() has been requested."""
+
+
+class BackgroundTask(QObject):
+    progress  = pyqtSignal(int, int)     # done, total (total 0 = unknown)
+    succeeded = pyqtSignal(object)       # return value of fn
+    partial   = pyqtSignal(object)       # intermediate results from fn
+    failed    = pyqtSignal(str)          # error message
+    cancelled = pyqtSignal()
+    finished  = pyqtSignal()             # always emitted last
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self._fn = fn
+        self._args = args
+        self._cancel = False
+        self._thread: QThread | None = None
+
+    def start(self) -> None:
+        self._thread = QThread()
+        self.moveToThread(self._thread)
+        self._thread.started.connect(self._run)
+        self.finished.connect(self._thread.quit)
+        self._thread.finished.connect(self._release)
+        _running.add(self)
+        self._thread.start()
+
+    @pyqtSlot()
+    def _release(self):
+        # runs on the UI thread once the worker thread is really gone
+        _running.discard(self)
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.deleteLater()
+        self.deleteLater()
+
+    def cancel(self) -> None:
+        self._cancel = True
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel
+
+    def check_cancelled(self) -> None:
+        if self._cancel:
+            raise TaskCancelled()
+
+    def report(self, done: int, total: int = 0) -> None:
+        self.progress.emit(done, total)
+
+    def emit_partial(self, obj) -> None:
+        self.partial.emit(obj)
+
+    def wait(self) -> None:
+        if self._thread is not None:
+            self._thread.wait()
+
+    def _run(self):
+        try:
+            result = self._fn(self, *self._args)
+        except TaskCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(result)
+        finally:
+            self.finished.emit()
+            # hand the task back to the UI thread, where _release deletes it
+            app = QCoreApplication.instance()
+            if app is not None:
+                self.moveToThread(app.thread())
@@ -0,0 +1,128 @@
+# utils/barcodes.py
+
+"""
+Barcode images for on-screen use.
+
+encode() turns (symbology, data, ecc) into a PIL image with pdf417gen or
+the optional 'qrcode' package. BarcodeService sits in front of it with an
+in-memory LRU of ready QImages keyed by (symbology, data, ecc, size) and
+an on-disk PNG cache of the unscaled symbols under BARCODE_CACHE_DIR, so a
+symbol is encoded only once, even across restarts.
+
+PIL images are handed to Qt as raw 8-bit grayscale buffers, without a PNG
+encode/decode round trip.
+"""
+
+from __future__ import annotations
+import hashlib
+from collections import OrderedDict
+
+import pdf417gen as pdf417
+from PIL import Image
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage
+
+from utils.config import BARCODE_CACHE_DIR
+
+try:
+    import qrcode
+except ImportError:
+    qrcode = None
+
+SYMBOLOGIES = ("pdf417", "qr")
+
+# ready-to-show images kept in memory
+MEMORY_CACHE_SIZE = 128
+
+
+def encode(symbology: str, data: str, ecc: int | None = None) -> Image.Image:
+    """Encode data as a black-on-white PIL image at module resolution."""
+    if symbology == "pdf417":
+        level = 2 if ecc is None else int(ecc)
+        # short payloads need fewer columns to reach pdf417's 3-row minimum
+        for columns in range(6, 0, -1):
+            try:
+                codes = pdf417.encode(data, columns=columns, security_level=level)
+                break
+            except ValueError:
+                if columns == 1:
+                    raise
+        return pdf417.render_image(codes, scale=3, ratio=3)
+    if symbology == "qr":
+        if qrcode is None:
+            raise RuntimeError("QR codes require the 'qrcode' package")
+        qr = qrcode.QRCode(error_correction=(
+            qrcode.constants.ERROR_CORRECT_L, qrcode.constants.ERROR_CORRECT_M,
+            qrcode.constants.ERROR_CORRECT_Q, qrcode.constants.ERROR_CORRECT_H,
+        )[int(ecc or 0) % 4], border=0)
+        qr.add_data(data)
+        return qr.make_image().get_image()
+    raise ValueError(f"Unknown symbology '{symbology}'")
+
+
+def pil_to_qimage(img: Image.Image) -> QImage:
+    """Copy a PIL image into a QImage without encoding it."""
+    gray = img.convert("L")
+    w, h = gray.size
+    # bytesPerLine = w; copy() detaches from the Python buffer
+    return QImage(gray.tobytes(), w, h, w, QImage.Format.Format_Grayscale8).copy()
+
+
+class BarcodeService:
+    def __init__(self, cache_dir=BARCODE_CACHE_DIR, size: int = MEMORY_CACHE_SIZE):
+        self._dir = cache_dir
+        self._size = size
+        self._images: OrderedDict[tuple, QImage] = OrderedDict()
+
+    def _symbol(self, symbology: str, data: str, ecc: int | None) -> QImage:
+        """Unscaled symbol, from the disk cache when possible."""
+        digest = hashlib.sha1(f"{symbology}\0{ecc}\0{data}".encode("utf-8")).hexdigest()
+        path = self._dir / f"{symbology}-{digest}.png" if self._dir else None
+        if path is not None and path.is_file():
+            img = QImage(str(path))
+            if not img.isNull():
+                return img
+        pil = encode(symbology, data, ecc)
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                pil.save(path, "PNG")
+            except OSError:
+                pass                # cache is best-effort
+        return pil_to_qimage(pil)
+
+    def get(
+        self,
+        symbology: str,
+        data: str,
+        size: tuple[int, int] | None = None,
+        ecc: int | None = None,
+    ) -> QImage:
+        """Barcode image, scaled to fit size (keeping aspect) if given."""
+        key = (symbology, data, ecc, size)
+        img = self._images.get(key)
+        if img is not None:
+            self._images.move_to_end(key)
+            return img
+        img = self._symbol(symbology, data, ecc)
+        if size is not None:
+            img = img.scaled(
+                size[0], size[1],
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+        self._images[key] = img
+        if len(self._images) > self._size:
+            self._images.popitem(last=False)
+        return img
+
+
+_service: BarcodeService | None = None
+
+
+def get_barcode_service() -> BarcodeService:
+    """The application-wide barcode service, created on first use."""
+    global _service
+    if _service is None:
+        _service = BarcodeService()
+    return _service
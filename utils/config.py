@@ -13,6 +13,22 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 # Local Access DB file
 ACCESS_DB_PATH = ROOT_DIR / "data" / "LMS_DB.accdb"
 
+# Pending label print jobs (see utils/print_spooler.py)
+SPOOL_PATH = ROOT_DIR / "data" / "print_spool.json"
+
+# Full-text search sidecar (see modules/inventory/search_index.py)
+SEARCH_INDEX_PATH = ROOT_DIR / "data" / "search_index.sqlite"
+
+# Disposable on-disk caches
+CACHE_DIR = ROOT_DIR / "data" / "cache"
+BARCODE_CACHE_DIR = CACHE_DIR / "barcodes"
+THUMB_CACHE_DIR   = CACHE_DIR / "thumbnails"
+ATTACHMENT_CACHE_DIR = CACHE_DIR / "attachments"
+ATTACHMENT_CACHE_LIMIT = int(os.getenv("LMS_ATTACHMENT_CACHE_MB", "2048")) * 1024 * 1024
+
+# Shared, content-addressed attachment store (see utils/attachment_store.py)
+ATTACHMENT_STORE_DIR = Path(os.getenv("LMS_ATTACHMENT_DIR", str(ROOT_DIR / "data" / "attachments")))
+
 # Remote MySQL credentials
 MYSQL_HOST     = os.getenv("LMS_MYSQL_HOST",    "82.197.82.52")
 MYSQL_USER     = os.getenv("LMS_MYSQL_USER",    "u569981245_LMS_Admin")
@@ -0,0 +1,146 @@
+# utils/dtp_client.py
+
+"""
+Buffering wrapper around the DTPWeb client.
+
+BatchingClient sits between the label renderer and DTPWeb. Between
+start_job and commit_job every draw_* call is only recorded; the label's
+commands are sent one by one (DTPWeb has no bulk call) when the job is
+committed. A label whose values fail to render is dropped with abort()
+before any of its draw commands reached the printer.
+
+Every request is timed, so CommandStats shows how much of a print is spent
+on transport per command type. One CommandStats is shared by all printer
+lanes, so it is updated under a lock.
+"""
+
+from __future__ import annotations
+import threading
+import time
+from dataclasses import dataclass, field
+
+
+class PrinterUnavailable(RuntimeError):
+    """The DTPWeb service or printer cannot be reached right now; worth retrying."""
+
+
+@dataclass
+class _Timing:
+    calls: int = 0
+    total: float = 0.0      # seconds
+    worst: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.calls += 1
+        self.total += seconds
+        self.worst = max(self.worst, seconds)
+
+
+@dataclass
+class CommandStats:
+    """Per-command latency of the requests sent to DTPWeb."""
+    by_command: dict[str, _Timing] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.by_command.setdefault(name, _Timing()).add(seconds)
+
+    @property
+    def requests(self) -> int:
+        with self._lock:
+            return sum(t.calls for t in self.by_command.values())
+
+    @property
+    def seconds(self) -> float:
+        with self._lock:
+            return sum(t.total for t in self.by_command.values())
+
+    def summary(self) -> str:
+        with self._lock:
+            timings = sorted(
+                ((name, _Timing(t.calls, t.total, t.worst)) for name, t in self.by_command.items()),
+                key=lambda kv: -kv[1].total,
+            )
+        if not timings:
+            return "No printer requests yet."
+        lines = [f"{'Command':<18}{'Calls':>7}{'Avg ms':>10}{'Max ms':>10}{'Total ms':>11}"]
+        for name, t in timings:
+            lines.append(
+                f"{name:<18}{t.calls:>7}{t.total / t.calls * 1000:>10.1f}"
+                f"{t.worst * 1000:>10.1f}{t.total * 1000:>11.1f}"
+            )
+        requests = sum(t.calls for _, t in timings)
+        seconds = sum(t.total for _, t in timings)
+        lines.append(f"{requests} requests, {seconds * 1000:.1f} ms")
+        return "\n".join(lines)
+
+
+class BatchingClient:
+    """DTPWeb proxy that buffers a label's draw commands until commit_job."""
+
+    def __init__(self, api, stats: CommandStats | None = None):
+        self._api = api
+        self.stats = stats if stats is not None else CommandStats()
+        self._buffer: list[tuple[str, dict]] | None = None   # None = no open job
+        self._closed = False
+
+    def _timed(self, command: str, fn, /, *args, **kwargs):
+        # positional-only: DTPWeb kwargs include e.g. a printer "name"
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.stats.record(command, time.perf_counter() - t0)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._api, name)
+        if not callable(attr):
+            return attr
+        if name.startswith("draw_"):
+            def draw(**kwargs):
+                if self._buffer is None:
+                    return self._timed(name, attr, **kwargs)
+                self._buffer.append((name, kwargs))
+            return draw
+        return lambda *args, **kwargs: self._timed(name, attr, *args, **kwargs)
+
+    def open_printer(self, *args, **kwargs):
+        result = self._timed("open_printer", self._api.open_printer, *args, **kwargs)
+        self._closed = False
+        return result
+
+    def close_printer(self, *args, **kwargs):
+        # abort() may already have closed it
+        if self._closed:
+            return None
+        self._closed = True
+        return self._timed("close_printer", self._api.close_printer, *args, **kwargs)
+
+    def start_job(self, **kwargs):
+        result = self._timed("start_job", self._api.start_job, **kwargs)
+        self._buffer = []
+        return result
+
+    def flush(self) -> None:
+        """Send the buffered draw commands of the open job."""
+        buf, self._buffer = self._buffer or [], []
+        for name, kwargs in buf:
+            self._timed(name, getattr(self._api, name), **kwargs)
+
+    def commit_job(self, **kwargs):
+        try:
+            self.flush()
+        finally:
+            self._buffer = None
+        return self._timed("commit_job", self._api.commit_job, **kwargs)
+
+    def abort(self) -> None:
+        """
+        Drop a half-built job (e.g. after a render error). start_job already
+        reached the printer, so close it too: DTPWeb has no call to cancel
+        a job, and closing discards it instead of leaving it open for the
+        next session.
+        """
+        self._buffer = None
+        self.close_printer()
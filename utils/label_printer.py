@@ -2,7 +2,12 @@
 Universal Label Printing Library (utils/label_printer.py)
 
 • Reads a WDFX/XML template and substitutes placeholders %%%Name%%%.
+• Templates are compiled once into an immutable list of draw operations
+  (geometry precomputed, placeholders turned into slots) and cached by
+  path + mtime, so printing a label only binds values and replays the ops.
 • Sends draw commands (rectangles, lines, text, barcodes, QR codes) to DTPWeb.
+• Draw commands are buffered per label by utils.dtp_client.BatchingClient,
+  which also keeps per-command latency in STATS.
 • Supports “rotated” tables by transposing only the internal grid (rows↔columns)
   while keeping the outer frame correct, and by repositioning each cell’s text
   based on the orientation (0°, 90°, 180°, 270°).  Coordinates assume a
@@ -12,11 +17,59 @@ Universal Label Printing Library (utils/label_printer.py)
 from __future__ import annotations
 import re
 import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import accumulate
 from pathlib import Path
+from typing import Iterable
 
-from dtpweb import DTPWeb, LPA_QREccLevel
+try:
+    from dtpweb import DTPWeb, LPA_QREccLevel
+except ImportError:
+    # compiling and offline rendering (utils.label_render) work without it
+    DTPWeb = LPA_QREccLevel = None
 
-__all__ = ["print_label"]
+from utils.dtp_client import BatchingClient, CommandStats, PrinterUnavailable
+
+__all__ = ["print_label", "print_labels", "load_template", "CompiledTemplate", "STATS"]
+
+# DTPWeb request latency, accumulated over every print of this session
+STATS = CommandStats()
+
+_PLACEHOLDER = re.compile(r"%%%\s*(.*?)\s*%%%")
+
+# elements whose text is bound per label; a placeholder anywhere else
+# (geometry, fonts, label size) makes the template "dynamic"
+_BOUND_TAGS = {"content", "data", "text"}
+
+# common element parameters: (tag, caster)
+_PARAMS = (
+    ("x", float),
+    ("y", float),
+    ("width", float),
+    ("height", float),
+    ("rotation", int),
+    ("orientation", int),
+    ("lineWidth", float),
+    ("fontSize", int),
+    ("fontHeight", float),
+    ("charSpace", float),
+    ("lineSpace", float),
+    ("autoReturn", int),
+    ("fontStyle", str),
+    ("fontName", str),
+    ("leadingIndent", float),
+    ("horizontalAlignment", int),
+    ("verticalAlignment", int),
+)
+
+# L, M, Q, H; without dtpweb the level index itself, as utils.barcodes expects
+_QR_ECC = {
+    "0": LPA_QREccLevel.EccLevel_L.value if LPA_QREccLevel else 0,
+    "1": LPA_QREccLevel.EccLevel_M.value if LPA_QREccLevel else 1,
+    "2": LPA_QREccLevel.EccLevel_Q.value if LPA_QREccLevel else 2,
+    "3": LPA_QREccLevel.EccLevel_H.value if LPA_QREccLevel else 3,
+}
 
 
 def _get(node: ET.Element, tag: str, caster, default=None):
@@ -32,23 +85,226 @@ def _get(node: ET.Element, tag: str, caster, default=None):
     return default
 
 
-def print_label(template_path: str | Path, placeholders: dict[str, str]):
-    """
-    Load the XML template at template_path, substitute placeholders,
-    and send drawing commands to the first available DTPWeb printer.
-    """
-    # 1) Read & fill template
-    xml = Path(template_path).read_text(encoding="utf-8")
-    xml_filled = re.sub(
-        r"%%%\s*(.*?)\s*%%%",
-        lambda m: str(placeholders.get(m.group(1).strip(), "")),
-        xml,
+def _fill(text: str, placeholders: dict[str, str]) -> str:
+    return _PLACEHOLDER.sub(
+        lambda m: str(placeholders.get(m.group(1).strip(), "")), text
     )
-    root = ET.fromstring(xml_filled)
 
-    # 2) Global label settings
+
+# ——— compiled form ———————————————————————————————————————
+@dataclass(frozen=True)
+class _Text:
+    """A string with placeholder slots: literal parts interleaved with keys."""
+    parts: tuple[str, ...]
+    keys: tuple[str, ...]
+
+    @classmethod
+    def compile(cls, text: str, slots: bool = True) -> _Text:
+        if not slots:
+            return cls((text,), ())
+        pieces = _PLACEHOLDER.split(text)
+        return cls(tuple(pieces[0::2]), tuple(k.strip() for k in pieces[1::2]))
+
+    def bind(self, values: dict[str, str]) -> str:
+        if not self.keys:
+            return self.parts[0]
+        out = [self.parts[0]]
+        for key, lit in zip(self.keys, self.parts[1:]):
+            out.append(str(values.get(key, "")))
+            out.append(lit)
+        return "".join(out)
+
+
+@dataclass(frozen=True)
+class _Op:
+    """One DTPWeb draw call; text_arg (if any) is bound per label."""
+    method: str
+    args: tuple[tuple[str, object], ...]
+    text_arg: str | None = None
+    text: _Text | None = None
+    fallback: _Text | None = None   # used when text binds to ""
+    cell: bool = False              # table cell: strip, skip when empty
+
+    def draw(self, api, values: dict[str, str]) -> None:
+        kwargs = dict(self.args)
+        if self.text_arg is not None:
+            val = self.text.bind(values)
+            if self.cell:
+                val = val.strip()
+                if not val:
+                    return
+            elif not val and self.fallback is not None:
+                val = self.fallback.bind(values)
+            kwargs[self.text_arg] = val
+        getattr(api, self.method)(**kwargs)
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    label_width: float
+    label_height: float
+    ops: tuple[_Op, ...]
+    commit_opts: tuple[tuple[str, int], ...]
+    placeholders: frozenset[str]
+    # page element tag -> count (table cells counted as "cell")
+    elements: tuple[tuple[str, int], ...] = ()
+    # raw XML, kept only when placeholders sit outside text fields
+    source: str | None = None
+
+    def resolve(self, values: dict[str, str]) -> CompiledTemplate:
+        """Return a template whose ops only need text binding."""
+        if self.source is None:
+            return self
+        return _compile(self.source, values)
+
+    def render(self, api, values: dict[str, str]) -> None:
+        """Emit one complete print job for values on an open printer."""
+        tpl = self.resolve(values)
+        api.start_job(width=tpl.label_width, height=tpl.label_height)
+        try:
+            for op in tpl.ops:
+                op.draw(api, values)
+        except Exception:
+            # BatchingClient still holds the commands: drop the half label
+            abort = getattr(api, "abort", None)
+            if abort is not None:
+                abort()
+            raise
+        api.commit_job(**dict(tpl.commit_opts))
+
+
+# ——— compiler ————————————————————————————————————————————
+def _is_dynamic(root: ET.Element) -> bool:
+    return any(
+        el.text and "%%%" in el.text and el.tag.lower() not in _BOUND_TAGS
+        for el in root.iter()
+    )
+
+
+def _count_elements(root: ET.Element) -> tuple[tuple[str, int], ...]:
+    counts: dict[str, int] = {}
+    page = root.find("Page")
+    for node in (page if page is not None else ()):
+        tag = node.tag.lower()
+        counts[tag] = counts.get(tag, 0) + 1
+        if tag == "table":
+            counts["cell"] = counts.get("cell", 0) + len(node.findall("Cells/Text"))
+    return tuple(sorted(counts.items()))
+
+
+def _compile_table(node: ET.Element, params: dict, slots: bool) -> list[_Op]:
+    ops: list[_Op] = []
+    # --- parse the row and column size lists ---
+    raw_rows = node.findtext("rowHeight") or ""
+    raw_cols = node.findtext("colWidth") or ""
+    rowHeights = [float(r) for r in raw_rows.split(",") if r.strip()]
+    colWidths = [float(c) for c in raw_cols.split(",") if c.strip()]
+    lw = float(node.findtext("lineWidth"))
+
+    # --- remember original table dimensions ---
+    tbl_w = params.get("width", 0.0)
+    tbl_h = params.get("height", 0.0)
+
+    # --- decide if we transpose internal grid (90° or 270°) ---
+    orientation = int(params.get("orientation", 0))
+    if orientation in (90, 270):
+        rowHeights, colWidths = colWidths, rowHeights
+
+    # --- outer frame with rotation intact ---
+    params["lineWidth"] = lw
+    if lw > 0:
+        ops.append(_Op("draw_rect", tuple(params.items())))
+
+    base_x = params.get("x", 0.0)
+    base_y = params.get("y", 0.0)
+
+    # --- internal grid lines, only if lineWidth is positive ---
+    if lw > 0:
+        y_cur = base_y + lw / 2
+        for rh in rowHeights[:-1]:
+            y_cur += rh + lw
+            ops.append(_Op("draw_line", (
+                ("x1", base_x + lw / 2), ("y1", y_cur),
+                ("x2", base_x + tbl_w - lw / 2), ("y2", y_cur),
+                ("lineWidth", lw), ("orientation", orientation),
+            )))
+        x_cur = base_x + lw / 2
+        for cw in colWidths[:-1]:
+            x_cur += cw + lw
+            ops.append(_Op("draw_line", (
+                ("x1", x_cur), ("y1", base_y + lw / 2),
+                ("x2", x_cur), ("y2", base_y + tbl_h - lw / 2),
+                ("lineWidth", lw), ("orientation", orientation),
+            )))
+
+    # --- each cell's text, repositioned per orientation ---
+    cells = node.find("Cells")
+    if cells is None:
+        return ops
+    cols = len(colWidths)
+    # col_pre[c] == sum(colWidths[:c]), row_pre[r] == sum(rowHeights[:r])
+    col_pre = list(accumulate(colWidths, initial=0.0))
+    row_pre = list(accumulate(rowHeights, initial=0.0))
+
+    for idx, cell in enumerate(cells.findall("Text")):
+        content = cell.findtext("content", "") or ""
+        text = _Text.compile(content, slots)
+        if not text.keys and not content.strip():
+            continue
+        r, c = divmod(idx, cols)
+        # offset to the top-left of this cell (pre-rotation)
+        x_off = col_pre[c] + (c + 1) * lw
+        y_off = row_pre[r] + (r + 1) * lw
+
+        # insertion point after rotation about the table origin (base_x, base_y)
+        if orientation == 0:
+            tx = base_x + x_off + lw/2
+            ty = base_y + y_off + lw/2
+        elif orientation == 90:
+            tx = base_x - (col_pre[c + 1] + (c + 2) * lw) + lw/2
+            ty = base_y + y_off + lw/2
+        else:  # 270° only. 180° is nonsence for tables
+            tx = base_x + x_off + lw/2
+            ty = base_y + (row_pre[r + 1] + (r + 2) * lw) - lw/2
+
+        args: dict[str, object] = {"x": tx, "y": ty, "orientation": orientation}
+        # optional font overrides per cell
+        if cell.find("fontSize") is not None:
+            args["fontSize"] = int(cell.findtext("fontSize"))
+        if cell.find("fontHeight") is not None:
+            args["fontHeight"] = float(cell.findtext("fontHeight"))
+        # fontStyle默认0x00
+        if cell.find("fontStyle") is not None:
+            args["fontStyle"] = cell.findtext("fontStyle", "0x00")
+        for name in ("verticalAlignment", "horizontalAlignment", "autoReturn"):
+            if cell.find(name) is not None:
+                args[name] = int(cell.findtext(name, 0))
+        ops.append(_Op(
+            "draw_text", tuple(args.items()),
+            text_arg="text", text=text, cell=True,
+        ))
+    return ops
+
+
+def _compile(xml: str, fill_values: dict[str, str] | None = None) -> CompiledTemplate:
+    """
+    Compile template XML into draw ops. With fill_values the placeholders
+    are substituted into the raw XML first (the dynamic-template path).
+    """
+    slots = fill_values is None
+    root = ET.fromstring(xml if slots else _fill(xml, fill_values))
+    # Global label settings
     label_width = _get(root, "labelWidth", float, 0.0)
     label_height = _get(root, "labelHeight", float, 0.0)
+    elements = _count_elements(root)
+
+    if slots and _is_dynamic(root):
+        return CompiledTemplate(
+            label_width, label_height, (), (),
+            frozenset(m.strip() for m in _PLACEHOLDER.findall(xml)),
+            elements, source=xml,
+        )
+
     # offsets to apply to every element
     offset_x = _get(root, "offsetX", float, 0.0) - 2.0
     offset_y = _get(root, "offsetY", float, 0.0) - 1.0
@@ -59,40 +315,11 @@ def print_label(template_path: str | Path, placeholders: dict[str, str]):
     if page is None:
         raise RuntimeError("Template missing <Page> node")
 
-    # 3) Initialize printer
-    api = DTPWeb()
-    if not api.check_plugin():
-        raise RuntimeError("DTPWeb plugin not running")
-    printers = api.get_printers()
-    if not printers:
-        raise RuntimeError("No printers found")
-    api.open_printer(**printers[0])
-    api.start_job(width=label_width, height=label_height)
-
-    # 4) Draw each element
+    ops: list[_Op] = []
     for node in page:
         tag = node.tag.lower()
-        # collect common parameters
         params: dict[str, object] = {}
-        for name, caster in [
-            ("x", float),
-            ("y", float),
-            ("width", float),
-            ("height", float),
-            ("rotation", int),
-            ("orientation", int),
-            ("lineWidth", float),
-            ("fontSize", int),
-            ("fontHeight", float),
-            ("charSpace", float),
-            ("lineSpace", float),
-            ("autoReturn", int),
-            ("fontStyle", str),
-            ("fontName", str),
-            ("leadingIndent", float),
-            ("horizontalAlignment", int),
-            ("verticalAlignment", int),
-        ]:
+        for name, caster in _PARAMS:
             val = _get(node, name, caster)
             if val is not None:
                 # apply the global offsets to x/y
@@ -104,159 +331,112 @@ def print_label(template_path: str | Path, placeholders: dict[str, str]):
                     params[name] = val
 
         if tag == "table":
-            # --- parse the row and column size lists ---
-            raw_rows = node.findtext("rowHeight") or ""
-            raw_cols = node.findtext("colWidth") or ""
-            rowHeights = [float(r) for r in raw_rows.split(",") if r.strip()]
-            colWidths = [float(c) for c in raw_cols.split(",") if c.strip()]
-            lw = float(node.findtext("lineWidth"))
-
-            # --- remember original table dimensions ---
-            orig_w = params.get("width", 0.0)
-            orig_h = params.get("height", 0.0)
-
-            # --- decide if we transpose internal grid (90° or 270°) ---
-            orientation = int(params.get("orientation", 0))
-            transpose = orientation in (90, 270)
-            if transpose:
-                rowHeights, colWidths = colWidths, rowHeights
-
-            # --- draw the outer frame with rotation intact ---
-            params["lineWidth"] = lw
-            if lw > 0:
-                api.draw_rect(**params)
-
-            base_x = params.get("x", 0.0)
-            base_y = params.get("y", 0.0)
-            # lw = params.get("lineWidth", 0.0)
-            tbl_w = orig_w
-            tbl_h = orig_h
-
-            # --- draw internal horizontal grid lines (transposed or not) ---
-            y_cur = base_y + lw / 2
-            for rh in rowHeights[:-1]:
-                y_cur += rh + lw
-                line_args = {
-                    "x1": base_x + lw / 2,
-                    "y1": y_cur,
-                    "x2": base_x + tbl_w - lw / 2,
-                    "y2": y_cur,
-                    "lineWidth": lw,
-                    "orientation": orientation,
-                }
-                if lw > 0:
-                    # only draw if lineWidth is positive
-                    api.draw_line(**line_args)
-
-            # --- draw internal vertical grid lines ---
-            x_cur = base_x + lw / 2
-            for cw in colWidths[:-1]:
-                x_cur += cw + lw
-                line_args = {
-                    "x1": x_cur,
-                    "y1": base_y + lw / 2,
-                    "x2": x_cur,
-                    "y2": base_y + tbl_h - lw / 2,
-                    "lineWidth": lw,
-                    "orientation": orientation,
-                }
-                if lw > 0:
-                    api.draw_line(**line_args)
-
-            # --- draw each cell’s text, repositioned per orientation ---
-            cells = node.find("Cells")
-            if cells is not None:
-                texts = cells.findall("Text")
-                cols = len(colWidths)
-
-                for idx, cell in enumerate(texts):
-                    content = (cell.findtext("content", "") or "").strip()
-                    if not content:
-                        continue
-
-                    # determine row, column index
-                    r, c = divmod(idx, cols)
-                    # offset to the top-left of this cell (pre-rotation)
-                    x_off = sum(colWidths[:c]) + (c + 1) * lw
-                    y_off = sum(rowHeights[:r]) + (r + 1) * lw
-
-                    # compute the final insertion point based on rotation about
-                    # the table origin at (base_x, base_y)
-                    if orientation == 0:
-                        tx = base_x + x_off + lw/2
-                        ty = base_y + y_off + lw/2
-                    elif orientation == 90:
-                        tx = base_x - (sum(colWidths[:c+1]) + (c + 2) * lw) + lw/2
-                        ty = base_y + y_off + lw/2
-                    else:  # 270° only. 180° is nonsence for tables
-                        tx = base_x + x_off + lw/2
-                        ty = base_y + (sum(rowHeights[:r+1]) + (r + 2) * lw) - lw/2
-
-                    # prepare text args
-                    text_args: dict[str, object] = {
-                        "text": content,
-                        "x": tx,
-                        "y": ty,
-                        "orientation": orientation,
-                    }
-                    # optional font overrides per cell
-                    if cell.find("fontSize") is not None:
-                        text_args["fontSize"] = int(cell.findtext("fontSize"))
-                    if cell.find("fontHeight") is not None:
-                        text_args["fontHeight"] = float(cell.findtext("fontHeight"))
-                    # fontStyle默认0x00
-                    if cell.find("fontStyle") is not None:
-                        text_args["fontStyle"] = cell.findtext("fontStyle", "0x00")
-                    if cell.find("verticalAlignment") is not None:
-                        text_args["verticalAlignment"] = int(
-                            cell.findtext("verticalAlignment", 0)
-                        )
-                    if cell.find("horizontalAlignment") is not None:
-                        text_args["horizontalAlignment"] = int(
-                            cell.findtext("horizontalAlignment", 0)
-                        )
-                    if cell.find("autoReturn") is not None:
-                        text_args["autoReturn"] = int(
-                            cell.findtext("autoReturn", 0)
-                        )
-                    api.draw_text(**text_args)
+            ops += _compile_table(node, params, slots)
+
         elif tag == "qrcode":
-            # (unchanged: draws QR, PDF417, or DataMatrix)
+            # QR, PDF417, or DataMatrix
             code_type = _get(node, "type", int, 0)
-            draw_args = dict(params)
             if code_type == 2:
-                draw_args["data"] = node.findtext("data", "")
+                text_arg, raw = "data", node.findtext("data", "")
             else:
-                draw_args["text"] = node.findtext("content", "")
+                text_arg, raw = "text", node.findtext("content", "")
             if code_type == 0:
                 ecc = node.findtext("eccLevel")
                 if ecc is not None:
-                    draw_args["eccLevel"] = {
-                        "0": LPA_QREccLevel.EccLevel_L.value,
-                        "1": LPA_QREccLevel.EccLevel_M.value,
-                        "2": LPA_QREccLevel.EccLevel_Q.value,
-                        "3": LPA_QREccLevel.EccLevel_H.value,
-                    }.get(ecc, LPA_QREccLevel.EccLevel_L.value)
-                api.draw_qrcode(**draw_args)
+                    params["eccLevel"] = _QR_ECC.get(ecc, _QR_ECC["0"])
+                method = "draw_qrcode"
             elif code_type == 1:
-                draw_args["eccLevel"] = node.findtext("eccLevel", 0)
-                api.draw_pdf417(**draw_args)
+                params["eccLevel"] = node.findtext("eccLevel", 0)
+                method = "draw_pdf417"
             else:
-                api.draw_datamatrix(**draw_args)
+                method = "draw_datamatrix"
+            ops.append(_Op(
+                method, tuple(params.items()),
+                text_arg=text_arg, text=_Text.compile(raw, slots),
+            ))
 
         elif tag == "barcode":
-            api.draw_barcode(**params)
+            ops.append(_Op("draw_barcode", tuple(params.items())))
 
         elif tag == "text":
-            txt = node.findtext("content", "") or node.text or ""
-            params["text"] = txt
-            api.draw_text(**params)
+            ops.append(_Op(
+                "draw_text", tuple(params.items()),
+                text_arg="text",
+                text=_Text.compile(node.findtext("content", "") or "", slots),
+                fallback=_Text.compile(node.text or "", slots),
+            ))
 
-    # 5) Finalize print job
-    commit_opts: dict[str, int] = {}
+    commit_opts = []
     if print_speed is not None:
-        commit_opts["speed"] = print_speed
+        commit_opts.append(("speed", print_speed))
     if print_darkness is not None:
-        commit_opts["darkness"] = print_darkness
-    api.commit_job(**commit_opts)
-    api.close_printer()
+        commit_opts.append(("darkness", print_darkness))
+
+    return CompiledTemplate(
+        label_width, label_height, tuple(ops), tuple(commit_opts),
+        frozenset(k for op in ops if op.text for k in op.text.keys + (
+            op.fallback.keys if op.fallback else ()
+        )),
+        elements,
+    )
+
+
+@lru_cache(maxsize=32)
+def _load(path: str, mtime_ns: int) -> CompiledTemplate:
+    return _compile(Path(path).read_text(encoding="utf-8"))
+
+
+def load_template(template_path: str | Path) -> CompiledTemplate:
+    """Return the compiled template, recompiling only when the file changed."""
+    path = Path(template_path).resolve()
+    return _load(str(path), path.stat().st_mtime_ns)
+
+
+# ——— printing ————————————————————————————————————————————
+def _open_printer(printer: dict | None = None) -> BatchingClient:
+    if DTPWeb is None:
+        raise RuntimeError("Label printing requires the 'dtpweb' package")
+    api = BatchingClient(DTPWeb(), STATS)
+    if not api.check_plugin():
+        raise PrinterUnavailable("DTPWeb plugin not running")
+    if printer is None:
+        printers = api.get_printers()
+        if not printers:
+            raise PrinterUnavailable("No printers found")
+        printer = printers[0]
+    api.open_printer(**printer)
+    return api
+
+
+def print_labels(
+    template_path: str | Path,
+    rows: Iterable[dict[str, str]],
+    printer: dict | None = None,
+    backend=None,
+) -> int:
+    """
+    Print one label per placeholder dict in rows, all in a single printer
+    session (plugin check, printer lookup and open happen once per batch).
+    printer is an entry of DTPWeb.get_printers(); default is the first one.
+    backend replaces DTPWeb with another implementation of its drawing API,
+    e.g. utils.label_render.RasterBackend for previews and tests.
+    Returns the number of labels sent.
+    """
+    template = load_template(template_path)
+    api = backend if backend is not None else _open_printer(printer)
+    count = 0
+    try:
+        for values in rows:
+            template.render(api, values)
+            count += 1
+    finally:
+        api.close_printer()
+    return count
+
+
+def print_label(template_path: str | Path, placeholders: dict[str, str]):
+    """
+    Fill the (cached) compiled template at template_path with placeholders
+    and send the drawing commands to the first available DTPWeb printer.
+    """
+    print_labels(template_path, [placeholders])
@@ -0,0 +1,218 @@
+# utils/label_render.py
+
+"""
+Offline label rendering with Pillow.
+
+RasterBackend implements the subset of the DTPWeb client that
+label_printer uses, but draws into images instead of talking to a printer.
+The compiled template ops are the same ones sent to the real printer, so a
+preview shows the same layout (fonts are approximated with whatever TrueType
+font is available).
+
+    render_label(path, values)            -> PIL.Image of one label
+    render_pdf(path, rows, "sheet.pdf")   -> multi-up A4 sheets
+
+PDF417 and QR symbols come from utils.barcodes.encode (QR needs the
+optional 'qrcode' package). DataMatrix and 1D barcodes are drawn as marked
+placeholder boxes.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from utils.barcodes import encode
+
+# typical thermal label printer resolution
+DEFAULT_DPI = 203
+
+A4_MM = (210.0, 297.0)
+
+
+@lru_cache(maxsize=64)
+def _font(name: str | None, px: int):
+    for candidate in (name, f"{name}.ttf" if name else None, "arial.ttf", "DejaVuSans.ttf"):
+        if not candidate:
+            continue
+        try:
+            return ImageFont.truetype(candidate, px)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(px)
+    except TypeError:               # Pillow < 10.1: only the fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+class RasterBackend:
+    """DTPWeb stand-in that renders every committed job to self.pages."""
+
+    def __init__(self, dpi: int = DEFAULT_DPI):
+        self.dpi = dpi
+        self.pages: list[Image.Image] = []
+        self._img: Image.Image | None = None
+        self._draw: ImageDraw.ImageDraw | None = None
+
+    def _px(self, mm) -> int:
+        return round(float(mm or 0) * self.dpi / 25.4)
+
+    # ——— session / job (DTPWeb interface) ——————————————————
+    def check_plugin(self) -> bool:
+        return True
+
+    def get_printers(self) -> list[dict]:
+        return [{"name": "Raster"}]
+
+    def open_printer(self, **_):
+        pass
+
+    def close_printer(self):
+        pass
+
+    def start_job(self, width: float, height: float, **_):
+        self._img = Image.new("L", (max(self._px(width), 1), max(self._px(height), 1)), 255)
+        self._draw = ImageDraw.Draw(self._img)
+
+    def commit_job(self, **_):
+        self.pages.append(self._img)
+        self._img = self._draw = None
+
+    # ——— drawing ———————————————————————————————————————————
+    def draw_rect(self, x=0, y=0, width=0, height=0, lineWidth=0.3, **_):
+        x0, y0 = self._px(x), self._px(y)
+        self._draw.rectangle(
+            (x0, y0, x0 + self._px(width), y0 + self._px(height)),
+            outline=0, width=max(self._px(lineWidth), 1),
+        )
+
+    def draw_line(self, x1=0, y1=0, x2=0, y2=0, lineWidth=0.3, **_):
+        self._draw.line(
+            (self._px(x1), self._px(y1), self._px(x2), self._px(y2)),
+            fill=0, width=max(self._px(lineWidth), 1),
+        )
+
+    def draw_text(
+        self, text="", x=0, y=0, width=None, height=None, orientation=0,
+        fontHeight=None, fontSize=None, fontName=None, fontStyle="0x00",
+        horizontalAlignment=0, verticalAlignment=0, autoReturn=0, **_
+    ):
+        if not text:
+            return
+        if fontHeight is None:
+            # fontSize is in points
+            fontHeight = fontSize * 0.3528 if fontSize else 3.0
+        font = _font(fontName, max(self._px(fontHeight), 6))
+        try:
+            bold = int(str(fontStyle), 0) & 0x01
+        except ValueError:
+            bold = 0
+        box_w = self._px(width) if width else None
+
+        lines = []
+        for para in str(text).split("\n"):
+            if autoReturn and box_w:
+                line = ""
+                for ch in para:
+                    if line and font.getlength(line + ch) > box_w:
+                        lines.append(line)
+                        line = ""
+                    line += ch
+                lines.append(line)
+            else:
+                lines.append(para)
+        block = "\n".join(lines)
+
+        # render the block on its own layer so it can be rotated and aligned
+        l, t, r, b = self._draw.multiline_textbbox((0, 0), block, font=font, stroke_width=bold)
+        tw, th = max(r - l, 1), max(b - t, 1)
+        w = max(box_w or 0, tw)
+        h = max(self._px(height) if height else 0, th)
+        align = {1: "center", 2: "right"}.get(int(horizontalAlignment or 0), "left")
+        ox = {"center": (w - tw) // 2, "right": w - tw}.get(align, 0)
+        oy = {1: (h - th) // 2, 2: h - th}.get(int(verticalAlignment or 0), 0)
+
+        layer = Image.new("L", (w, h), 0)
+        ImageDraw.Draw(layer).multiline_text(
+            (ox - l, oy - t), block, font=font, fill=255, align=align,
+            stroke_width=bold, stroke_fill=255,
+        )
+        if orientation:
+            layer = layer.rotate(-int(orientation), expand=True)
+        self._img.paste(0, (self._px(x), self._px(y)), layer)
+
+    def _paste_code(self, code: Image.Image, x, y, width, height):
+        size = (max(self._px(width), 1), max(self._px(height), 1)) if width and height else code.size
+        self._img.paste(code.convert("L").resize(size, Image.Resampling.NEAREST),
+                        (self._px(x), self._px(y)))
+
+    def _placeholder(self, label, x=0, y=0, width=10, height=10, **_):
+        x0, y0 = self._px(x), self._px(y)
+        x1, y1 = x0 + self._px(width), y0 + self._px(height)
+        self._draw.rectangle((x0, y0, x1, y1), outline=0, width=1)
+        self._draw.line((x0, y0, x1, y1), fill=0)
+        self._draw.line((x0, y1, x1, y0), fill=0)
+        self._draw.text((x0 + 2, y0 + 2), label, fill=0)
+
+    def draw_qrcode(self, text="", x=0, y=0, width=None, height=None, eccLevel=0, **_):
+        if not text:
+            return
+        try:
+            code = encode("qr", text, eccLevel)
+        except RuntimeError:        # 'qrcode' not installed
+            return self._placeholder("QR", x, y, width or 10, height or 10)
+        self._paste_code(code, x, y, width, height)
+
+    def draw_pdf417(self, text="", x=0, y=0, width=None, height=None, eccLevel=0, **_):
+        if not text:
+            return
+        self._paste_code(encode("pdf417", text, eccLevel or 2), x, y, width, height)
+
+    def draw_datamatrix(self, data="", **kw):
+        self._placeholder("DataMatrix", **kw)
+
+    def draw_barcode(self, **kw):
+        self._placeholder("Barcode", **kw)
+
+
+# ——— helpers ————————————————————————————————————————————
+def render_label(template_path: str | Path, values: dict[str, str], dpi: int = DEFAULT_DPI) -> Image.Image:
+    from utils.label_printer import print_labels
+    backend = RasterBackend(dpi)
+    print_labels(template_path, [values], backend=backend)
+    return backend.pages[0]
+
+
+def render_pdf(
+    template_path: str | Path,
+    rows: list[dict[str, str]],
+    out_path: str | Path,
+    dpi: int = DEFAULT_DPI,
+    margin_mm: float = 8.0,
+    gap_mm: float = 2.0,
+) -> int:
+    """Lay the labels out multi-up on A4 sheets; returns the sheet count."""
+    from utils.label_printer import print_labels
+    backend = RasterBackend(dpi)
+    print_labels(template_path, rows, backend=backend)
+    if not backend.pages:
+        return 0
+
+    px = backend._px
+    sheet_w, sheet_h = px(A4_MM[0]), px(A4_MM[1])
+    margin, gap = px(margin_mm), px(gap_mm)
+    lw, lh = backend.pages[0].size
+    cols = max((sheet_w - 2 * margin + gap) // (lw + gap), 1)
+    per_col = max((sheet_h - 2 * margin + gap) // (lh + gap), 1)
+    per_sheet = cols * per_col
+
+    sheets = []
+    for start in range(0, len(backend.pages), per_sheet):
+        sheet = Image.new("L", (sheet_w, sheet_h), 255)
+        for i, label in enumerate(backend.pages[start:start + per_sheet]):
+            r, c = divmod(i, cols)
+            sheet.paste(label, (margin + c * (lw + gap), margin + r * (lh + gap)))
+        sheets.append(sheet)
+    sheets[0].save(out_path, "PDF", resolution=dpi, save_all=True, append_images=sheets[1:])
+    return len(sheets)
@@ -0,0 +1,332 @@
+# utils/print_spooler.py
+
+"""
+Background print queue.
+
+The UI hands label jobs to the spooler and returns immediately. A
+dispatcher thread discovers the printers (utils.printer_pool), splits big
+runs into SPLIT_SIZE-label chunks and assigns each chunk to a printer that
+takes the template's label size. Every printer has its own lane and worker
+thread, so several printers work through a relabelling run in parallel.
+
+Transient failures (plugin not running, printer offline, connection errors)
+are retried with a back-off, resuming after the last label that went out:
+the unprinted rows go back through the dispatcher, which prefers a printer
+that has not failed them yet, while the failed printer's lane backs off.
+Progress and completion are reported through Qt signals, which arrive on
+the UI thread, always under the id submit() returned: the chunks of a split
+job add up to one progress count and one job_done / job_failed.
+
+Pending jobs are written to SPOOL_PATH, so whatever was still queued when
+the app closed is printed on the next start.
+"""
+
+from __future__ import annotations
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from utils.config import SPOOL_PATH
+from utils.dtp_client import PrinterUnavailable
+from utils.printer_pool import PrinterPool
+
+# seconds to wait before each retry; the job fails after the last one
+RETRY_DELAYS = (2, 5, 15)
+
+# labels per chunk when a run is spread over several printers
+SPLIT_SIZE = 25
+
+
+@dataclass
+class PrintJob:
+    template: str
+    rows: list[dict[str, str]]
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    done: int = 0           # labels already printed
+    attempts: int = 0
+    parent: str | None = None   # job_id of the submitted job this chunk came from
+    exclude: list[str] = field(default_factory=list)   # printers that failed this job
+
+    @property
+    def remaining(self) -> int:
+        return len(self.rows) - self.done
+
+
+@dataclass
+class _Split:
+    """The chunks of one submitted job, reported as that job."""
+    chunks: list[PrintJob]
+    base: int = 0               # labels printed before the job was split
+    open: int = 0               # chunks not finished yet
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def done(self) -> int:
+        return self.base + sum(c.done for c in self.chunks)
+
+    @property
+    def total(self) -> int:
+        return self.base + sum(len(c.rows) for c in self.chunks)
+
+
+def _is_transient(exc: Exception) -> bool:
+    # template problems (missing file, bad XML, no <Page>) and a missing
+    # dtpweb package will not fix themselves
+    if isinstance(exc, FileNotFoundError):
+        return False
+    return isinstance(exc, (PrinterUnavailable, OSError))
+
+
+class PrintSpooler(QObject):
+    job_queued   = pyqtSignal(str, int)        # job_id, labels
+    job_progress = pyqtSignal(str, int, int)   # job_id, done, total
+    job_retrying = pyqtSignal(str, str, int)   # job_id, error, delay (s)
+    job_done     = pyqtSignal(str, int)        # job_id, labels
+    job_failed   = pyqtSignal(str, str)        # job_id, error
+    queue_changed = pyqtSignal(int)            # pending jobs
+
+    def __init__(self, spool_path: Path | None = SPOOL_PATH, pool: PrinterPool | None = None):
+        super().__init__()
+        self._path = spool_path
+        # QSettings is read here, on the UI thread, not by the dispatcher
+        self.pool = pool or PrinterPool.from_settings()
+        self._inbox: deque[PrintJob] = deque()
+        self._splits: dict[str, _Split] = {}    # parent job_id -> its chunks
+        # printer name -> assigned jobs; None = "first printer" fallback lane
+        self._lanes: dict[str | None, deque[PrintJob]] = {}
+        self._workers: dict[str | None, threading.Thread] = {}
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._load()
+        self._dispatcher = threading.Thread(target=self._dispatch, name="print-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    # ——— public ————————————————————————————————————————————
+    def submit(self, template: str | Path, rows: list[dict[str, str]]) -> str:
+        """Queue one label per row; returns the job id."""
+        job = PrintJob(str(template), [dict(r) for r in rows])
+        with self._cond:
+            self._inbox.append(job)
+            self._save()
+            self._cond.notify_all()
+        self.job_queued.emit(job.job_id, len(job.rows))
+        self.queue_changed.emit(self.pending())
+        return job.job_id
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._jobs())
+
+    def stop(self) -> None:
+        """Stop the threads after the current label; pending jobs stay on disk."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    # ——— persistence ———————————————————————————————————————
+    def _jobs(self) -> list[PrintJob]:
+        return [*self._inbox, *(j for lane in self._lanes.values() for j in lane)]
+
+    def _load(self) -> None:
+        if self._path is None:
+            return
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+            # printer assignment is redone on every start
+            self._inbox.extend(PrintJob(**j) for j in data)
+        except (OSError, ValueError, TypeError):
+            pass
+        for job in self._inbox:
+            if job.parent is not None:
+                split = self._splits.setdefault(job.parent, _Split([]))
+                split.chunks.append(job)
+                split.open += 1
+
+    def _save(self) -> None:
+        """Write the queue to disk; callers hold self._cond."""
+        if self._path is None:
+            return
+        tmp = self._path.with_suffix(".tmp")
+        tmp.write_text(json.dumps([asdict(j) for j in self._jobs()]), encoding="utf-8")
+        tmp.replace(self._path)
+
+    # ——— dispatcher ————————————————————————————————————————
+    def _depth(self, name: str | None) -> int:
+        """Labels waiting in a printer's lane; callers hold self._cond."""
+        return sum(j.remaining for j in self._lanes.get(name, ()))
+
+    def _assign(self, job: PrintJob) -> list[tuple[str | None, PrintJob]]:
+        try:
+            self.pool.ensure()
+        except Exception:
+            # plugin unreachable: the fallback lane keeps retrying
+            return [(None, job)]
+        if not self.pool.printers:
+            return [(None, job)]
+
+        from utils.label_printer import load_template
+        tpl = load_template(job.template)
+        if tpl.label_width and tpl.label_height:
+            candidates = self.pool.candidates(tpl.label_width, tpl.label_height)
+        else:
+            # dynamic template, size only known per label
+            candidates = list(self.pool.printers.values())
+        # stay off printers that already failed this job, unless none are left
+        candidates = [p for p in candidates if p.name not in job.exclude] or candidates
+
+        chunks = [job]
+        split = None
+        if job.parent is None and len(candidates) > 1 and job.remaining > SPLIT_SIZE:
+            rows = job.rows[job.done:]
+            chunks = [
+                PrintJob(job.template, rows[i:i + SPLIT_SIZE],
+                         job_id=f"{job.job_id}.{n}", attempts=job.attempts,
+                         parent=job.job_id, exclude=list(job.exclude))
+                for n, i in enumerate(range(0, len(rows), SPLIT_SIZE), start=1)
+            ]
+            split = _Split(chunks, base=job.done, open=len(chunks))
+        out = []
+        with self._cond:
+            if split is not None:
+                self._splits[job.job_id] = split
+            # count chunks assigned in this pass toward queue depth as well
+            planned: dict[str, int] = {}
+            for chunk in chunks:
+                printer = self.pool.pick(
+                    candidates, lambda n: self._depth(n) + planned.get(n, 0)
+                )
+                planned[printer.name] = planned.get(printer.name, 0) + chunk.remaining
+                out.append((printer.name, chunk))
+        return out
+
+    def _dispatch(self) -> None:
+        while not self._stop.is_set():
+            with self._cond:
+                while not self._inbox and not self._stop.is_set():
+                    self._cond.wait()
+                if self._stop.is_set():
+                    return
+                job = self._inbox[0]
+
+            try:
+                assigned = self._assign(job)
+            except Exception as e:
+                self._finish(self._inbox, job, str(e))
+                continue
+
+            with self._cond:
+                # workers may have put retries in front of it meanwhile
+                self._inbox.remove(job)
+                for name, chunk in assigned:
+                    self._lanes.setdefault(name, deque()).append(chunk)
+                    if name not in self._workers:
+                        t = threading.Thread(
+                            target=self._work, args=(name,), name=f"print-{name}", daemon=True
+                        )
+                        self._workers[name] = t
+                        t.start()
+                self._save()
+                self._cond.notify_all()
+
+    # ——— printer workers ———————————————————————————————————
+    def _rows(self, job: PrintJob):
+        """Yield the unprinted rows; a row counts once the next one is requested."""
+        for i in range(job.done, len(job.rows)):
+            yield job.rows[i]
+            job.done = i + 1
+            self._progress(job)
+
+    def _progress(self, job: PrintJob) -> None:
+        if job.parent is None:
+            self.job_progress.emit(job.job_id, job.done, len(job.rows))
+            return
+        with self._cond:
+            split = self._splits.get(job.parent)
+            done, total = (split.done, split.total) if split else (job.done, len(job.rows))
+        self.job_progress.emit(job.parent, done, total)
+
+    def _finish(self, queue: deque[PrintJob], job: PrintJob, error: str | None = None) -> None:
+        """Retire job and report it (or, for the last chunk, its parent)."""
+        report = None
+        with self._cond:
+            queue.remove(job)
+            self._save()
+            split = self._splits.get(job.parent) if job.parent is not None else None
+            if split is None:
+                report = (job.job_id, len(job.rows), error)
+            else:
+                split.open -= 1
+                if error is not None:
+                    split.errors.append(error)
+                if split.open == 0:
+                    del self._splits[job.parent]
+                    failed = len(split.errors)
+                    err = None
+                    if failed:
+                        err = (f"{failed} of {len(split.chunks)} parts failed "
+                               f"({split.done}/{split.total} labels printed): {split.errors[0]}")
+                    report = (job.parent, split.total, err)
+        self.queue_changed.emit(self.pending())
+        if report is None:
+            return
+        job_id, labels, err = report
+        if err is None:
+            self.job_done.emit(job_id, labels)
+        else:
+            self.job_failed.emit(job_id, err)
+
+    def _work(self, name: str | None) -> None:
+        from utils.label_printer import print_labels
+
+        while not self._stop.is_set():
+            with self._cond:
+                lane = self._lanes[name]
+                while not lane and not self._stop.is_set():
+                    self._cond.wait()
+                if self._stop.is_set():
+                    return
+                job = lane[0]
+
+            printer = self.pool.printers.get(name) if name is not None else None
+            start_done, t0 = job.done, time.perf_counter()
+            try:
+                print_labels(job.template, self._rows(job), printer.params if printer else None)
+            except Exception as e:
+                self.pool.record(name, job.done - start_done, time.perf_counter() - t0, failed=True)
+                job.attempts += 1
+                if _is_transient(e) and job.attempts <= len(RETRY_DELAYS):
+                    delay = RETRY_DELAYS[job.attempts - 1]
+                    with self._cond:
+                        # hand the unprinted rows back to the dispatcher, ahead
+                        # of new jobs and away from this printer if it can
+                        lane.remove(job)
+                        if name is not None and name not in job.exclude:
+                            job.exclude.append(name)
+                        self._inbox.appendleft(job)
+                        self._save()        # keep progress for a restart
+                        self._cond.notify_all()
+                    self.job_retrying.emit(job.parent or job.job_id, str(e), delay)
+                    # back off this printer; if the job comes back, it waits too
+                    self._stop.wait(delay)
+                    continue
+                self._finish(lane, job, str(e))
+            else:
+                self.pool.record(name, job.done - start_done, time.perf_counter() - t0)
+                self._finish(lane, job)
+
+
+_spooler: PrintSpooler | None = None
+
+
+def get_spooler() -> PrintSpooler:
+    """The application-wide spooler, created on first use."""
+    global _spooler
+    if _spooler is None:
+        _spooler = PrintSpooler()
+    return _spooler
@@ -0,0 +1,155 @@
+# utils/printer_pool.py
+
+"""
+The label printers attached to the DTPWeb service.
+
+PrinterPool discovers the printers once (again only if discovery failed),
+remembers which label stock each one is loaded with and picks a printer for
+a job whose template is labelWidth × labelHeight mm:
+
+• printers loaded with exactly that size are preferred; printers with no
+  configured size are the fallback;
+• among those, "round_robin" rotates and "least_queue" takes the printer
+  with the fewest labels waiting.
+
+Loaded label sizes and the policy come from QSettings, read once by
+from_settings() on the UI thread (discovery runs on the spooler's thread):
+    printer_label_size/<printer name> = "40x30"
+    print_policy = "least_queue" | "round_robin"
+
+Per-printer statistics are updated by the printer lanes under a lock;
+summary() reports them.
+"""
+
+from __future__ import annotations
+import threading
+from dataclasses import dataclass, field, replace
+from itertools import count
+
+from PyQt6.QtCore import QSettings
+
+from utils.dtp_client import PrinterUnavailable
+
+POLICIES = ("least_queue", "round_robin")
+
+# mm; stock sizes are entered by hand
+SIZE_TOLERANCE = 0.5
+
+
+@dataclass
+class PrinterStats:
+    jobs: int = 0
+    labels: int = 0
+    seconds: float = 0.0
+    failures: int = 0
+
+    @property
+    def labels_per_minute(self) -> float:
+        return self.labels / self.seconds * 60 if self.seconds else 0.0
+
+
+@dataclass
+class Printer:
+    name: str
+    params: dict                                # kwargs for DTPWeb.open_printer
+    label_size: tuple[float, float] | None      # (width, height) mm
+    stats: PrinterStats = field(default_factory=PrinterStats)
+
+    def fits(self, width: float, height: float) -> bool:
+        if self.label_size is None:
+            return False
+        w, h = self.label_size
+        return abs(w - width) <= SIZE_TOLERANCE and abs(h - height) <= SIZE_TOLERANCE
+
+
+def _parse_size(raw) -> tuple[float, float] | None:
+    try:
+        w, h = str(raw).lower().split("x")
+        return float(w), float(h)
+    except ValueError:
+        return None
+
+
+class PrinterPool:
+    def __init__(self, policy: str = "least_queue",
+                 label_sizes: dict[str, tuple[float, float]] | None = None):
+        self.policy = policy if policy in POLICIES else "least_queue"
+        self._label_sizes = dict(label_sizes or {})
+        self.printers: dict[str, Printer] = {}
+        self._lock = threading.Lock()         # discovery
+        self._stats_lock = threading.Lock()   # PrinterStats, updated by every lane
+        self._turn = count()
+
+    @classmethod
+    def from_settings(cls, settings: QSettings | None = None) -> PrinterPool:
+        """A pool configured from QSettings; call on the UI thread."""
+        settings = settings or QSettings("AlptraumTech", "LMS")
+        sizes = {}
+        settings.beginGroup("printer_label_size")
+        try:
+            for name in settings.childKeys():
+                size = _parse_size(settings.value(name, ""))
+                if size is not None:
+                    sizes[name] = size
+        finally:
+            settings.endGroup()
+        return cls(str(settings.value("print_policy", "least_queue")), sizes)
+
+    def ensure(self) -> None:
+        """Discover printers unless a previous discovery found some."""
+        with self._lock:
+            if self.printers:
+                return
+            from dtpweb import DTPWeb
+            api = DTPWeb()
+            if not api.check_plugin():
+                raise PrinterUnavailable("DTPWeb plugin not running")
+            found = {}
+            for info in api.get_printers() or []:
+                name = str(info.get("name") or info)
+                found[name] = Printer(name, dict(info), self._label_sizes.get(name))
+            # published whole: summary() reads it from the UI thread
+            self.printers = found
+
+    def candidates(self, width: float, height: float) -> list[Printer]:
+        """Printers able to take width × height labels, best matches first."""
+        exact = [p for p in self.printers.values() if p.fits(width, height)]
+        if exact:
+            return exact
+        unknown = [p for p in self.printers.values() if p.label_size is None]
+        if unknown:
+            return unknown
+        raise RuntimeError(f"No printer is loaded with {width:g}×{height:g} mm labels")
+
+    def pick(self, candidates: list[Printer], depth) -> Printer:
+        """depth(name) -> labels waiting for that printer."""
+        if self.policy == "round_robin":
+            return candidates[next(self._turn) % len(candidates)]
+        return min(candidates, key=lambda p: (depth(p.name), p.stats.labels))
+
+    def record(self, name: str, labels: int, seconds: float, failed: bool = False) -> None:
+        printer = self.printers.get(name)
+        if printer is None:
+            return
+        with self._stats_lock:
+            s = printer.stats
+            s.seconds += seconds
+            s.labels += labels
+            if failed:
+                s.failures += 1
+            else:
+                s.jobs += 1
+
+    def summary(self) -> str:
+        lines = [f"Policy: {self.policy}"]
+        with self._stats_lock:
+            printers = [(p, replace(p.stats)) for p in self.printers.values()]
+        if not printers:
+            lines.append("No printers discovered yet.")
+        for p, s in printers:
+            size = "{:g}×{:g} mm".format(*p.label_size) if p.label_size else "any size"
+            lines.append(
+                f"{p.name} ({size}): {s.jobs} jobs, {s.labels} labels, "
+                f"{s.labels_per_minute:.1f}/min, {s.failures} failures"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,52 @@
+# utils/spreadsheet.py
+
+"""
+Row reading shared by the spreadsheet imports (items, employee roster).
+
+iter_rows() streams a CSV (.csv / .csv.gz) or XLSX file as
+(row_number, {normalized header: value}); headers are matched with
+norm_header(), so "Sub Category", "subcategory" and "SUB_CATEGORY" are the
+same column. cell() reads one value as stripped text.
+"""
+
+import csv
+import gzip
+from pathlib import Path
+
+
+def norm_header(name) -> str:
+    return "".join(str(name or "").lower().split()).replace("_", "")
+
+
+def iter_rows(path: Path):
+    """Yield (row_number, {normalized header: value}) from a CSV or XLSX file."""
+    name = path.name.lower()
+    if name.endswith(".xlsx"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError as e:
+            raise RuntimeError("XLSX import requires the 'openpyxl' package") from e
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = [norm_header(h) for h in next(rows, [])]
+            for n, values in enumerate(rows, start=2):
+                if any(v not in (None, "") for v in values):
+                    yield n, dict(zip(header, values))
+        finally:
+            wb.close()
+        return
+
+    opener = gzip.open if name.endswith(".gz") else open
+    with opener(path, "rt", newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [norm_header(h) for h in next(reader, [])]
+        for values in reader:
+            if any(v.strip() for v in values):
+                yield reader.line_num, dict(zip(header, values))
+
+
+def cell(row: dict, key: str) -> str:
+    """The value under a normalized header as stripped text ("" if missing)."""
+    v = row.get(key)
+    return "" if v is None else str(v).strip()
@@ -0,0 +1,161 @@
+# utils/thumbnails.py
+
+"""
+Asynchronous thumbnails for item images.
+
+ThumbnailCache.request(path, size) answers from an in-memory LRU when it
+can; otherwise it returns None and decodes in a QThreadPool. Decoding uses
+QImageReader.setScaledSize, so a 20-megapixel photo on a network share is
+decoded straight to thumbnail size instead of being loaded in full and
+scaled afterwards. Results are also written to THUMB_CACHE_DIR, keyed by
+path, mtime and size, so later sessions skip the decode entirely.
+
+The memory LRU is keyed by path, mtime and size as well. request() does not
+stat (shares are slow); it trusts the mtime the worker last saw for up to
+MTIME_TTL seconds. After that it still returns the cached image but has the
+worker stat the file again, and `ready` delivers a new thumbnail if the
+file was replaced.
+
+`ready(path, size, image)` fires on the UI thread when a thumbnail is
+available; a null QImage means the file is missing or unreadable. Paths may
+also be attachment-store references; they are fetched in the worker.
+"""
+
+from __future__ import annotations
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, QRunnable, QSize, Qt, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader
+
+from utils.attachment_store import get_attachment_store, is_ref
+from utils.config import THUMB_CACHE_DIR
+
+# decoded thumbnails kept in memory
+MEMORY_CACHE_SIZE = 512
+# seconds the last seen mtime of an image file is trusted
+MTIME_TTL = 30.0
+
+
+class _Decode(QRunnable):
+    def __init__(self, cache: ThumbnailCache, path: str, size: int):
+        super().__init__()
+        self._cache, self._path, self._size = cache, path, size
+
+    def run(self):
+        self._cache._decode(self._path, self._size)
+
+
+class ThumbnailCache(QObject):
+    ready = pyqtSignal(str, int, QImage)     # path, size, image
+
+    def __init__(self, cache_dir: Path | None = THUMB_CACHE_DIR, size: int = MEMORY_CACHE_SIZE):
+        super().__init__()
+        self._dir = cache_dir
+        self._max = size
+        # (path, mtime, size) -> thumbnail
+        self._images: OrderedDict[tuple[str, int, int], QImage] = OrderedDict()
+        # path -> (checked at, mtime or None when unreadable)
+        self._mtimes: dict[str, tuple[float, int | None]] = {}
+        self._pending: set[tuple[str, int]] = set()
+        self._lock = threading.Lock()
+        self._pool = QThreadPool(self)
+        # network shares: a few parallel reads, not one per core
+        self._pool.setMaxThreadCount(4)
+
+    def request(self, path: str, size: int = 256) -> QImage | None:
+        """Cached thumbnail, or None after scheduling a decode."""
+        img = None
+        with self._lock:
+            known = self._mtimes.get(path)
+            if known is not None:
+                key = (path, known[1], size)
+                img = self._images.get(key)
+                if img is not None:
+                    self._images.move_to_end(key)
+                    if time.monotonic() - known[0] < MTIME_TTL:
+                        return img
+            # unknown or possibly outdated: (re)check in the worker
+            if (path, size) in self._pending:
+                return img
+            self._pending.add((path, size))
+        self._pool.start(_Decode(self, path, size))
+        return img
+
+    def forget(self, path: str) -> None:
+        """Drop a path from memory (e.g. after the item's image changed)."""
+        with self._lock:
+            self._mtimes.pop(path, None)
+            for key in [k for k in self._images if k[0] == path]:
+                del self._images[key]
+
+    # ——— worker side ———————————————————————————————————————
+    def _disk_path(self, path: str, mtime_ns: int, size: int) -> Path | None:
+        if self._dir is None:
+            return None
+        digest = hashlib.sha1(f"{path}\0{mtime_ns}\0{size}".encode("utf-8")).hexdigest()
+        return self._dir / f"{digest}.png"
+
+    def _decode(self, path: str, size: int) -> None:
+        img = QImage()
+        try:
+            source = get_attachment_store().local_path(path)
+            mtime = Path(source).stat().st_mtime_ns
+            if is_ref(path):
+                mtime = 0           # content-addressed: never changes
+        except OSError:
+            mtime = None
+
+        key = (path, mtime, size)
+        with self._lock:
+            known = self._mtimes.get(path)
+            if known is not None and known[1] != mtime:
+                # file replaced: thumbnails of the old version are dead weight
+                for old in [k for k in self._images if k[0] == path]:
+                    del self._images[old]
+            self._mtimes[path] = (time.monotonic(), mtime)
+            if mtime is not None:
+                img = self._images.get(key, img)
+
+        if mtime is not None and img.isNull():
+            cached = self._disk_path(path, mtime, size)
+            if cached is not None and cached.is_file():
+                img = QImage(str(cached))
+            if img.isNull():
+                reader = QImageReader(source)
+                reader.setAutoTransform(True)
+                full = reader.size()
+                if full.isValid() and (full.width() > size or full.height() > size):
+                    reader.setScaledSize(
+                        full.scaled(QSize(size, size), Qt.AspectRatioMode.KeepAspectRatio)
+                    )
+                img = reader.read()
+                if not img.isNull() and cached is not None:
+                    try:
+                        cached.parent.mkdir(parents=True, exist_ok=True)
+                        img.save(str(cached), "PNG")
+                    except OSError:
+                        pass        # cache is best-effort
+
+        with self._lock:
+            self._pending.discard((path, size))
+            if not img.isNull():
+                self._images[key] = img
+                self._images.move_to_end(key)
+                if len(self._images) > self._max:
+                    self._images.popitem(last=False)
+        self.ready.emit(path, size, img)
+
+
+_thumbs: ThumbnailCache | None = None
+
+
+def get_thumbnails() -> ThumbnailCache:
+    """The application-wide thumbnail cache, created on first use."""
+    global _thumbs
+    if _thumbs is None:
+        _thumbs = ThumbnailCache()
+    return _thumbs